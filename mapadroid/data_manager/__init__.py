@@ -6,7 +6,8 @@ from .dm_exceptions import (
     ModeUnknown,
     ModeNotSpecified,
     InvalidSection,
-    DataManagerException
+    DataManagerException,
+    UnknownIdentifier
 )
 from .modules.resource import Resource
 from mapadroid.db.DbWrapper import DbWrapper
@@ -100,22 +101,39 @@ class DataManager(object):
             resource_class = modules.MAPPINGS[section]
             table = resource_class.table
             primary_key = resource_class.primary_key
-        sql = 'SELECT `%s` FROM `%s` WHERE `instance_id` = %%s'
-        args = [primary_key, table]
+        sql = 'SELECT * FROM `%s` WHERE `instance_id` = %%s'
+        args = [table]
         if default_sort is None and hasattr(resource_class, 'search_field'):
             default_sort = resource_class.search_field
         if default_sort:
             sql += ' ORDER BY `%s`'
             args.append(default_sort)
-        identifiers = self.dbc.autofetch_column(sql % tuple(args), args=(self.instance_id,))
+        rows = self.dbc.autofetch_all(sql % tuple(args), args=(self.instance_id,))
+        if section == 'area':
+            resources = self.__load_areas(rows)
+        else:
+            resources = resource_class.load_rows(self, rows)
         data = collections.OrderedDict()
-        for identifier in identifiers:
-            elem = resource_class(self, identifier=identifier)
+        for row in rows:
+            identifier = row[primary_key]
+            elem = resources[identifier]
             if backend:
                 elem = elem.get_resource()
             data[identifier] = elem
         return data
 
+    def __load_areas(self, rows: List[dict]) -> Dict[int, Resource]:
+        # Areas of a mode share their mode specific table and are loaded together
+        rows_by_mode = collections.defaultdict(list)
+        for row in rows:
+            if row['mode'] not in modules.AREA_MAPPINGS:
+                raise UnknownIdentifier()
+            rows_by_mode[row['mode']].append(row)
+        areas = {}
+        for mode, mode_rows in rows_by_mode.items():
+            areas.update(modules.AREA_MAPPINGS[mode].load_rows(self, mode_rows))
+        return areas
+
     def get_settings(self, section: str, **kwargs) -> Dict[str, str]:
         resource_class = self.get_resource_def(section, **kwargs)
         config = resource_class.configuration
@@ -24,22 +24,22 @@ class Area(Resource):
         resource['mode'] = self.area_type
         return resource
 
-    def _load(self) -> None:
-        super()._load()
-        mode_query = "SELECT * FROM `%s` WHERE `area_id` = %%s" % (self.area_table,)
-        mode_data = self._dbc.autofetch_row(mode_query, args=(self.identifier))
-        mode_data = self.translate_keys(mode_data, 'load')
-        for field, db_value in mode_data.items():
-            if field in self.configuration['fields']:
-                self._data['fields'][field] = db_value
-            elif 'settings' in self.configuration and field in self.configuration[
-                 'settings'] and db_value is not None:
-                self._data['settings'][field] = db_value
-            else:
-                continue
-        # get route-calc status
-        routecalc = self._data_manager.get_resource('routecalc', self._data['fields']['routecalc'])
-        self.recalc_status = routecalc.recalc_status
+    @classmethod
+    def get_related_data(cls, data_manager, identifiers: List[int]) -> Dict[int, dict]:
+        # the mode specific values and the route-calc status
+        sql = "SELECT m.*, rc.`recalc_status`\n" \
+              "FROM `%s` m\n" \
+              "LEFT JOIN `settings_routecalc` rc ON rc.`routecalc_id` = m.`routecalc`\n" \
+              "WHERE m.`area_id` IN (%s)" % (cls.area_table, ','.join(['%s'] * len(identifiers)))
+        related = {}
+        for row in data_manager.dbc.autofetch_all(sql, args=tuple(identifiers)):
+            related[row['area_id']] = row
+        return related
+
+    def _load(self, data: Optional[dict] = None) -> dict:
+        data = super()._load(data)
+        self.recalc_status = data.get('recalc_status', None)
+        return data
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = []) -> int:
         has_identifier = True if self.identifier else False
@@ -1,5 +1,5 @@
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .resource import Resource
 from mapadroid.data_manager.modules.pogoauth import PogoAuth
 from mapadroid.utils.logging import get_logger, LoggerEnums, get_origin_logger
@@ -429,24 +429,28 @@ class Device(Resource):
         if any(issues['invalid']):
             return issues
 
-    def _load(self) -> None:
-        super()._load()
+    @classmethod
+    def get_related_data(cls, data_manager, identifiers: List[int]) -> Dict[int, dict]:
+        related = {identifier: {'ggl_login': None, 'ptc_login': []} for identifier in identifiers}
+        sql = "SELECT `device_id`, `account_id`, `login_type`\n" \
+              "FROM `%s`\n" \
+              "WHERE `instance_id` = %%s AND `device_id` IN (%s)\n" \
+              "ORDER BY `%s` ASC" % (PogoAuth.table, ','.join(['%s'] * len(identifiers)), PogoAuth.search_field)
+        login_fields = {lookup_val: field for field, lookup_val in pogoauth_fields.items()}
+        for row in data_manager.dbc.autofetch_all(sql, args=(data_manager.instance_id,) + tuple(identifiers)):
+            field = login_fields.get(row['login_type'], None)
+            if field == 'ptc_login':
+                related[row['device_id']][field].append(row['account_id'])
+            elif field is not None and related[row['device_id']][field] is None:
+                related[row['device_id']][field] = row['account_id']
+        return related
+
+    def _load(self, data: Optional[dict] = None) -> dict:
+        data = super()._load(data)
         self.state = 0
         if self._data_manager.is_device_active(self.identifier):
             self.state = 1
-        for field, lookup_val in pogoauth_fields.items():
-            search = {
-                'device_id': self.identifier,
-                'login_type': lookup_val
-            }
-            logins = self._data_manager.search('pogoauth', params=search)
-            if field == 'ptc_login':
-                self[field] = list(logins.keys())
-            else:
-                try:
-                    self[field] = next(iter(logins))
-                except StopIteration:
-                    self[field] = None
+        return data
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = []) -> int:
         core_data = self.get_core()
@@ -1,7 +1,6 @@
 import json
 from typing import Optional, Dict, List, Tuple
 from .resource import Resource
-from ..dm_exceptions import UnknownIdentifier
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.utils.logging import get_logger, LoggerEnums
 
@@ -68,15 +67,14 @@ class GeoFence(Resource):
                     pass
         return dependencies
 
-    def _load(self) -> None:
-        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
-        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
-        if not data:
-            raise UnknownIdentifier()
+    def _load(self, data: Optional[dict] = None) -> dict:
+        if data is None:
+            data = self._fetch_row()
         data = self.translate_keys(data, 'load')
         self._data['fields']['name'] = data['name']
         self._data['fields']['fence_type'] = data['fence_type']
         self._data['fields']['fence_data'] = json.loads(data['fence_data'])
+        return data
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = []) -> int:
         self.presave_validation(ignore_issues=ignore_issues)
@@ -1,5 +1,5 @@
 import mysql.connector
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 from .resource import Resource
 from mapadroid.utils.logging import get_logger, LoggerEnums
 
@@ -47,11 +47,16 @@ class MonIVList(Resource):
                 dependencies.append(('area', area_id))
         return dependencies
 
-    def _load(self) -> None:
-        super()._load()
-        mon_query = "SELECT `mon_id` FROM `settings_monivlist_to_mon` WHERE `monlist_id` = %s ORDER BY `mon_order` ASC"
-        mons = self._dbc.autofetch_column(mon_query, args=(self.identifier))
-        self._data['fields']['mon_ids_iv'] = mons
+    @classmethod
+    def get_related_data(cls, data_manager, identifiers: List[int]) -> Dict[int, dict]:
+        related = {identifier: {'mon_ids_iv': []} for identifier in identifiers}
+        mon_query = "SELECT `monlist_id`, `mon_id`\n" \
+                    "FROM `settings_monivlist_to_mon`\n" \
+                    "WHERE `monlist_id` IN (%s) ORDER BY `monlist_id`, `mon_order` ASC" % (
+                        ','.join(['%s'] * len(identifiers)))
+        for row in data_manager.dbc.autofetch_all(mon_query, args=tuple(identifiers)):
+            related[row['monlist_id']]['mon_ids_iv'].append(row['mon_id'])
+        return related
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = []) -> int:
         self.presave_validation(ignore_issues=ignore_issues)
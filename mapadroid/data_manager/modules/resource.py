@@ -1,5 +1,7 @@
+import collections
 import copy
 from collections import UserDict
+from typing import Dict, List, Optional
 import mysql
 from ..dm_exceptions import DependencyError, SaveIssue, UnknownIdentifier, UpdateIssue
 from ..resource_search import get_search, SearchType
@@ -172,7 +174,7 @@ class Resource(object):
     name_field = 'TBD'
     search_field = None
 
-    def __init__(self, data_manager, identifier=None):
+    def __init__(self, data_manager, identifier=None, data: Optional[dict] = None):
         self.identifier = identifier
         self._data_manager = data_manager
         self.instance_id = self._data_manager.instance_id
@@ -184,7 +186,7 @@ class Resource(object):
                 self.identifier = int(self.identifier)
             except (TypeError, ValueError):
                 raise UnknownIdentifier()
-            self._load()
+            self._load(data)
         else:
             self._default_load()
         self._cleanup_load()
@@ -324,11 +326,10 @@ class Resource(object):
             user_data['settings'] = settings
         return user_data
 
-    def _load(self):
-        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
-        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
-        if not data:
-            raise UnknownIdentifier()
+    def _load(self, data: Optional[dict] = None) -> dict:
+        """ Loads the resource from its row.  The row is fetched unless it has been passed by load_rows """
+        if data is None:
+            data = self._fetch_row()
         data = self.translate_keys(data, 'load')
         for field, field_value in data.items():
             if 'settings' in self.configuration and field in self.configuration['settings']:
@@ -337,6 +338,31 @@ class Resource(object):
                 self._data['settings'][field] = field_value
             elif field in self.configuration['fields']:
                 self._data['fields'][field] = field_value
+        return data
+
+    def _fetch_row(self) -> dict:
+        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
+        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
+        if not data:
+            raise UnknownIdentifier()
+        data.update(self.get_related_data(self._data_manager, [self.identifier]).get(self.identifier, {}))
+        return data
+
+    @classmethod
+    def get_related_data(cls, data_manager, identifiers: List[int]) -> Dict[int, dict]:
+        """ Values of the resources stored in other tables.  Merged into the rows of the resources by identifier """
+        return {}
+
+    @classmethod
+    def load_rows(cls, data_manager, rows: List[dict]) -> Dict[int, 'Resource']:
+        """ Creates the resources of rows fetched at once, fetching their related data with one query per table """
+        related = cls.get_related_data(data_manager, [row[cls.primary_key] for row in rows]) if rows else {}
+        resources = collections.OrderedDict()
+        for row in rows:
+            identifier = row[cls.primary_key]
+            row.update(related.get(identifier, {}))
+            resources[identifier] = cls(data_manager, identifier=identifier, data=row)
+        return resources
 
     def _load_defaults(self):
         sections = ['fields', 'settings']
@@ -1,9 +1,10 @@
+import hashlib
 import json
 import numpy as np
-from typing import Optional, Dict, List, Tuple
+from typing import Callable, Optional, Dict, List, Tuple
 from .resource import Resource
-from ..dm_exceptions import UnknownIdentifier
-from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.RouteCalcExecutor import RouteCalcExecutor
+from mapadroid.route.routecalc.SpatialClusteringHelper import SpatialClusteringHelper
 from mapadroid.utils.collections import Location
 from mapadroid.utils.logging import get_logger, LoggerEnums
 
@@ -30,6 +31,17 @@ class RouteCalc(Resource):
 
     def _default_load(self) -> None:
         self.recalc_status = False
+        self.input_hash = None
+        # hash and route of the last calculation, see __setitem__
+        self._calculated = (None, None)
+
+    def __setitem__(self, key, value):
+        if key == 'routefile':
+            # The stored hash only describes the stored route if it is the one calculated for these inputs. Routes
+            # edited in MADmin or updated incrementally have to be calculated again once the inputs are identical.
+            input_hash, calculated_route = self._calculated
+            self.input_hash = input_hash if value == calculated_route else None
+        super().__setitem__(key, value)
 
     def get_dependencies(self) -> None:
         tables = ['settings_area_idle',
@@ -50,14 +62,15 @@ class RouteCalc(Resource):
                 pass
         return dependencies
 
-    def _load(self) -> None:
-        query = "SELECT * FROM `%s` WHERE `%s` = %%s AND `instance_id` = %%s" % (self.table, self.primary_key)
-        data = self._dbc.autofetch_row(query, args=(self.identifier, self.instance_id))
-        if not data:
-            raise UnknownIdentifier()
+    def _load(self, data: Optional[dict] = None) -> dict:
+        if data is None:
+            data = self._fetch_row()
         data = self.translate_keys(data, 'load')
         self._data['fields']['routefile'] = json.loads(data['routefile'])
         self.recalc_status = data['recalc_status']
+        self.input_hash = data.get('input_hash', None)
+        self._calculated = (None, None)
+        return data
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = [],
              update_time: bool = False) -> int:
@@ -66,6 +79,7 @@ class RouteCalc(Resource):
         core_data = self.get_resource()
         core_data['routefile'] = json.dumps(self._data['fields']['routefile'])
         core_data['recalc_status'] = self.recalc_status
+        core_data['input_hash'] = self.input_hash
         if update_time:
             core_data['last_updated'] = 'NOW()'
             literals.append('last_updated')
@@ -105,103 +119,81 @@ class RouteCalc(Resource):
 
     def calculate_new_route(self, coords: List[Tuple[str, str]], max_radius: int, max_coords_within_radius: int,
                             delete_old_route: bool, calc_type: str, use_s2: bool, s2_level: int, num_procs: int = 0,
-                            overwrite_calculation: bool = False, in_memory: bool = False, route_name: str = 'Unknown'
+                            overwrite_calculation: bool = False, in_memory: bool = False, route_name: str = 'Unknown',
+                            time_limit: int = 0, executor: Optional[RouteCalcExecutor] = None
                             ) -> List[Dict[str, float]]:
         if overwrite_calculation:
             calc_type = 'route'
         self.set_recalc_status(True)
-        if in_memory is False:
-            if delete_old_route:
-                logger.debug("Deleting routefile...")
-                self._data['fields']['routefile'] = []
-                self.save()
-        new_route = self.get_json_route(coords, max_radius, max_coords_within_radius, in_memory,
-                                        num_processes=num_procs,
-                                        algorithm=calc_type, use_s2=use_s2, s2_level=s2_level,
-                                        route_name=route_name)
-        self.set_recalc_status(False)
+        try:
+            if in_memory is False:
+                input_hash = get_route_input_hash(coords, max_radius, max_coords_within_radius, calc_type, use_s2,
+                                                  s2_level, time_limit)
+                if delete_old_route and self._get_cached_route(input_hash) is None:
+                    logger.debug("Deleting routefile...")
+                    self._data['fields']['routefile'] = []
+                    self.input_hash = None
+                    self.save()
+            new_route = self.get_json_route(coords, max_radius, max_coords_within_radius, in_memory,
+                                            num_processes=num_procs,
+                                            algorithm=calc_type, use_s2=use_s2, s2_level=s2_level,
+                                            route_name=route_name, time_limit=time_limit, executor=executor)
+        finally:
+            self.set_recalc_status(False)
         return new_route
 
     def get_json_route(self, coords: List[Tuple[str, str]], max_radius: int, max_coords_within_radius: int,
                        in_memory: bool, num_processes: int = 1, algorithm: str = 'route', use_s2: bool = False,
-                       s2_level: int = 15, route_name: str = 'Unknown') -> List[Dict[str, float]]:
-        export_data = []
+                       s2_level: int = 15, route_name: str = 'Unknown', time_limit: int = 0,
+                       executor: Optional[RouteCalcExecutor] = None) -> List[Dict[str, float]]:
         if use_s2:
             logger.debug("Using S2 method for calculation with S2 level: {}", s2_level)
         if not in_memory and \
                 (self._data['fields']['routefile'] is not None and len(
                     self._data['fields']['routefile']) > 0):
             logger.debug('Using routefile from DB')
-            for line in self._data['fields']['routefile']:
-                # skip empty lines
-                if not line.strip():
-                    continue
-                line_split = line.split(',')
-                export_data.append({'lat': float(line_split[0].strip()),
-                                    'lng': float(line_split[1].strip())})
+            return self._get_stored_route()
+        input_hash = get_route_input_hash(coords, max_radius, max_coords_within_radius, algorithm, use_s2, s2_level,
+                                          time_limit)
+        export_data = self._get_cached_route(input_hash)
+        if export_data is not None:
+            logger.info("Coords and settings of {} are unchanged, using the routefile from DB", route_name)
+            self._calculated = (input_hash, get_routefile(export_data))
             return export_data
 
-        less_coords = coords
-        if len(coords) > 0 and max_radius and max_coords_within_radius:
-            logger.info("Calculating route for {}", route_name)
-            new_coords = self.get_less_coords(coords, max_radius, max_coords_within_radius, use_s2, s2_level)
-            less_coords = np.zeros(shape=(len(new_coords), 2))
-            for i in range(len(less_coords)):
-                less_coords[i][0] = new_coords[i][0]
-                less_coords[i][1] = new_coords[i][1]
-            logger.debug("Coords summed up: {}, that's just {} coords", less_coords, len(less_coords))
-        logger.debug("Got {} coordinates", len(less_coords))
-        if len(less_coords) < 3:
-            logger.debug("less than 3 coordinates... not gonna take a shortest route on that")
-            export_data = []
-            for i in range(len(less_coords)):
-                export_data.append({'lat': less_coords[i][0].item(),
-                                    'lng': less_coords[i][1].item()})
+        calc_args = (coords, max_radius, max_coords_within_radius, num_processes, algorithm, use_s2, s2_level,
+                     route_name, time_limit)
+        if executor is None:
+            export_data = calculate_route(*calc_args)
         else:
-            logger.info("Calculating a short route through all those coords. Might take a while")
-            from timeit import default_timer as timer
-            start = timer()
-            from mapadroid.route.routecalc.calculate_route_all import route_calc_all
-            sol_best = route_calc_all(less_coords, route_name, num_processes, algorithm)
-
-            end = timer()
-
-            calc_dur = (end - start) / 60
-            time_unit = 'minutes'
-            if calc_dur < 1:
-                calc_dur = int(calc_dur * 60)
-                time_unit = 'seconds'
-
-            logger.info("Calculated route for {} in {} {}", route_name, calc_dur, time_unit)
-
-            for i in range(len(sol_best)):
-                export_data.append({'lat': less_coords[int(sol_best[i])][0].item(),
-                                    'lng': less_coords[int(sol_best[i])][1].item()})
+            # raises RouteCalcCancelledError if the job gets cancelled, the stored route is kept in that case
+            export_data = executor.calculate(route_name, calculate_route, args=calc_args, identifier=self.identifier)
+        calc_coords = get_routefile(export_data)
         if not in_memory:
-            calc_coords = []
-            for coord in export_data:
-                calc_coord = '%s,%s' % (coord['lat'], coord['lng'])
-                calc_coords.append(calc_coord)
             # Only save if we aren't calculating in memory
             self._data['fields']['routefile'] = calc_coords
+            self.input_hash = input_hash
             self.save(update_time=True)
+        else:
+            self._calculated = (input_hash, calc_coords)
         return export_data
 
-    def get_less_coords(self, np_coords: List[Tuple[str, str]], max_radius: int, max_coords_within_radius: int,
-                        use_s2: bool = False, s2_level: int = 15):
-        coordinates = []
-        for coord in np_coords:
-            coordinates.append(
-                (0, Location(coord[0].item(), coord[1].item()))
-            )
-
-        clustering_helper = ClusteringHelper(max_radius=max_radius, max_count_per_circle=max_coords_within_radius,
-                                             max_timedelta_seconds=0, use_s2=use_s2, s2_level=s2_level)
-        clustered_events = clustering_helper.get_clustered(coordinates)
-        coords_cleaned_up = []
-        for event in clustered_events:
-            coords_cleaned_up.append(event[1])
-        return coords_cleaned_up
+    def _get_stored_route(self) -> List[Dict[str, float]]:
+        export_data = []
+        for line in self._data['fields']['routefile']:
+            # skip empty lines
+            if not line.strip():
+                continue
+            line_split = line.split(',')
+            export_data.append({'lat': float(line_split[0].strip()),
+                                'lng': float(line_split[1].strip())})
+        return export_data
+
+    def _get_cached_route(self, input_hash: str) -> Optional[List[Dict[str, float]]]:
+        """ Returns the stored route if it has been calculated for the same coords and settings """
+        if self.input_hash is None or self.input_hash != input_hash or not self._data['fields']['routefile']:
+            return None
+        return self._get_stored_route()
 
     def set_recalc_status(self, status: int) -> None:
         data = {
@@ -211,3 +203,92 @@ class RouteCalc(Resource):
             self.primary_key: self.identifier
         }
         self._dbc.autoexec_update(self.table, data, where_keyvals=where)
+
+
+def get_route_input_hash(coords: List[Tuple[str, str]], max_radius: int, max_coords_within_radius: int,
+                         algorithm: str, use_s2: bool, s2_level: int, time_limit: int) -> str:
+    """
+    Hash of everything a calculated route depends on. The coords are hashed as a set, the order they have been
+    fetched from the DB in does not matter.
+    """
+    np_coords = np.round(np.asarray(coords, dtype=float).reshape(-1, 2), 6)
+    np_coords = np_coords[np.lexsort((np_coords[:, 1], np_coords[:, 0]))]
+    settings = json.dumps([max_radius, max_coords_within_radius, algorithm, bool(use_s2), s2_level if use_s2 else None,
+                           time_limit])
+    input_hash = hashlib.sha1(settings.encode('utf-8'))
+    input_hash.update(np.ascontiguousarray(np_coords).tobytes())
+    return input_hash.hexdigest()
+
+
+def get_routefile(route: List[Dict[str, float]]) -> List[str]:
+    return ['%s,%s' % (coord['lat'], coord['lng']) for coord in route]
+
+
+def get_less_coords(np_coords: List[Tuple[str, str]], max_radius: int, max_coords_within_radius: int,
+                    use_s2: bool = False, s2_level: int = 15):
+    coordinates = []
+    for coord in np_coords:
+        coordinates.append(
+            (0, Location(coord[0].item(), coord[1].item()))
+        )
+
+    clustering_helper = SpatialClusteringHelper(max_radius=max_radius,
+                                                max_count_per_circle=max_coords_within_radius,
+                                                max_timedelta_seconds=0, use_s2=use_s2, s2_level=s2_level)
+    clustered_events = clustering_helper.get_clustered(coordinates)
+    coords_cleaned_up = []
+    for event in clustered_events:
+        coords_cleaned_up.append(event[1])
+    return coords_cleaned_up
+
+
+def calculate_route(coords: List[Tuple[str, str]], max_radius: int, max_coords_within_radius: int,
+                    num_processes: int = 1, algorithm: str = 'route', use_s2: bool = False, s2_level: int = 15,
+                    route_name: str = 'Unknown', time_limit: int = 0,
+                    progress: Optional[Callable[[float], None]] = None) -> List[Dict[str, float]]:
+    """
+    Clusters the coords and calculates a short route through the clusters. Does not touch the database, thus safe to
+    be run by RouteCalcExecutor.
+    """
+    export_data = []
+    less_coords = coords
+    if len(coords) > 0 and max_radius and max_coords_within_radius:
+        logger.info("Calculating route for {}", route_name)
+        new_coords = get_less_coords(coords, max_radius, max_coords_within_radius, use_s2, s2_level)
+        less_coords = np.zeros(shape=(len(new_coords), 2))
+        for i in range(len(less_coords)):
+            less_coords[i][0] = new_coords[i][0]
+            less_coords[i][1] = new_coords[i][1]
+        logger.debug("Coords summed up: {}, that's just {} coords", less_coords, len(less_coords))
+    # clustering is quick compared to the route calculation
+    if progress is not None:
+        progress(10)
+    logger.debug("Got {} coordinates", len(less_coords))
+    if len(less_coords) < 3:
+        logger.debug("less than 3 coordinates... not gonna take a shortest route on that")
+        export_data = []
+        for i in range(len(less_coords)):
+            export_data.append({'lat': less_coords[i][0].item(),
+                                'lng': less_coords[i][1].item()})
+    else:
+        logger.info("Calculating a short route through all those coords. Might take a while")
+        from timeit import default_timer as timer
+        start = timer()
+        from mapadroid.route.routecalc.calculate_route_all import route_calc_all, scale_progress
+        sol_best = route_calc_all(less_coords, route_name, num_processes, algorithm, time_limit=time_limit,
+                                  progress=scale_progress(progress, 10, 100))
+
+        end = timer()
+
+        calc_dur = (end - start) / 60
+        time_unit = 'minutes'
+        if calc_dur < 1:
+            calc_dur = int(calc_dur * 60)
+            time_unit = 'seconds'
+
+        logger.info("Calculated route for {} in {} {}", route_name, calc_dur, time_unit)
+
+        for i in range(len(sol_best)):
+            export_data.append({'lat': less_coords[int(sol_best[i])][0].item(),
+                                'lng': less_coords[int(sol_best[i])][1].item()})
+    return export_data
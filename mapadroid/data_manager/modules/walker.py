@@ -1,4 +1,4 @@
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 from ..dm_exceptions import DataManagerException
 from .resource import Resource
 from .walkerarea import WalkerArea
@@ -57,13 +57,15 @@ class Walker(Resource):
                 walkerarea = WalkerArea(self._data_manager, identifier=walkerarea_id)
                 walkerarea.delete()
 
-    def _load(self) -> None:
-        super()._load()
-        mon_query = "SELECT `walkerarea_id`\n" \
-                    "FROM `settings_walker_to_walkerarea`\n" \
-                    "WHERE `walker_id` = %s ORDER BY `area_order` ASC"
-        mons = self._dbc.autofetch_column(mon_query, args=(self.identifier))
-        self._data['fields']['setup'] = mons
+    @classmethod
+    def get_related_data(cls, data_manager, identifiers: List[int]) -> Dict[int, dict]:
+        related = {identifier: {'setup': []} for identifier in identifiers}
+        sql = "SELECT `walker_id`, `walkerarea_id`\n" \
+              "FROM `settings_walker_to_walkerarea`\n" \
+              "WHERE `walker_id` IN (%s) ORDER BY `walker_id`, `area_order` ASC" % (','.join(['%s'] * len(identifiers)))
+        for row in data_manager.dbc.autofetch_all(sql, args=tuple(identifiers)):
+            related[row['walker_id']]['setup'].append(row['walkerarea_id'])
+        return related
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = []) -> int:
         self.presave_validation(ignore_issues=ignore_issues)
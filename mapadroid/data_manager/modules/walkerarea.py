@@ -82,13 +82,14 @@ class WalkerArea(Resource):
             dependencies[ind] = ('walker', walkerarea_id)
         return dependencies
 
-    def _load(self) -> None:
-        super()._load()
+    def _load(self, data: Optional[dict] = None) -> dict:
+        data = super()._load(data)
         try:
             if self._data['fields']['walkermax'] is None:
                 self._data['fields']['walkermax'] = ''
         except KeyError:
             self._data['fields']['walkermax'] = ''
+        return data
 
     def save(self, force_insert: Optional[bool] = False, ignore_issues: Optional[List[str]] = []) -> int:
         self.presave_validation(ignore_issues=ignore_issues)
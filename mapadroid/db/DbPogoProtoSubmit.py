@@ -1,8 +1,15 @@
 import json
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from multiprocessing import Queue
+from queue import Full
+from typing import Callable, Dict, List, Optional, Tuple
 from bitstring import BitArray
-from mapadroid.db.PooledQueryExecutor import PooledQueryExecutor
+from mapadroid.db.PooledQueryExecutor import PooledQueryExecutor, QueryBatch
+from mapadroid.db.SpawnpointCache import SpawnpointCache
+from mapadroid.db.WriteBehindBuffer import WriteBehindBuffer
+from mapadroid.utils.collections import SpawnpointDetails
 from mapadroid.utils.gamemechanicutil import gen_despawn_timestamp, is_mon_ditto
 from mapadroid.utils.questGen import questtask
 from mapadroid.utils.s2Helper import S2Helper
@@ -19,11 +26,137 @@ class DbPogoProtoSubmit:
     moved outside the db package.
     """
     default_spawndef = 240
+    # in seconds, matches the interval of the event checker
+    event_refresh_interval = 60
 
-    def __init__(self, db_exec: PooledQueryExecutor):
+    def __init__(self, db_exec: PooledQueryExecutor, spawnpoint_cache: Optional[SpawnpointCache] = None,
+                 event_resolver: Optional[Callable[[], Tuple[int, int]]] = None, track_changes: bool = False,
+                 change_queue: Optional[Queue] = None):
         self._db_exec: PooledQueryExecutor = db_exec
+        if spawnpoint_cache is None:
+            spawnpoint_cache = SpawnpointCache(maxsize=0)
+        self._spawnpoint_cache: SpawnpointCache = spawnpoint_cache
+        self._event_resolver: Optional[Callable[[], Tuple[int, int]]] = event_resolver
+        self._event_id: int = 1
+        self._lure_duration: int = 30
+        self._event_updated: float = 0
+        self._query_batch: Optional[QueryBatch] = None
+        self._write_behind: Optional[WriteBehindBuffer] = None
+        self._track_changes: bool = track_changes
+        self._change_queue: Optional[Queue] = change_queue
+        # changes are pushed once the rows they refer to have been committed
+        self._batched_changes: List[Tuple[str, List[str]]] = []
+        self._write_behind_changes: List[Tuple[str, List[str]]] = []
+
+    def enable_write_behind(self, max_delay: float, max_rows: int):
+        """
+        Buffer the upserts of mons, stops, gyms and cells for up to max_delay seconds or max_rows rows.
+        flush_write_behind has to be called regularly once enabled.
+        """
+        self._write_behind = WriteBehindBuffer(self._db_exec, max_delay, max_rows)
+
+    def get_write_behind_timeout(self) -> Optional[float]:
+        if self._write_behind is None:
+            return None
+        return self._write_behind.get_timeout()
+
+    def flush_write_behind(self, force: bool = False):
+        if self._write_behind is not None and self._write_behind.flush(force=force):
+            self._push_changes(self._write_behind_changes)
+            self._write_behind_changes = []
+
+    def get_write_behind_stats(self) -> Optional[dict]:
+        if self._write_behind is None:
+            return None
+        return self._write_behind.get_stats()
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Defers the writes of all submits within the context and executes them using a single pooled connection
+        and a single commit once the context is left
+        """
+        self._query_batch = QueryBatch(self._db_exec)
+        try:
+            with self._query_batch:
+                yield
+            self._push_changes(self._batched_changes)
+        finally:
+            self._query_batch = None
+            self._batched_changes = []
+
+    def _executemany(self, sql, args, coalesce: bool = False):
+        """
+        coalesce marks upserts whose rows are keyed by their first value and may be buffered by the write-behind
+        stage
+        """
+        if coalesce and self._write_behind is not None:
+            self._write_behind.add(sql, args)
+        elif self._query_batch is not None:
+            self._query_batch.executemany(sql, args)
+        else:
+            self._db_exec.executemany(sql, args, commit=True)
+
+    def _log_changes(self, change_type: str, identifiers, coalesce: bool = False):
+        """
+        Appends the identifiers of changed rows to the change log read by the webhook worker or, if a change queue
+        is set, pushes them to the webhook worker directly. Pass the coalesce flag of the changed rows to have the
+        changes logged within the same transaction or pushed once it has been committed.
+        """
+        if not identifiers:
+            return
+        if self._change_queue is not None:
+            change = (change_type, [str(identifier) for identifier in identifiers])
+            if coalesce and self._write_behind is not None:
+                self._write_behind_changes.append(change)
+            elif self._query_batch is not None:
+                self._batched_changes.append(change)
+            else:
+                self._push_changes([change])
+        elif self._track_changes:
+            query = "INSERT INTO trs_webhook_change (type, identifier) VALUES ('%s', %%s)" % change_type
+            self._executemany(query, [(str(identifier),) for identifier in identifiers], coalesce=coalesce)
+
+    def _push_changes(self, changes: List[Tuple[str, List[str]]]):
+        for change in changes:
+            try:
+                self._change_queue.put_nowait(change)
+            except Full:
+                logger.warning("Webhook change queue is full, dropping {} changed {} rows", len(change[1]),
+                               change[0])
+
+    def set_current_event(self, event_id: int, lure_duration: Optional[int] = None):
+        self._event_id = event_id
+        if lure_duration is not None:
+            self._lure_duration = lure_duration
+        self._event_updated = time.time()
+
+    def _get_current_event(self) -> Tuple[int, int]:
+        """
+        Returns the ID and lure duration of the currently active event. Events rarely change, the values are
+        resolved in intervals of event_refresh_interval rather than per query.
+        """
+        if self._event_resolver is not None and time.time() - self._event_updated > self.event_refresh_interval:
+            event_id, lure_duration = self._event_resolver()
+            self.set_current_event(event_id, lure_duration if lure_duration else 30)
+        return self._event_id, self._lure_duration
+
+    def get_spawnpoint_cache_stats(self) -> dict:
+        return self._spawnpoint_cache.get_stats()
+
+    def get_spawnpoint_details(self, map_proto: dict) -> Dict[int, SpawnpointDetails]:
+        """
+        Fetch the known details of all spawnpoints referenced by the wild mons of a map_proto dict
+        with a single query. The result is meant to be passed to spawnpoints and mons.
+        """
+        cells = map_proto.get("cells", None)
+        if cells is None:
+            return {}
+        spawn_ids = self._get_spawn_ids(cells)
+        return self._get_spawnpoint_details(spawn_ids)
 
-    def mons(self, origin: str, map_proto: dict, mitm_mapper):
+    def mons(self, origin: str, map_proto: dict, mitm_mapper,
+             spawnpoint_details: Optional[Dict[int, SpawnpointDetails]] = None):
         """
         Update/Insert mons from a map_proto dict
         """
@@ -32,6 +165,8 @@ class DbPogoProtoSubmit:
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
+        if spawnpoint_details is None:
+            spawnpoint_details = self._get_spawnpoint_details(self._get_spawn_ids(cells))
 
         query_mons = (
             "INSERT INTO pokemon (encounter_id, spawnpoint_id, pokemon_id, latitude, longitude, disappear_time, "
@@ -60,7 +195,7 @@ class DbPogoProtoSubmit:
                 now = datetime.utcfromtimestamp(time.time()).strftime("%Y-%m-%d %H:%M:%S")
 
                 # get known spawn end time and feed into despawn time calculation
-                getdetspawntime = self._get_detected_endtime(str(spawnid))
+                getdetspawntime = self._get_endtime_from_details(spawnpoint_details.get(spawnid, None))
                 despawn_time_unix = gen_despawn_timestamp(getdetspawntime)
                 despawn_time = datetime.utcfromtimestamp(despawn_time_unix).strftime("%Y-%m-%d %H:%M:%S")
 
@@ -85,7 +220,8 @@ class DbPogoProtoSubmit:
                     )
                 )
 
-        self._db_exec.executemany(query_mons, mon_args, commit=True)
+        self._executemany(query_mons, mon_args, coalesce=True)
+        self._log_changes("pokemon", [mon[0] for mon in mon_args], coalesce=True)
         return True
 
     def mon_iv(self, origin: str, timestamp: float, encounter_proto: dict, mitm_mapper):
@@ -103,7 +239,7 @@ class DbPogoProtoSubmit:
 
         spawnid = int(str(wild_pokemon["spawnpoint_id"]), 16)
 
-        getdetspawntime = self._get_detected_endtime(str(spawnid))
+        getdetspawntime = self._get_endtime_from_details(self._get_spawnpoint_details([spawnid]).get(spawnid, None))
         despawn_time_unix = gen_despawn_timestamp(getdetspawntime)
         despawn_time = datetime.utcfromtimestamp(despawn_time_unix).strftime("%Y-%m-%d %H:%M:%S")
 
@@ -189,55 +325,51 @@ class DbPogoProtoSubmit:
         )
 
         self._db_exec.execute(query, insert_values, commit=True)
+        self._log_changes("pokemon", [encounter_id])
         origin_logger.debug3("Done updating mon in DB")
         return True
 
-    def spawnpoints(self, origin: str, map_proto: dict, proto_dt: datetime):
+    def spawnpoints(self, origin: str, map_proto: dict, proto_dt: datetime,
+                    spawnpoint_details: Optional[Dict[int, SpawnpointDetails]] = None):
+        """
+        Update/Insert spawnpoints from a map_proto dict. If spawnpoint_details are passed, newly calculated
+        endtimes are written back to it so subsequent calls of mons do not have to query them again.
+        """
         origin_logger = get_origin_logger(logger, origin=origin)
         origin_logger.debug3("DbPogoProtoSubmit::spawnpoints called with data received")
         cells = map_proto.get("cells", None)
         if cells is None:
             return False
         spawnpoint_args, spawnpoint_args_unseen = [], []
-        spawn_ids = []
+        written_details = {}
 
         query_spawnpoints = (
             "INSERT INTO trs_spawn (spawnpoint, latitude, longitude, earliest_unseen, "
             "last_scanned, spawndef, calc_endminsec, eventid) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s, "
-            "(select id from trs_event where now() between event_start and "
-            "event_end order by event_start desc limit 1)) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s) "
             "ON DUPLICATE KEY UPDATE "
             "last_scanned=VALUES(last_scanned), "
             "earliest_unseen=LEAST(earliest_unseen, VALUES(earliest_unseen)), "
-            "spawndef=if(((select id from trs_event where now() between event_start and event_end order "
-            "by event_start desc limit 1)=1 and eventid=1) or (select id from trs_event where now() between "
-            "event_start and event_end order by event_start desc limit 1)<>1 and eventid<>1, VALUES(spawndef), "
-            "spawndef), "
+            "spawndef=if((VALUES(eventid)=1 and eventid=1) or (VALUES(eventid)<>1 and eventid<>1), "
+            "VALUES(spawndef), spawndef), "
             "calc_endminsec=VALUES(calc_endminsec)"
         )
 
         query_spawnpoints_unseen = (
             "INSERT INTO trs_spawn (spawnpoint, latitude, longitude, earliest_unseen, last_non_scanned, spawndef, "
-            "eventid) VALUES (%s, %s, %s, %s, %s, %s, "
-            "(select id from trs_event where now() between event_start and "
-            "event_end order by event_start desc limit 1)) "
+            "eventid) VALUES (%s, %s, %s, %s, %s, %s, %s) "
             "ON DUPLICATE KEY UPDATE "
-            "spawndef=if(((select id from trs_event where now() between event_start and event_end order "
-            "by event_start desc limit 1)=1 and eventid=1) or (select id from trs_event where now() between "
-            "event_start and event_end order by event_start desc limit 1)<>1 and eventid<>1, VALUES(spawndef), "
-            "spawndef), "
+            "spawndef=if((VALUES(eventid)=1 and eventid=1) or (VALUES(eventid)<>1 and eventid<>1), "
+            "VALUES(spawndef), spawndef), "
             "last_non_scanned=VALUES(last_non_scanned)"
         )
 
         now = proto_dt.strftime("%Y-%m-%d %H:%M:%S")
         dt = proto_dt
+        event_id, _ = self._get_current_event()
 
-        for cell in cells:
-            for wild_mon in cell["wild_pokemon"]:
-                spawn_ids.append(int(str(wild_mon['spawnpoint_id']), 16))
-
-        spawndef = self._get_spawndef(spawn_ids)
+        if spawnpoint_details is None:
+            spawnpoint_details = self._get_spawnpoint_details(self._get_spawn_ids(cells))
 
         for cell in cells:
             for wild_mon in cell["wild_pokemon"]:
@@ -247,9 +379,9 @@ class DbPogoProtoSubmit:
                 despawntime = wild_mon["time_till_hidden"]
 
                 minpos = self._get_current_spawndef_pos()
-                # TODO: retrieve the spawndefs by a single executemany and pass that...
 
-                spawndef_ = spawndef.get(spawnid, False)
+                details = spawnpoint_details.get(spawnid, None)
+                spawndef_ = details.spawndef if details is not None else False
                 if spawndef_:
                     newspawndef = self._set_spawn_see_minutesgroup(spawndef_, minpos)
                 else:
@@ -265,19 +397,32 @@ class DbPogoProtoSubmit:
                     calcendtime = fulldate.strftime("%M:%S")
 
                     spawnpoint_args.append(
-                        (spawnid, lat, lng, earliest_unseen, last_scanned, newspawndef, calcendtime)
+                        (spawnid, lat, lng, earliest_unseen, last_scanned, newspawndef, calcendtime, event_id)
                     )
+                    if details is not None:
+                        written_details[spawnid] = details._replace(
+                            spawndef=self._get_updated_spawndef(details, newspawndef, event_id),
+                            calc_endminsec=calcendtime)
+                    else:
+                        written_details[spawnid] = SpawnpointDetails(newspawndef, calcendtime, event_id)
                 else:
                     earliest_unseen = 99999999
                     last_non_scanned = now
 
                     spawnpoint_args_unseen.append(
-                        (spawnid, lat, lng, earliest_unseen, last_non_scanned, newspawndef)
+                        (spawnid, lat, lng, earliest_unseen, last_non_scanned, newspawndef, event_id)
                     )
+                    if details is not None:
+                        written_details[spawnid] = details._replace(
+                            spawndef=self._get_updated_spawndef(details, newspawndef, event_id))
+                    else:
+                        written_details[spawnid] = SpawnpointDetails(newspawndef, None, event_id)
 
-        self._db_exec.executemany(query_spawnpoints, spawnpoint_args, commit=True)
-        self._db_exec.executemany(query_spawnpoints_unseen,
-                                  spawnpoint_args_unseen, commit=True)
+        self._executemany(query_spawnpoints, spawnpoint_args)
+        self._executemany(query_spawnpoints_unseen, spawnpoint_args_unseen)
+        # write-through: the rows have just been written, no need to read them back later on
+        spawnpoint_details.update(written_details)
+        self._spawnpoint_cache.update(written_details)
 
     def stops(self, origin: str, map_proto: dict):
         """
@@ -306,7 +451,8 @@ class DbPogoProtoSubmit:
                     stops_args.append(
                         self._extract_args_single_stop(fort))
 
-        self._db_exec.executemany(query_stops, stops_args, commit=True)
+        self._executemany(query_stops, stops_args, coalesce=True)
+        self._log_changes("pokestop", [stop[0] for stop in stops_args], coalesce=True)
         return True
 
     def stop_details(self, stop_proto: dict):
@@ -329,6 +475,7 @@ class DbPogoProtoSubmit:
 
         if stop_args is not None:
             self._db_exec.execute(query_stops, stop_args, commit=True)
+            self._log_changes("pokestop", [stop_args[0]])
         return True
 
     def quest(self, origin: str, quest_proto: dict, mitm_mapper):
@@ -395,6 +542,7 @@ class DbPogoProtoSubmit:
         )
         origin_logger.debug3("DbPogoProtoSubmit::quest submitted quest type {} at stop {}", quest_type, fort_id)
         self._db_exec.execute(query_quests, insert_values, commit=True)
+        self._log_changes("quest", [fort_id])
 
         return True
 
@@ -459,8 +607,9 @@ class DbPogoProtoSubmit:
                     gym_details_args.append(
                         (gym["id"], "unknown", gym["image_url"], now)
                     )
-        self._db_exec.executemany(query_gym, gym_args, commit=True)
-        self._db_exec.executemany(query_gym_details, gym_details_args, commit=True)
+        self._executemany(query_gym, gym_args, coalesce=True)
+        self._executemany(query_gym_details, gym_details_args, coalesce=True)
+        self._log_changes("gym", [gym[0] for gym in gym_args], coalesce=True)
         origin_logger.debug3("submit_gyms done")
         return True
 
@@ -588,7 +737,8 @@ class DbPogoProtoSubmit:
                             evolution
                         )
                     )
-        self._db_exec.executemany(query_raid, raid_args, commit=True)
+        self._executemany(query_raid, raid_args)
+        self._log_changes("raid", [raid[0] for raid in raid_args])
         origin_logger.debug3("DbPogoProtoSubmit::raids: Done submitting raids with data received")
         return True
 
@@ -620,7 +770,8 @@ class DbPogoProtoSubmit:
                 self._extract_args_single_weather(
                     client_weather, time_of_day, received_timestamp)
             )
-        self._db_exec.executemany(query_weather, list_of_weather_args, commit=True)
+        self._executemany(query_weather, list_of_weather_args)
+        self._log_changes("weather", [weather[0] for weather in list_of_weather_args if weather is not None])
         return True
 
     def cells(self, origin: str, map_proto: dict):
@@ -643,7 +794,7 @@ class DbPogoProtoSubmit:
 
             cells.append((cell_id, 15, lat, lng, cell["current_timestamp"] / 1000))
 
-        self._db_exec.executemany(query, cells, commit=True)
+        self._executemany(query, cells, coalesce=True)
 
     def _extract_args_single_stop(self, stop_data):
         if stop_data["type"] != 1:
@@ -662,14 +813,7 @@ class DbPogoProtoSubmit:
 
         if len(stop_data["active_fort_modifier"]) > 0:
             # get current lure duration
-            sql = "select `event_lure_duration` " \
-                  "from trs_event " \
-                  "where now() between `event_start` and `event_end` and `event_name`<>'DEFAULT'"
-            found = self._db_exec.execute(sql)
-            if found and len(found) > 0 and found[0][0]:
-                lure_duration = int(found[0][0])
-            else:
-                lure_duration = int(30)
+            _, lure_duration = self._get_current_event()
 
             active_fort_modifier = stop_data["active_fort_modifier"][0]
             lure = datetime.utcfromtimestamp(
@@ -744,43 +888,52 @@ class DbPogoProtoSubmit:
             time_of_day, now
         )
 
-    def _get_detected_endtime(self, spawn_id):
-        logger.debug3("DbPogoProtoSubmit::_get_detected_endtime called")
-
-        query = (
-            "SELECT calc_endminsec "
-            "FROM trs_spawn "
-            "WHERE spawnpoint=%s"
-        )
-        args = (
-            spawn_id,
-        )
-
-        found = self._db_exec.execute(query, args)
-
-        if found and len(found) > 0 and found[0][0]:
-            return str(found[0][0])
-        else:
-            return False
+    def _get_spawn_ids(self, cells) -> List[int]:
+        spawn_ids = []
+        for cell in cells:
+            for wild_mon in cell["wild_pokemon"]:
+                spawn_ids.append(int(str(wild_mon['spawnpoint_id']), 16))
+        return spawn_ids
 
-    def _get_spawndef(self, spawn_ids):
+    def _get_spawnpoint_details(self, spawn_ids: List[int]) -> Dict[int, SpawnpointDetails]:
         if not spawn_ids:
-            return False
-        logger.debug3("DbPogoProtoSubmit::_get_spawndef called")
+            return {}
+        logger.debug3("DbPogoProtoSubmit::_get_spawnpoint_details called")
+
+        spawnret, missing = self._spawnpoint_cache.get_many(set(spawn_ids))
+        if not missing:
+            return spawnret
 
-        spawnids = ",".join(map(str, spawn_ids))
-        spawnret = {}
+        spawnids = ",".join(map(str, missing))
+        fetched = {}
 
         query = (
-            "SELECT spawnpoint, spawndef "
+            "SELECT spawnpoint, spawndef, calc_endminsec, eventid "
             "FROM trs_spawn where spawnpoint in (%s)" % (spawnids)
         )
 
         res = self._db_exec.execute(query)
-        for row in res:
-            spawnret[int(row[0])] = row[1]
+        if not res:
+            return spawnret
+        for (spawnpoint, spawndef, calc_endminsec, eventid) in res:
+            fetched[int(spawnpoint)] = SpawnpointDetails(spawndef, calc_endminsec, eventid)
+        self._spawnpoint_cache.update(fetched)
+        spawnret.update(fetched)
         return spawnret
 
+    def _get_endtime_from_details(self, details: Optional[SpawnpointDetails]):
+        if details is not None and details.calc_endminsec:
+            return str(details.calc_endminsec)
+        return False
+
+    def _get_updated_spawndef(self, details: SpawnpointDetails, newspawndef: int, event_id: int) -> int:
+        # mirrors the ON DUPLICATE KEY UPDATE clause of the spawnpoint queries
+        if details.eventid is None:
+            return details.spawndef
+        if (event_id == 1 and details.eventid == 1) or (event_id != 1 and details.eventid != 1):
+            return newspawndef
+        return details.spawndef
+
     def _get_current_spawndef_pos(self):
         minute_value = int(datetime.now().strftime("%M"))
         if minute_value < 15:
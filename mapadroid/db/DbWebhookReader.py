@@ -1,22 +1,143 @@
-from datetime import datetime, timezone
+import time
+from datetime import timezone
+from multiprocessing import Queue
+from queue import Empty
+from typing import Dict, Iterable, Optional, Set, Tuple
 from mapadroid.db.PooledQueryExecutor import PooledQueryExecutor
+from mapadroid.db.SpawnpointCache import SpawnpointCache
+from mapadroid.utils.collections import SpawnpointDetails
 from mapadroid.utils.logging import get_logger, LoggerEnums
 
 
 logger = get_logger(LoggerEnums.database)
 
 
+def _in_clause(column: str, count: int) -> str:
+    return "{} IN ({})".format(column, ", ".join(["%s"] * count))
+
+
 class DbWebhookReader:
+    # ids of the change log skipped while reading, e.g. of transactions committed after a later one, are re-checked
+    # for this many seconds
+    missing_change_timeout = 60
+    max_missing_changes = 1000
+    # pushed changes are collected for this many seconds to be sent at once
+    push_batch_delay = 0.5
 
-    def __init__(self, db_exec: PooledQueryExecutor, db_wrapper):
+    def __init__(self, db_exec: PooledQueryExecutor, db_wrapper, spawnpoint_cache: Optional[SpawnpointCache] = None,
+                 change_queue: Optional[Queue] = None):
         self._db_exec: PooledQueryExecutor = db_exec
+        if spawnpoint_cache is None:
+            spawnpoint_cache = SpawnpointCache(maxsize=0)
+        self._spawnpoint_cache: SpawnpointCache = spawnpoint_cache
         # TODO: DbWrapper is currently required because `dbWrapper.quests_from_db` is shared between
         # map and webhook. Old typehinting used to avoid circular dependencies. This should be
         # resolved in future iterations.
         self._db_wrapper = db_wrapper
+        self._change_queue: Optional[Queue] = change_queue
+        self._change_cursor: Optional[int] = None
+        self._missing_changes: Dict[int, float] = {}
+
+    def init_change_cursor(self, timestamp: int = 0):
+        """
+        Start reading the changes logged since timestamp or, by default, the changes logged from now on
+        """
+        if timestamp:
+            query = "SELECT MAX(id) FROM trs_webhook_change WHERE created < FROM_UNIXTIME(%s)"
+            args = (int(timestamp),)
+        else:
+            query = "SELECT MAX(id) FROM trs_webhook_change"
+            args = ()
+        self._change_cursor = self._db_exec.autofetch_value(query, args=args) or 0
+        self._missing_changes = {}
+        logger.debug("Reading webhook changes after change {}", self._change_cursor)
+
+    def get_changes(self, limit: int = 5000) -> Tuple[Dict[str, Set[str]], bool]:
+        """
+        Reads up to limit changes logged since the last call. Returns the identifiers of the changed rows by type
+        and whether further changes are pending. Changes are read in the order of their ids, a change is thus
+        returned exactly once no matter how many other changes happened within the same second.
+        """
+        if self._change_queue is not None:
+            return self.__get_pushed_changes(limit)
+        if self._change_cursor is None:
+            self.init_change_cursor()
+        query = (
+            "SELECT id, type, identifier "
+            "FROM trs_webhook_change "
+            "WHERE id > %s "
+            "ORDER BY id LIMIT %s"
+        )
+        rows = list(self._db_exec.execute(query, (self._change_cursor, limit)) or [])
+        page_size = len(rows)
+        if self._missing_changes:
+            missing = list(self._missing_changes.keys())
+            query = (
+                "SELECT id, type, identifier "
+                "FROM trs_webhook_change "
+                "WHERE " + _in_clause("id", len(missing))
+            )
+            rows += self._db_exec.execute(query, tuple(missing)) or []
+
+        now = time.time()
+        changes: Dict[str, Set[str]] = {}
+        expected_id = self._change_cursor + 1
+        untracked = 0
+        for change_id, change_type, identifier in rows:
+            if change_id > self._change_cursor:
+                skipped = range(expected_id, change_id)
+                trackable = max(0, self.max_missing_changes - len(self._missing_changes))
+                for missing_id in skipped[:trackable]:
+                    self._missing_changes[missing_id] = now
+                untracked += max(0, len(skipped) - trackable)
+                expected_id = change_id + 1
+            else:
+                self._missing_changes.pop(change_id, None)
+            changes.setdefault(change_type, set()).add(identifier)
+        self._change_cursor = expected_id - 1
+        if untracked > 0:
+            logger.warning("Not tracking {} skipped webhook changes as {} are missing already, they are lost if "
+                           "their transactions commit late", untracked, self.max_missing_changes)
+
+        # ids of rolled back transactions never show up
+        self._missing_changes = {change_id: noticed for change_id, noticed in self._missing_changes.items()
+                                 if now - noticed < self.missing_change_timeout}
+        logger.debug2("Read {} webhook changes up to change {}, {} changes missing", len(rows),
+                      self._change_cursor, len(self._missing_changes))
+        return changes, page_size >= limit
+
+    def __get_pushed_changes(self, limit: int) -> Tuple[Dict[str, Set[str]], bool]:
+        """
+        Waits up to a second for changes pushed by the MITM data processors, further changes are collected for
+        push_batch_delay seconds
+        """
+        changes: Dict[str, Set[str]] = {}
+        change_count = 0
+        deadline = time.time() + 1
+        while change_count < limit:
+            try:
+                change_type, identifiers = self._change_queue.get(timeout=max(0.0, deadline - time.time()))
+            except Empty:
+                break
+            if change_count == 0:
+                deadline = time.time() + self.push_batch_delay
+            changes.setdefault(change_type, set()).update(identifiers)
+            change_count += len(identifiers)
+        return changes, change_count >= limit
+
+    def cleanup_changes(self, max_age: int):
+        logger.debug2("DbWebhookReader::cleanup_changes called")
+        query = "DELETE FROM trs_webhook_change WHERE created < FROM_UNIXTIME(%s)"
+        self._db_exec.execute(query, (int(time.time()) - max_age,), commit=True)
 
-    def get_raids_changed_since(self, timestamp):
-        logger.debug2("DbWebhookReader::get_raids_changed_since called")
+    def get_raids(self, gym_ids: Iterable[str]):
+        logger.debug2("DbWebhookReader::get_raids called")
+        gym_ids = tuple(gym_ids)
+        if not gym_ids:
+            return []
+        return self.__get_raids(_in_clause("raid.gym_id", len(gym_ids)), gym_ids)
+
+    def __get_raids(self, where: str, args: tuple):
         query = (
             "SELECT raid.gym_id, raid.level, raid.spawn, raid.start, raid.end, raid.pokemon_id, "
             "raid.cp, raid.move_1, raid.move_2, raid.last_scanned, raid.form, raid.is_exclusive, raid.gender, "
@@ -25,10 +146,9 @@ class DbWebhookReader:
             "FROM raid "
             "LEFT JOIN gymdetails ON gymdetails.gym_id = raid.gym_id "
             "LEFT JOIN gym ON gym.gym_id = raid.gym_id "
-            "WHERE raid.last_scanned >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt,))
+        res = self._db_exec.execute(query, args)
 
         ret = []
         for (gym_id, level, spawn, start, end, pokemon_id,
@@ -61,15 +181,20 @@ class DbWebhookReader:
             })
         return ret
 
-    def get_weather_changed_since(self, timestamp):
-        logger.debug2("DbWebhookReader::get_weather_changed_since called")
+    def get_weather(self, s2_cell_ids: Iterable[str]):
+        logger.debug2("DbWebhookReader::get_weather called")
+        s2_cell_ids = tuple(s2_cell_ids)
+        if not s2_cell_ids:
+            return []
+        return self.__get_weather(_in_clause("s2_cell_id", len(s2_cell_ids)), s2_cell_ids)
+
+    def __get_weather(self, where: str, args: tuple):
         query = (
             "SELECT * "
             "FROM weather "
-            "WHERE last_updated >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt,))
+        res = self._db_exec.execute(query, args)
 
         ret = []
         for (s2_cell_id, latitude, longitude, cloud_level, rain_level, wind_level,
@@ -93,22 +218,30 @@ class DbWebhookReader:
             })
         return ret
 
-    def get_quests_changed_since(self, timestamp):
-        logger.debug2("DbWebhookReader::get_quests_changed_since called")
-        return self._db_wrapper.quests_from_db(timestamp=timestamp)
+    def get_quests(self, pokestop_ids: Iterable[str]):
+        logger.debug2("DbWebhookReader::get_quests called")
+        pokestop_ids = tuple(pokestop_ids)
+        if not pokestop_ids:
+            return {}
+        return self._db_wrapper.quests_from_db(pokestop_ids=pokestop_ids)
+
+    def get_gyms(self, gym_ids: Iterable[str]):
+        logger.debug2("DbWebhookReader::get_gyms called")
+        gym_ids = tuple(gym_ids)
+        if not gym_ids:
+            return []
+        return self.__get_gyms(_in_clause("gym.gym_id", len(gym_ids)), gym_ids)
 
-    def get_gyms_changed_since(self, timestamp):
-        logger.debug2("DbWebhookReader::get_gyms_changed_since called")
+    def __get_gyms(self, where: str, args: tuple):
         query = (
             "SELECT name, description, url, gym.gym_id, team_id, guard_pokemon_id, slots_available, "
             "latitude, longitude, total_cp, is_in_battle, weather_boosted_condition, "
             "last_modified, gym.last_scanned, gym.is_ex_raid_eligible "
             "FROM gym "
             "LEFT JOIN gymdetails ON gym.gym_id = gymdetails.gym_id "
-            "WHERE gym.last_scanned >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt,))
+        res = self._db_exec.execute(query, args)
 
         ret = []
         for (name, description, url, gym_id, team_id, guard_pokemon_id, slots_available,
@@ -133,17 +266,22 @@ class DbWebhookReader:
             })
         return ret
 
-    def get_stops_changed_since(self, timestamp):
-        logger.debug2("DbWebhookReader::get_stops_changed_since called")
+    def get_stops(self, pokestop_ids: Iterable[str]):
+        logger.debug2("DbWebhookReader::get_stops called")
+        pokestop_ids = tuple(pokestop_ids)
+        if not pokestop_ids:
+            return []
+        return self.__get_stops(_in_clause("pokestop_id", len(pokestop_ids)), pokestop_ids)
+
+    def __get_stops(self, where: str, args: tuple):
         query = (
             "SELECT pokestop_id, latitude, longitude, lure_expiration, name, image, active_fort_modifier, "
             "last_modified, last_updated, incident_start, incident_expiration, incident_grunt_type "
             "FROM pokestop "
-            "WHERE last_updated >= %s AND (DATEDIFF(lure_expiration, '1970-01-01 00:00:00') > 0 OR "
+            "WHERE " + where + " AND (DATEDIFF(lure_expiration, '1970-01-01 00:00:00') > 0 OR "
             "incident_start IS NOT NULL)"
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt,))
+        res = self._db_exec.execute(query, args)
 
         ret = []
         for (pokestop_id, latitude, longitude, lure_expiration, name, image, active_fort_modifier,
@@ -169,28 +307,39 @@ class DbWebhookReader:
             })
         return ret
 
-    def get_mon_changed_since(self, timestamp):
-        logger.debug2("DbWebhookReader::get_mon_changed_since called")
+    def get_mons(self, encounter_ids: Iterable[str]):
+        logger.debug2("DbWebhookReader::get_mons called")
+        encounter_ids = tuple(int(encounter_id) for encounter_id in encounter_ids)
+        if not encounter_ids:
+            return []
+        return self.__get_mons(_in_clause("encounter_id", len(encounter_ids)), encounter_ids)
+
+    def __get_mons(self, where: str, args: tuple):
         query = (
             "SELECT encounter_id, spawnpoint_id, pokemon_id, pokemon.latitude, pokemon.longitude, "
             "disappear_time, individual_attack, individual_defense, individual_stamina, "
             "move_1, move_2, cp, cp_multiplier, weight, height, gender, form, costume, "
-            "weather_boosted_condition, last_modified, catch_prob_1, catch_prob_2, catch_prob_3, "
-            "(trs_spawn.calc_endminsec IS NOT NULL) AS verified "
+            "weather_boosted_condition, last_modified, catch_prob_1, catch_prob_2, catch_prob_3 "
             "FROM pokemon "
-            "INNER JOIN trs_spawn ON pokemon.spawnpoint_id = trs_spawn.spawnpoint "
-            "WHERE last_modified >= %s"
+            "WHERE " + where
         )
-        tsdt = datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
-        res = self._db_exec.execute(query, (tsdt,))
+        res = self._db_exec.execute(query, args)
+        if not res:
+            return []
+
+        spawnpoints = self.__get_spawnpoint_details(set(int(row[1]) for row in res))
 
         ret = []
         for (encounter_id, spawnpoint_id, pokemon_id, latitude,
              longitude, disappear_time, individual_attack,
              individual_defense, individual_stamina, move_1, move_2,
              cp, cp_multiplier, weight, height, gender, form, costume,
-             weather_boosted_condition, last_modified, catch_prob_1, catch_prob_2, catch_prob_3,
-             verified) in res:
+             weather_boosted_condition, last_modified, catch_prob_1, catch_prob_2,
+             catch_prob_3) in res:
+            spawnpoint = spawnpoints.get(int(spawnpoint_id), None)
+            if spawnpoint is None:
+                # mons are only sent for known spawnpoints
+                continue
             ret.append({
                 "encounter_id": encounter_id,
                 "pokemon_id": pokemon_id,
@@ -215,6 +364,28 @@ class DbWebhookReader:
                 "base_catch": catch_prob_1,
                 "great_catch": catch_prob_2,
                 "ultra_catch": catch_prob_3,
-                "spawn_verified": verified == 1
+                "spawn_verified": spawnpoint.calc_endminsec is not None
             })
         return ret
+
+    def __get_spawnpoint_details(self, spawn_ids) -> Dict[int, SpawnpointDetails]:
+        if not spawn_ids:
+            return {}
+        cached, missing = self._spawnpoint_cache.get_many(spawn_ids)
+        # spawnpoints are verified by the MITM data processors, re-check unverified ones against the DB
+        spawnret = {spawn_id: details for spawn_id, details in cached.items() if details.calc_endminsec is not None}
+        missing.extend(spawn_id for spawn_id in cached.keys() if spawn_id not in spawnret)
+        if not missing:
+            return spawnret
+
+        query = (
+            "SELECT spawnpoint, spawndef, calc_endminsec, eventid "
+            "FROM trs_spawn WHERE spawnpoint IN (%s)" % ",".join(map(str, missing))
+        )
+        res = self._db_exec.execute(query)
+        fetched = {}
+        for (spawnpoint, spawndef, calc_endminsec, eventid) in res or []:
+            fetched[int(spawnpoint)] = SpawnpointDetails(spawndef, calc_endminsec, eventid)
+        self._spawnpoint_cache.update(fetched)
+        spawnret.update(fetched)
+        return spawnret
@@ -3,13 +3,15 @@ import re
 import time
 from datetime import datetime, timedelta, timezone
 from functools import reduce
-from typing import List, Optional
+from multiprocessing import Queue
+from typing import List, Optional, Tuple
 from mapadroid.db.DbSchemaUpdater import DbSchemaUpdater
 from mapadroid.db.DbPogoProtoSubmit import DbPogoProtoSubmit
 from mapadroid.db.DbSanityCheck import DbSanityCheck
 from mapadroid.db.DbStatsReader import DbStatsReader
 from mapadroid.db.DbStatsSubmit import DbStatsSubmit
 from mapadroid.db.DbWebhookReader import DbWebhookReader
+from mapadroid.db.SpawnpointCache import SpawnpointCache
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.utils.collections import Location
 from mapadroid.utils.s2Helper import S2Helper
@@ -24,16 +26,28 @@ class DbWrapper:
         self._db_exec = db_exec
         self.application_args = args
         self._event_id: int = 1
+        # every process resolves the event once a minute, only changes are reported at info level
+        self._reported_event: Optional[Tuple[int, int]] = None
 
         self.sanity_check: DbSanityCheck = DbSanityCheck(db_exec)
         self.sanity_check.check_all()
         self.supports_apks = self.sanity_check.supports_apks
 
         self.schema_updater: DbSchemaUpdater = DbSchemaUpdater(db_exec, args.dbname)
-        self.proto_submit: DbPogoProtoSubmit = DbPogoProtoSubmit(db_exec)
+        self.spawnpoint_cache: SpawnpointCache = SpawnpointCache(args.spawnpoint_cache_size,
+                                                                 args.spawnpoint_cache_ttl)
+        # changes of the MITM data processors are either logged to the DB or pushed to the webhook worker
+        self.webhook_change_queue: Optional[Queue] = None
+        if args.webhook and args.webhook_push:
+            self.webhook_change_queue = Queue(maxsize=10000)
+        self.proto_submit: DbPogoProtoSubmit = DbPogoProtoSubmit(db_exec, self.spawnpoint_cache,
+                                                                 self.get_current_event,
+                                                                 track_changes=args.webhook,
+                                                                 change_queue=self.webhook_change_queue)
         self.stats_submit: DbStatsSubmit = DbStatsSubmit(db_exec, args)
         self.stats_reader: DbStatsReader = DbStatsReader(db_exec)
-        self.webhook_reader: DbWebhookReader = DbWebhookReader(db_exec, self)
+        self.webhook_reader: DbWebhookReader = DbWebhookReader(db_exec, self, self.spawnpoint_cache,
+                                                               self.webhook_change_queue)
         try:
             self.get_instance_id()
         except Exception:
@@ -41,8 +55,9 @@ class DbWrapper:
             logger.warning('Unable to get instance id from the database.  If this is a new instance and the DB is not '
                            'installed, this message is safe to ignore')
 
-    def set_event_id(self, eventid: int):
+    def set_event_id(self, eventid: int, lure_duration: Optional[int] = None):
         self._event_id = eventid
+        self.proto_submit.set_current_event(eventid, lure_duration)
 
     def close(self, conn, cursor):
         return self._db_exec.close(conn, cursor)
@@ -280,7 +295,7 @@ class DbWrapper:
             return list_of_coords
 
     def quests_from_db(self, ne_lat=None, ne_lon=None, sw_lat=None, sw_lon=None, o_ne_lat=None, o_ne_lon=None,
-                       o_sw_lat=None, o_sw_lon=None, timestamp=None, fence=None):
+                       o_sw_lat=None, o_sw_lon=None, timestamp=None, fence=None, pokestop_ids=None):
         """
         Retrieve all the pokestops valid within the area set by geofence_helper
         :return: numpy array with coords
@@ -300,6 +315,7 @@ class DbWrapper:
         )
 
         query_where = ""
+        args = None
 
         if ne_lat is not None and ne_lon is not None and sw_lat is not None and sw_lon is not None:
             oquery_where = (
@@ -324,7 +340,12 @@ class DbWrapper:
             query_where = query_where + " and ST_CONTAINS(ST_GEOMFROMTEXT( 'POLYGON(( {} ))'), " \
                                         "POINT(pokestop.latitude, pokestop.longitude))".format(str(fence))
 
-        res = self.execute(query + query_where)
+        if pokestop_ids is not None:
+            query_where = query_where + " AND pokestop.pokestop_id IN ({})".format(
+                ", ".join(["%s"] * len(pokestop_ids)))
+            args = tuple(pokestop_ids)
+
+        res = self.execute(query + query_where, args)
 
         for (pokestop_id, latitude, longitude, quest_type, quest_stardust, quest_pokemon_id,
              quest_pokemon_form_id, quest_pokemon_costume_id, quest_reward_type,
@@ -375,6 +396,8 @@ class DbWrapper:
                 "eligible mon IDs specified. Make sure both settings are set in area options: "
                 "min_time_left_seconds and mon_ids_iv ")
             return []
+        elif not eligible_mon_ids:
+            return []
         logger.debug3("Getting mons to be encountered")
         query = (
             "SELECT latitude, longitude, encounter_id, spawnpoint_id, pokemon_id, "
@@ -383,21 +406,26 @@ class DbWrapper:
             "WHERE individual_attack IS NULL AND individual_defense IS NULL AND individual_stamina IS NULL "
             "AND encounter_id != 0 "
             "and (disappear_time BETWEEN DATE_ADD(UTC_TIMESTAMP(), INTERVAL %s SECOND) "
-            "and DATE_ADD(UTC_TIMESTAMP(), INTERVAL 60 MINUTE))"
-            "ORDER BY expire ASC"
-        )
-
-        sql_args = (
-            int(min_time_left_seconds),
-        )
+            "and DATE_ADD(UTC_TIMESTAMP(), INTERVAL 60 MINUTE)) "
+            "AND pokemon_id IN ({}) "
+        ).format(", ".join(["%s"] * len(eligible_mon_ids)))
+        sql_args = [int(min_time_left_seconds)] + [int(mon_id) for mon_id in eligible_mon_ids]
+        if geofence_helper and geofence_helper.geofenced_areas:
+            # the fences are checked below, the bounding box lets the pokemon_to_be_encountered index skip the rest
+            min_lat, min_lon, max_lat, max_lon = geofence_helper.get_polygon_from_fence()
+            query += "AND latitude BETWEEN %s AND %s AND longitude BETWEEN %s AND %s "
+            sql_args += [min_lat, max_lat, min_lon, max_lon]
+        query += "ORDER BY expire ASC"
 
-        results = self.execute(query, sql_args, commit=False)
+        results = self.execute(query, tuple(sql_args), commit=False)
 
-        next_to_encounter = []
+        # the first position of a mon in eligible_mon_ids is its priority
+        mon_priorities = {}
+        for priority, mon_id in enumerate(eligible_mon_ids):
+            mon_priorities.setdefault(int(mon_id), priority)
+        to_be_encountered = []
         for latitude, longitude, encounter_id, spawnpoint_id, pokemon_id, _ in results:
-            if pokemon_id not in eligible_mon_ids:
-                continue
-            elif latitude is None or longitude is None:
+            if latitude is None or longitude is None:
                 logger.warning("lat or lng is none")
                 continue
             elif geofence_helper and not geofence_helper.is_coord_inside_include_geofence(
@@ -406,17 +434,10 @@ class DbWrapper:
                               " fences", latitude, longitude)
                 continue
 
-            next_to_encounter.append((pokemon_id, Location(latitude, longitude), encounter_id))
+            to_be_encountered.append((mon_priorities[pokemon_id], Location(latitude, longitude), encounter_id))
 
-        # now filter by the order of eligible_mon_ids
-        to_be_encountered = []
-        i = 0
-        for mon_prio in eligible_mon_ids:
-            for mon in next_to_encounter:
-                if mon_prio == mon[0]:
-                    to_be_encountered.append((i, mon[1], mon[2]))
-            i += 1
-        return to_be_encountered
+        # sorted is stable, mons of the same priority stay ordered by their expiry
+        return sorted(to_be_encountered, key=lambda mon: mon[0])
 
     def stop_from_db_without_quests(self, geofence_helper):
         logger.debug3("DbWrapper::stop_from_db_without_quests called")
@@ -821,6 +842,7 @@ class DbWrapper:
         )
 
         self.execute(query, commit=True)
+        self.spawnpoint_cache.invalidate(int(spawnpoint_id) for spawnpoint_id in spawnpoint_ids)
         return True
 
     def delete_spawnpoint(self, spawnpoint_id):
@@ -832,6 +854,7 @@ class DbWrapper:
         )
 
         self.execute(query, commit=True)
+        self.spawnpoint_cache.invalidate([int(spawnpoint_id)])
         return True
 
     def convert_spawnpoint(self, spawnpoint_id):
@@ -842,6 +865,7 @@ class DbWrapper:
         )
 
         self.execute(query, commit=True)
+        self.spawnpoint_cache.invalidate([int(spawnpoint_id)])
         return True
 
     def get_all_spawnpoints(self):
@@ -1169,6 +1193,7 @@ class DbWrapper:
             )
             sql_args = (event_id)
             self.execute(query, sql_args, commit=True)
+            self.spawnpoint_cache.invalidate()
         return True
 
     def get_current_event(self):
@@ -1181,12 +1206,15 @@ class DbWrapper:
 
         found = self._db_exec.execute(sql)
 
-        if found and len(found) > 0 and found[0][0]:
-            logger.info("Found an active Event with id {} (Lure Duration: {})", found[0][0], found[0][1])
-            return found[0][0], found[0][1]
+        active = found and len(found) > 0 and found[0][0]
+        event = (found[0][0], found[0][1]) if active else (1, 30)
+        log_level = "INFO" if event != self._reported_event else "DEBUG"
+        self._reported_event = event
+        if active:
+            logger.log(log_level, "Found an active Event with id {} (Lure Duration: {})", event[0], event[1])
         else:
-            logger.info("There is no active event - returning default value (1) (Lure Duration: 30)")
-            return 1, 30
+            logger.log(log_level, "There is no active event - returning default value (1) (Lure Duration: 30)")
+        return event
 
     def check_if_event_is_active(self, eventid):
         logger.debug3("DbWrapper::check_if_event_is_active called")
@@ -1,5 +1,6 @@
 from multiprocessing import Lock, Semaphore
 from multiprocessing.managers import SyncManager
+from typing import Any, List, Tuple
 import mysql
 from mysql.connector import ProgrammingError
 from mysql.connector.pooling import MySQLConnectionPool
@@ -13,6 +14,39 @@ class PooledQuerySyncManager(SyncManager):
     pass
 
 
+class QueryBatch:
+    """
+    Unit of work for a PooledQueryExecutor (or a proxy of it). Statements are collected and executed using a
+    single pooled connection and a single commit once the context is left without an exception.
+    """
+
+    def __init__(self, db_exec):
+        self._db_exec = db_exec
+        self._statements: List[Tuple[str, Any, bool]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._statements = []
+        return False
+
+    def execute(self, sql, args=()):
+        self._statements.append((sql, args, False))
+
+    def executemany(self, sql, args):
+        if args:
+            self._statements.append((sql, args, True))
+
+    def flush(self):
+        if self._statements:
+            statements, self._statements = self._statements, []
+            self._db_exec.execute_batch(statements)
+
+
 class PooledQueryExecutor:
     def __init__(self, host, port, username, password, database, poolsize=1):
         self.host = host
@@ -167,6 +201,44 @@ class PooledQueryExecutor:
             self.close(conn, cursor)
             self._connection_semaphore.release()
 
+    def execute_batch(self, statements: List[Tuple[str, Any, bool]]) -> bool:
+        """
+        Execute a list of (sql, args, many) in a single transaction using one pooled connection.
+        If the transaction fails, the statements are retried one by one in separate transactions so a single
+        broken statement does not discard the rest of the batch.
+        :param statements: list of (sql, args, many) - many determines whether executemany is used
+        :return: True if the batch has been committed in a single transaction
+        """
+        self._connection_semaphore.acquire()
+        conn = self._pool.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            for sql, args, many in statements:
+                if many:
+                    cursor.executemany(sql, args)
+                else:
+                    cursor.execute(sql, args)
+            conn.commit()
+            return True
+        except mysql.connector.Error as err:
+            logger.warning("Failed executing batch of {} statements, executing them separately: {}",
+                           len(statements), str(err))
+            conn.rollback()
+        except Exception as e:
+            logger.error("Unspecified exception in dbWrapper: {}", str(e))
+            conn.rollback()
+        finally:
+            self.close(conn, cursor)
+            self._connection_semaphore.release()
+
+        for sql, args, many in statements:
+            if many:
+                self.executemany(sql, args, commit=True)
+            else:
+                self.execute(sql, args, commit=True)
+        return False
+
     # ===================================================
     # =============== DB Helper Functions ===============
     # ===================================================
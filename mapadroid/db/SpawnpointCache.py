@@ -0,0 +1,123 @@
+import time
+from collections import OrderedDict
+from multiprocessing import Value
+from multiprocessing.context import get_spawning_popen
+from threading import Lock
+from typing import Dict, Iterable, List, Tuple
+from mapadroid.utils.collections import SpawnpointDetails
+from mapadroid.utils.logging import get_logger, LoggerEnums
+
+
+logger = get_logger(LoggerEnums.database)
+
+
+class SpawnpointCache:
+    """
+    In-process LRU cache of trs_spawn rows keyed by spawnpoint id. Entries expire after `ttl` seconds and the
+    least recently used entries are evicted once `maxsize` is exceeded.
+    The cache is not shared across processes - every process (e.g. each MITM data processor) holds its own copy.
+    Invalidations increase a generation counter in shared memory, the copies of child processes drop all of their
+    entries once they see a new generation.
+    """
+
+    def __init__(self, maxsize: int = 50000, ttl: int = 300):
+        self._maxsize: int = maxsize
+        self._ttl: int = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock: Lock = Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._generation = Value('Q', 0)
+        self._seen_generation: int = 0
+
+    def __getstate__(self):
+        # locks cannot be pickled, the receiving process starts with an empty cache of the same dimensions
+        state = {"maxsize": self._maxsize, "ttl": self._ttl}
+        if get_spawning_popen() is not None:
+            # shared memory can only be handed to child processes being started, not e.g. to manager processes
+            state["generation"] = self._generation
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"], state["ttl"])
+        if "generation" in state:
+            self._generation = state["generation"]
+            self._seen_generation = self._generation.value
+
+    def __check_generation(self) -> None:
+        generation = self._generation.value
+        if generation != self._seen_generation:
+            self._entries.clear()
+            self._seen_generation = generation
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize > 0 and self._ttl > 0
+
+    def get_many(self, spawn_ids: Iterable[int]) -> Tuple[Dict[int, SpawnpointDetails], List[int]]:
+        """
+        Returns the cached details of the given spawnpoints as well as a list of spawnpoint ids that could not be
+        served from the cache
+        """
+        found: Dict[int, SpawnpointDetails] = {}
+        missing: List[int] = []
+        if not self.enabled:
+            return found, list(spawn_ids)
+        now = time.time()
+        with self._lock:
+            self.__check_generation()
+            for spawn_id in spawn_ids:
+                entry = self._entries.get(spawn_id, None)
+                if entry is None:
+                    missing.append(spawn_id)
+                    self._misses += 1
+                    continue
+                details, stored_at = entry
+                if now - stored_at > self._ttl:
+                    del self._entries[spawn_id]
+                    missing.append(spawn_id)
+                    self._misses += 1
+                    continue
+                self._entries.move_to_end(spawn_id)
+                found[spawn_id] = details
+                self._hits += 1
+        return found, missing
+
+    def update(self, spawnpoint_details: Dict[int, SpawnpointDetails]) -> None:
+        if not self.enabled or not spawnpoint_details:
+            return
+        now = time.time()
+        with self._lock:
+            self.__check_generation()
+            for spawn_id, details in spawnpoint_details.items():
+                self._entries[spawn_id] = (details, now)
+                self._entries.move_to_end(spawn_id)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, spawn_ids: Iterable[int] = None) -> None:
+        with self._generation.get_lock():
+            self._generation.value += 1
+            generation = self._generation.value
+        with self._lock:
+            if spawn_ids is None or generation - 1 != self._seen_generation:
+                # another process has invalidated entries we don't know about
+                self._entries.clear()
+            else:
+                for spawn_id in spawn_ids:
+                    self._entries.pop(spawn_id, None)
+            self._seen_generation = generation
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            requests = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self._maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_ratio": round(self._hits / requests, 4) if requests > 0 else 0.0
+            }
@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from mapadroid.utils.logging import get_logger, LoggerEnums
+
+
+logger = get_logger(LoggerEnums.database)
+
+
+class WriteBehindBuffer:
+    """
+    Buffers upserts per statement for up to `max_delay` seconds or `max_rows` rows. Rows are deduplicated by their
+    primary key (the first value of the row), the most recent row wins. Every statement is flushed as a single
+    multi-row insert, all statements of a flush share one transaction.
+    """
+
+    def __init__(self, db_exec, max_delay: float = 0.25, max_rows: int = 2000):
+        self._db_exec = db_exec
+        self._max_delay: float = max_delay
+        self._max_rows: int = max_rows
+        self._rows: Dict[str, OrderedDict] = {}
+        self._row_count: int = 0
+        self._first_row_at: Optional[float] = None
+
+        self._rows_received: int = 0
+        self._rows_flushed: int = 0
+        self._flushes: int = 0
+        self._flush_time: float = 0.0
+        self._max_flush_time: float = 0.0
+
+    def add(self, sql: str, args: list) -> None:
+        if not args:
+            return
+        rows = self._rows.setdefault(sql, OrderedDict())
+        for row in args:
+            key = row[0]
+            if key in rows:
+                # keep the newest data, but at the position of the latest update
+                del rows[key]
+            else:
+                self._row_count += 1
+            rows[key] = row
+        self._rows_received += len(args)
+        if self._first_row_at is None:
+            self._first_row_at = time.time()
+
+    def get_timeout(self) -> Optional[float]:
+        """
+        Seconds until the buffer is due to be flushed, None if there is nothing to flush
+        """
+        if self._first_row_at is None:
+            return None
+        return max(0.0, self._first_row_at + self._max_delay - time.time())
+
+    def is_due(self) -> bool:
+        return self._first_row_at is not None and (self._row_count >= self._max_rows or self.get_timeout() == 0)
+
+    def flush(self, force: bool = False) -> bool:
+        """
+        Returns whether the buffered rows have been written
+        """
+        if not force and not self.is_due():
+            return False
+        if self._first_row_at is None:
+            return False
+        statements = [(sql, list(rows.values()), True) for sql, rows in self._rows.items() if rows]
+        row_count = self._row_count
+        self._rows = {}
+        self._row_count = 0
+        self._first_row_at = None
+
+        flush_start = time.time()
+        self._db_exec.execute_batch(statements)
+        flush_time = time.time() - flush_start
+
+        self._flushes += 1
+        self._rows_flushed += row_count
+        self._flush_time += flush_time
+        self._max_flush_time = max(self._max_flush_time, flush_time)
+        logger.debug3("Flushed {} buffered rows of {} statements in {}ms", row_count, len(statements),
+                      round(flush_time * 1000, 1))
+        return True
+
+    def get_stats(self) -> dict:
+        return {
+            "buffered_rows": self._row_count,
+            "rows_received": self._rows_received,
+            "rows_flushed": self._rows_flushed,
+            "flushes": self._flushes,
+            "avg_batch_size": round(self._rows_flushed / self._flushes, 1) if self._flushes else 0,
+            "avg_flush_ms": round(self._flush_time / self._flushes * 1000, 1) if self._flushes else 0,
+            "max_flush_ms": round(self._max_flush_time * 1000, 1)
+        }
@@ -1,4 +1,8 @@
-import sys
+from typing import List
+
+import numpy as np
+
+from mapadroid.geofence.preparedPolygon import PreparedPolygon
 from mapadroid.utils.logging import get_logger, LoggerEnums
 
 
@@ -6,21 +10,12 @@ logger = get_logger(LoggerEnums.system)
 
 # Most of the code is from RocketMap
 # https://github.com/RocketMap/RocketMap
-# Trying to import matplotlib, which is not compatible with all hardware.
-# Matlplotlib is faster for big calculations.
-try:
-    from matplotlib.path import Path
-except ImportError:
-    # Pass as this is an optional requirement. We're going to check later if it
-    # was properly imported and only use it if it's installed.
-    pass
 
 
 class GeofenceHelper:
     def __init__(self, include_geofence, exclude_geofence, fence_name=None):
         self.geofenced_areas = []
         self.excluded_areas = []
-        self.use_matplotlib = 'matplotlib' in sys.modules
         if include_geofence or exclude_geofence:
             self.geofenced_areas = self.parse_geofences_file(
                 include_geofence, excluded=False, fence_fallback=fence_name)
@@ -28,6 +23,10 @@ class GeofenceHelper:
                 exclude_geofence, excluded=True, fence_fallback=fence_name)
             logger.debug2("Loaded {} geofenced and {} excluded areas.", len(self.geofenced_areas),
                           len(self.excluded_areas))
+        self._prepared_geofenced_areas: List[PreparedPolygon] = [
+            PreparedPolygon(area['polygon'], area['name']) for area in self.geofenced_areas]
+        self._prepared_excluded_areas: List[PreparedPolygon] = [
+            PreparedPolygon(area['polygon'], area['name']) for area in self.excluded_areas]
 
     def get_polygon_from_fence(self):
         max_lat, min_lat, max_lon, min_lon = -90, 90, -180, 180
@@ -42,40 +41,48 @@ class GeofenceHelper:
         return min_lat, min_lon, max_lat, max_lon
 
     def is_coord_inside_include_geofence(self, coordinate):
+        lat, lon = float(coordinate[0]), float(coordinate[1])
         # Coordinate is not valid if in one excluded area.
-        if self._is_excluded(coordinate):
-            return False
+        for area in self._prepared_excluded_areas:
+            if area.contains_point(lat, lon):
+                return False
 
         # Coordinate is geofenced if in one geofenced area.
-        if self.geofenced_areas:
-            for va in self.geofenced_areas:
-                if self._in_area(coordinate, va):
+        if self._prepared_geofenced_areas:
+            for area in self._prepared_geofenced_areas:
+                if area.contains_point(lat, lon):
                     return True
         else:
             return True
         return False
 
+    def get_geofenced_mask(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Vectorized geofencing of the given coordinates, returns a boolean mask of the coordinates inside any
+        geofenced area but outside of all excluded areas
+        """
+        if self._prepared_geofenced_areas:
+            mask = np.zeros(len(lats), dtype=bool)
+            for area in self._prepared_geofenced_areas:
+                mask |= area.contains(lats, lons)
+        else:
+            mask = np.ones(len(lats), dtype=bool)
+        for area in self._prepared_excluded_areas:
+            mask &= ~area.contains(lats, lons)
+        return mask
+
     def get_geofenced_coordinates(self, coordinates):
 
         # Import: We are working with n-tuples in some functions be carefull
         # and do not break compatibility
-        logger.debug('Using matplotlib: {}.', self.use_matplotlib)
         logger.debug2('Found {} coordinates to geofence.', len(coordinates))
+        if len(coordinates) == 0:
+            return []
 
-        geofenced_coordinates = []
-        for coord in coordinates:
-            # Coordinate is not valid if in one excluded area.
-            if self._is_excluded(coord):
-                continue
-
-            # Coordinate is geofenced if in one geofenced area.
-            if self.geofenced_areas:
-                for va in self.geofenced_areas:
-                    if self._in_area(coord, va):
-                        geofenced_coordinates.append(coord)
-                        break
-            else:
-                geofenced_coordinates.append(coord)
+        lats = np.fromiter((coord[0] for coord in coordinates), dtype=np.float64, count=len(coordinates))
+        lons = np.fromiter((coord[1] for coord in coordinates), dtype=np.float64, count=len(coordinates))
+        mask = self.get_geofenced_mask(lats, lons)
+        geofenced_coordinates = [coordinates[index] for index in np.flatnonzero(mask)]
 
         logger.debug2("Geofenced to {} coordinates", len(geofenced_coordinates))
         return geofenced_coordinates
@@ -121,33 +128,6 @@ class GeofenceHelper:
 
         return geofences
 
-    def _is_excluded(self, coordinate):
-        for ea in self.excluded_areas:
-            if self._in_area(coordinate, ea):
-                return True
-
-        return False
-
-    def _in_area(self, coordinate, area):
-        point = {'lat': coordinate[0], 'lon': coordinate[1]}
-        polygon = area['polygon']
-        if self.use_matplotlib:
-            return self.is_point_in_polygon_matplotlib(point, polygon)
-        else:
-            return self.is_point_in_polygon_custom(point, polygon)
-
-    @staticmethod
-    def is_point_in_polygon_matplotlib(point, polygon):
-        point_tuple = (point['lat'], point['lon'])
-        polygons = []
-        for coord in polygon:
-            coord_tuple = (coord['lat'], coord['lon'])
-            polygons.append(coord_tuple)
-
-        polygons.append(polygons[0])
-        path = Path(polygons)
-        return path.contains_point(point_tuple)
-
     @staticmethod
     def is_point_in_polygon_custom(point, polygon):
         # Initialize first coordinate as default.
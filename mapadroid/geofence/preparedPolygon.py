@@ -0,0 +1,142 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+CELL_OUTSIDE = 0
+CELL_INSIDE = 1
+CELL_BOUNDARY = 2
+
+
+class PreparedPolygon:
+    """
+    Polygon prepared for vectorized point in polygon tests. Bounding box and edges are computed once, points are
+    tested as NumPy arrays. The results are identical to GeofenceHelper.is_point_in_polygon_custom.
+    The bounding box is divided into a grid of cells. Cells not touched by any edge are entirely inside or outside
+    of the polygon and answer immediately, only points in cells crossed by an edge are tested against the edges.
+    """
+
+    def __init__(self, polygon: List[dict], name: str = None):
+        self.name = name
+        lats = np.array([coord['lat'] for coord in polygon], dtype=np.float64)
+        lons = np.array([coord['lon'] for coord in polygon], dtype=np.float64)
+        if len(polygon) > 0:
+            self.min_lat, self.max_lat = float(lats.min()), float(lats.max())
+            self.min_lon, self.max_lon = float(lons.min()), float(lons.max())
+        else:
+            # nothing is inside an empty polygon, NaN fails every comparison
+            self.min_lat = self.max_lat = self.min_lon = self.max_lon = float("nan")
+
+        # edge i goes from vertex i to vertex i + 1, the last one closes the polygon
+        lats_next, lons_next = np.roll(lats, -1), np.roll(lons, -1)
+        # edges parallel to a meridian are never crossed by the ray
+        crossable = lons != lons_next
+        self._lat1 = lats[crossable]
+        self._lon1 = lons[crossable]
+        self._dlat = (lats_next - lats)[crossable]
+        self._dlon = (lons_next - lons)[crossable]
+        self._edge_min_lon = np.minimum(lons, lons_next)[crossable]
+        self._edge_max_lon = np.maximum(lons, lons_next)[crossable]
+        self._edge_max_lat = np.maximum(lats, lats_next)[crossable]
+
+        self._grid_size: int = 1
+        self._cell_lat: float = 1.0
+        self._cell_lon: float = 1.0
+        self._grid: np.ndarray = np.full((1, 1), CELL_OUTSIDE, dtype=np.int8)
+        if len(polygon) > 0:
+            self.__build_grid(lats, lons, lats_next, lons_next)
+
+    def __build_grid(self, lats: np.ndarray, lons: np.ndarray, lats_next: np.ndarray, lons_next: np.ndarray):
+        # roughly four cells per edge along each axis keeps the share of boundary cells small
+        self._grid_size = min(256, max(8, 4 * int(math.sqrt(len(lats)))))
+        # a degenerated bounding box results in a single row or column
+        self._cell_lat = (self.max_lat - self.min_lat) / self._grid_size or 1.0
+        self._cell_lon = (self.max_lon - self.min_lon) / self._grid_size or 1.0
+        self._grid = np.full((self._grid_size, self._grid_size), CELL_OUTSIDE, dtype=np.int8)
+
+        # mark every cell touched by an edge (vertical ones included), edges are widened by a fraction of a cell
+        # to be safe from rounding issues at cell borders
+        margin_lat, margin_lon = self._cell_lat * 1e-6, self._cell_lon * 1e-6
+        for lat1, lon1, lat2, lon2 in zip(lats, lons, lats_next, lons_next):
+            first_col = self.__to_index(min(lon1, lon2) - margin_lon, self.min_lon, self._cell_lon)
+            last_col = self.__to_index(max(lon1, lon2) + margin_lon, self.min_lon, self._cell_lon)
+            for col in range(first_col, last_col + 1):
+                # latitude range of the edge within the column
+                if lon1 == lon2:
+                    slab_lat1, slab_lat2 = lat1, lat2
+                else:
+                    col_min_lon = max(self.min_lon + col * self._cell_lon, min(lon1, lon2))
+                    col_max_lon = min(self.min_lon + (col + 1) * self._cell_lon, max(lon1, lon2))
+                    slab_lat1 = lat1 + (col_min_lon - lon1) * (lat2 - lat1) / (lon2 - lon1)
+                    slab_lat2 = lat1 + (col_max_lon - lon1) * (lat2 - lat1) / (lon2 - lon1)
+                first_row = self.__to_index(min(slab_lat1, slab_lat2) - margin_lat, self.min_lat, self._cell_lat)
+                last_row = self.__to_index(max(slab_lat1, slab_lat2) + margin_lat, self.min_lat, self._cell_lat)
+                self._grid[first_row:last_row + 1, col] = CELL_BOUNDARY
+
+        # cells without edges are either inside or outside entirely, their center tells which
+        rows, cols = np.nonzero(self._grid != CELL_BOUNDARY)
+        center_lats = self.min_lat + (rows + 0.5) * self._cell_lat
+        center_lons = self.min_lon + (cols + 0.5) * self._cell_lon
+        inside = self._contains_exact(center_lats, center_lons)
+        self._grid[rows[inside], cols[inside]] = CELL_INSIDE
+
+    def __to_index(self, value: float, minimum: float, cell: float) -> int:
+        return min(self._grid_size - 1, max(0, int(math.floor((value - minimum) / cell))))
+
+    def _get_cells(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.clip(np.floor((lats - self.min_lat) / self._cell_lat), 0, self._grid_size - 1).astype(np.intp)
+        cols = np.clip(np.floor((lons - self.min_lon) / self._cell_lon), 0, self._grid_size - 1).astype(np.intp)
+        return rows, cols
+
+    def get_boundary_share(self) -> float:
+        """
+        Share of the grid cells requiring an exact test of the points
+        """
+        return float(np.count_nonzero(self._grid == CELL_BOUNDARY)) / self._grid.size
+
+    def bbox_mask(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        return (lats >= self.min_lat) & (lats <= self.max_lat) & (lons >= self.min_lon) & (lons <= self.max_lon)
+
+    def contains_point(self, lat: float, lon: float) -> bool:
+        if not (self.min_lat <= lat <= self.max_lat and self.min_lon <= lon <= self.max_lon):
+            return False
+        cell = self._grid[self.__to_index(lat, self.min_lat, self._cell_lat),
+                          self.__to_index(lon, self.min_lon, self._cell_lon)]
+        if cell != CELL_BOUNDARY:
+            return cell == CELL_INSIDE
+        return self._contains_point_exact(lat, lon)
+
+    def contains(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        Returns a boolean mask of the points inside the polygon
+        """
+        result = np.zeros(len(lats), dtype=bool)
+        candidates = np.flatnonzero(self.bbox_mask(lats, lons))
+        if len(candidates) == 0:
+            return result
+        rows, cols = self._get_cells(lats[candidates], lons[candidates])
+        cells = self._grid[rows, cols]
+        result[candidates[cells == CELL_INSIDE]] = True
+        boundary = candidates[cells == CELL_BOUNDARY]
+        if len(boundary) > 0:
+            result[boundary] = self._contains_exact(lats[boundary], lons[boundary])
+        return result
+
+    def _contains_point_exact(self, lat: float, lon: float) -> bool:
+        crossing = ((lon > self._edge_min_lon) & (lon <= self._edge_max_lon) & (lat <= self._edge_max_lat) &
+                    (lat <= (lon - self._lon1) * self._dlat / self._dlon + self._lat1))
+        return bool(np.count_nonzero(crossing) % 2)
+
+    def _contains_exact(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        if len(lats) < len(self._lat1):
+            return np.array([self._contains_point_exact(lat, lon) for lat, lon in zip(lats, lons)], dtype=bool)
+
+        inside = np.zeros(len(lats), dtype=bool)
+        # iterate the edges and test all points at once, memory stays linear in the amount of points.
+        # Horizontal edges need no special treatment, the intersection equals lat1 which is covered by edge_max_lat
+        for lat1, lon1, dlat, dlon, edge_min_lon, edge_max_lon, edge_max_lat in zip(
+                self._lat1, self._lon1, self._dlat, self._dlon, self._edge_min_lon, self._edge_max_lon,
+                self._edge_max_lat):
+            inside ^= ((lons > edge_min_lon) & (lons <= edge_max_lon) & (lats <= edge_max_lat) &
+                       (lats <= (lons - lon1) * dlat / dlon + lat1))
+        return inside
@@ -39,6 +39,15 @@ class APIArea(ResourceHandler):
                         # Do not allow another recalculation if one is already running.  This value is reset on startup
                         # so it will not be stuck in this state
                         return ('Recalc is already running on this Area', 422)
+                elif call == 'cancel_recalculation':
+                    resource = self._data_manager.get_resource('area', identifier=identifier)
+                    if resource.recalc_status == 0:
+                        return ('No recalc is running on this Area', 422)
+                    if self._mapping_manager.cancel_route_calc(resource['routecalc']):
+                        return (None, 204)
+                    else:
+                        # The route is calculated in the thread requesting it and cannot be cancelled
+                        return (None, 409)
                 else:
                     # RPC not implemented
                     return (call, 501)
@@ -170,11 +170,15 @@ class MADminConfig(object):
     @logger.catch
     @auth_required
     def recalc_status(self):
-        recalc = []
+        recalc = {}
+        progress = {}
+        for job in self._mapping_mananger.get_route_calc_jobs():
+            if job["status"] == "running":
+                progress[str(job["identifier"])] = job["progress"]
         areas = self._data_manager.get_root_resource('area')
         for area_id, area in areas.items():
             if area.recalc_status:
-                recalc.append(area_id)
+                recalc[area_id] = progress.get(str(area['routecalc']), None)
         return Response(json.dumps(recalc), mimetype='application/json')
 
     @logger.catch
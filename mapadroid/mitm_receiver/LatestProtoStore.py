@@ -0,0 +1,129 @@
+import time
+from multiprocessing import Lock, RawArray
+from typing import Dict, Optional
+
+from mapadroid.mitm_receiver.MitmDataRouter import KNOWN_PROTO_TYPES
+from mapadroid.utils.collections import Location
+from mapadroid.utils.logging import get_logger, LoggerEnums
+
+logger = get_logger(LoggerEnums.mitm)
+
+# fields of a slot, followed by the timestamp of each proto type
+FIELD_SEQUENCE = 0
+FIELD_TIMESTAMP_LAST_DATA = 1
+FIELD_TIMESTAMP_RECEIVER = 2
+FIELD_LAT = 3
+FIELD_LNG = 4
+FIELD_PROTO_TIMESTAMPS = 5
+
+ORIGIN_MAX_LENGTH = 64
+
+
+class LatestProtoStore:
+    """
+    Keeps the metadata of the latest protos received per origin (timestamps, location and proto types) in shared
+    memory. The MITMReceiver writes the store when protos arrive, workers read it without a round trip to the
+    MitmMapper process. The payloads themselves remain in the MitmMapper and are to be requested per proto type.
+    Readers do not lock once the slot of an origin is known, every slot is guarded by a sequence number that is odd
+    while the slot is written.
+    """
+
+    def __init__(self, max_origins: int = 1024):
+        self._max_origins: int = max_origins
+        self._proto_types = sorted(KNOWN_PROTO_TYPES)
+        self._proto_index: Dict[int, int] = {proto_type: FIELD_PROTO_TIMESTAMPS + i
+                                             for i, proto_type in enumerate(self._proto_types)}
+        self._slot_size: int = FIELD_PROTO_TIMESTAMPS + len(self._proto_types)
+        self._values = RawArray('d', max_origins * self._slot_size)
+        self._origins = RawArray('c', max_origins * ORIGIN_MAX_LENGTH)
+        self._write_lock = Lock()
+        # slots are never released, the mapping is cached per process
+        self._slots: Dict[str, int] = {}
+
+    def __get_slot(self, origin: str) -> Optional[int]:
+        slot = self._slots.get(origin, None)
+        if slot is not None:
+            return slot
+        # origins are written under the lock, scanning them without it could cache a partially written origin
+        with self._write_lock:
+            return self.__find_slot(origin)
+
+    def __find_slot(self, origin: str) -> Optional[int]:
+        slot = self._slots.get(origin, None)
+        if slot is not None:
+            return slot
+        encoded_origin = origin.encode()
+        for slot in range(self._max_origins):
+            offset = slot * ORIGIN_MAX_LENGTH
+            stored_origin = self._origins[offset:offset + ORIGIN_MAX_LENGTH].rstrip(b"\x00")
+            if not stored_origin:
+                break
+            self._slots[stored_origin.decode()] = slot
+            if stored_origin == encoded_origin:
+                return slot
+        return None
+
+    def __add_slot(self, origin: str) -> Optional[int]:
+        encoded_origin = origin.encode()
+        if not encoded_origin or len(encoded_origin) > ORIGIN_MAX_LENGTH:
+            logger.warning("Origin {} cannot be stored in the latest proto store", origin)
+            return None
+        for slot in range(self._max_origins):
+            offset = slot * ORIGIN_MAX_LENGTH
+            if self._origins[offset] == b"\x00":
+                self._origins[offset:offset + len(encoded_origin)] = encoded_origin
+                self._slots[origin] = slot
+                return slot
+        logger.warning("Latest proto store is full, {} will be served by the MitmMapper", origin)
+        return None
+
+    def update(self, origin: str, proto_type: int, timestamp_received_raw: float,
+               timestamp_received_receiver: float, location: Location) -> None:
+        proto_index = self._proto_index.get(proto_type, None)
+        if proto_index is None:
+            return
+        with self._write_lock:
+            slot = self.__find_slot(origin)
+            if slot is None:
+                slot = self.__add_slot(origin)
+                if slot is None:
+                    return
+            offset = slot * self._slot_size
+            self._values[offset + FIELD_SEQUENCE] += 1
+            self._values[offset + FIELD_TIMESTAMP_LAST_DATA] = timestamp_received_raw
+            self._values[offset + FIELD_TIMESTAMP_RECEIVER] = timestamp_received_receiver
+            self._values[offset + FIELD_LAT] = location.lat
+            self._values[offset + FIELD_LNG] = location.lng
+            self._values[offset + proto_index] = timestamp_received_raw
+            self._values[offset + FIELD_SEQUENCE] += 1
+
+    def get(self, origin: str) -> Optional[dict]:
+        """
+        Returns the metadata of the origin in the layout of MitmMapper.request_latest, i.e. proto types mapped to
+        {"timestamp": ...} along with location, timestamp_last_data and timestamp_receiver. Payloads are not included.
+        None is returned if nothing has been stored for the origin.
+        """
+        slot = self.__get_slot(origin)
+        if slot is None:
+            return None
+        offset = slot * self._slot_size
+        while True:
+            sequence = self._values[offset + FIELD_SEQUENCE]
+            if sequence % 2 == 1:
+                # slot is being written right now
+                time.sleep(0)
+                continue
+            values = self._values[offset:offset + self._slot_size]
+            if self._values[offset + FIELD_SEQUENCE] == sequence:
+                break
+        if values[FIELD_SEQUENCE] == 0:
+            return None
+        latest = {
+            "location": Location(values[FIELD_LAT], values[FIELD_LNG]),
+            "timestamp_last_data": values[FIELD_TIMESTAMP_LAST_DATA],
+            "timestamp_receiver": values[FIELD_TIMESTAMP_RECEIVER]
+        }
+        for proto_type, proto_index in self._proto_index.items():
+            if values[proto_index] > 0:
+                latest[proto_type] = {"timestamp": values[proto_index]}
+        return latest
@@ -5,12 +5,14 @@ import socket
 import sys
 import time
 import io
-from multiprocessing import JoinableQueue, Process
+from multiprocessing import Process
 from typing import Any, Dict, Union, Optional
 
 from flask import Flask, Response, request, send_file
 from gevent.pywsgi import WSGIServer
 
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
+from mapadroid.mitm_receiver.MitmDataRouter import MitmDataRouter
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.utils import MappingManager
 from mapadroid.utils.authHelper import check_auth
@@ -161,8 +163,9 @@ class EndpointAction(object):
 
 class MITMReceiver(Process):
     def __init__(self, listen_ip, listen_port, mitm_mapper, args_passed, mapping_manager: MappingManager,
-                 db_wrapper, data_manager, storage_obj, data_queue: JoinableQueue,
-                 name=None, enable_configmode: Optional[bool] = False):
+                 db_wrapper, data_manager, storage_obj, data_queue: MitmDataRouter,
+                 name=None, enable_configmode: Optional[bool] = False,
+                 latest_proto_store: Optional[LatestProtoStore] = None):
         Process.__init__(self, name=name)
         self.__application_args = args_passed
         self.__mapping_manager = mapping_manager
@@ -173,7 +176,8 @@ class MITMReceiver(Process):
         self.__hopper_mutex = RLock()
         self._db_wrapper = db_wrapper
         self.__storage_obj = storage_obj
-        self._data_queue: JoinableQueue = data_queue
+        self._data_queue: MitmDataRouter = data_queue
+        self.__latest_proto_store: Optional[LatestProtoStore] = latest_proto_store
         self.app = Flask("MITMReceiver")
         self.add_endpoint(endpoint='/get_addresses/', endpoint_name='get_addresses/',
                           handler=self.get_addresses,
@@ -223,8 +227,8 @@ class MITMReceiver(Process):
 
     def shutdown(self):
         logger.info("MITMReceiver stop called...")
-        for i in range(self.__application_args.mitmreceiver_data_workers):
-            self._add_to_queue(None)
+        # the router passes the stop signal to every data processor
+        self._add_to_queue(None)
 
     def run(self):
         httpsrv = WSGIServer((self.__listen_ip, int(
@@ -280,9 +284,14 @@ class MITMReceiver(Process):
         if (location_of_data.lat > 90 or location_of_data.lat < -90 or
                 location_of_data.lng > 180 or location_of_data.lng < -180):
             location_of_data: Location = Location(0, 0)
-        self.__mitm_mapper.update_latest(origin, timestamp_received_raw=timestamp,
-                                         timestamp_received_receiver=time.time(), key=proto_type, values_dict=data,
-                                         location=location_of_data)
+        timestamp_received_receiver: float = time.time()
+        updated = self.__mitm_mapper.update_latest(origin, timestamp_received_raw=timestamp,
+                                                   timestamp_received_receiver=timestamp_received_receiver,
+                                                   key=proto_type, values_dict=data, location=location_of_data)
+        if updated and self.__latest_proto_store is not None:
+            # only publish the metadata once the payload can be requested from the mapper
+            self.__latest_proto_store.update(origin, proto_type, timestamp, timestamp_received_receiver,
+                                             location_of_data)
         origin_logger.debug2("Placing data received to data_queue")
         self._add_to_queue((timestamp, data, origin))
 
@@ -1,8 +1,10 @@
+import sys
 import time
 import threading
-from multiprocessing import JoinableQueue
+from typing import Dict, List, Tuple
 
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.mitm_receiver.MitmDataRouter import MitmDataRouter, MitmDataShard, parse_shard_config
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.mitm_receiver.SerializedMitmDataProcessor import SerializedMitmDataProcessor
 from mapadroid.utils.logging import get_logger, LoggerEnums
@@ -14,49 +16,80 @@ class MitmDataProcessorManager():
     def __init__(self, args, mitm_mapper: MitmMapper, db_wrapper: DbWrapper):
         self._worker_threads = []
         self._args = args
-        self._mitm_data_queue: JoinableQueue = JoinableQueue()
         self._mitm_mapper: MitmMapper = mitm_mapper
         self._db_wrapper: DbWrapper = db_wrapper
         self._queue_check_thread = None
         self._stop_queue_check_thread = False
 
+        try:
+            shard_config = parse_shard_config(self._args.mitmreceiver_data_shards,
+                                              self._args.mitmreceiver_data_workers)
+        except ValueError as e:
+            logger.error("Invalid mitmreceiver_data_shards configuration: {}", e)
+            sys.exit(1)
+        self._mitm_data_router: MitmDataRouter = MitmDataRouter(
+            [MitmDataShard(name, proto_types, workers) for name, proto_types, workers in shard_config])
+        self._last_shard_stats: Dict[str, Tuple[float, float, float]] = {}
+
         self._queue_check_thread = threading.Thread(target=self._queue_size_check, args=())
         self._queue_check_thread.daemon = True
         self._queue_check_thread.start()
 
-    def get_queue(self):
-        return self._mitm_data_queue
+    def get_queue(self) -> MitmDataRouter:
+        return self._mitm_data_router
 
     def get_queue_size(self):
-        # for whatever reason, there's no actual implementation of qsize()
-        # on MacOS. There are better solutions for this but c'mon, who is
-        # running MAD on MacOS anyway?
-        try:
-            item_count = self._mitm_data_queue.qsize()
-        except NotImplementedError:
-            item_count = 0
+        return self._mitm_data_router.qsize()
 
-        return item_count
+    def get_shard_stats(self) -> List[dict]:
+        """
+        Returns queue depth and processing latencies of every shard since the previous call
+        """
+        shard_stats = []
+        for shard in self._mitm_data_router.shards:
+            processed, processing_time, waiting_time = shard.get_stats()
+            last_processed, last_processing_time, last_waiting_time = self._last_shard_stats.get(
+                shard.name, (0.0, 0.0, 0.0))
+            self._last_shard_stats[shard.name] = (processed, processing_time, waiting_time)
+            processed_since = processed - last_processed
+            shard_stats.append({
+                "shard": shard.name,
+                "workers": len(shard.queues),
+                "queue_size": shard.get_queue_size(),
+                "processed": int(processed_since),
+                "avg_processing_ms": round(
+                    (processing_time - last_processing_time) / processed_since * 1000, 1) if processed_since else 0,
+                "avg_waiting_ms": round(
+                    (waiting_time - last_waiting_time) / processed_since * 1000, 1) if processed_since else 0
+            })
+        return shard_stats
 
     def _queue_size_check(self):
         while not self._stop_queue_check_thread:
-            item_count = self.get_queue_size()
-            if item_count > 50:
-                logger.warning("MITM data processing workers are falling behind! Queue length: {}", item_count)
+            for stats in self.get_shard_stats():
+                if stats["queue_size"] > 50:
+                    logger.warning("MITM data processing workers of shard {} are falling behind! Queue length: {}, "
+                                   "{} processed with avg. {}ms processing time and {}ms waiting time",
+                                   stats["shard"], stats["queue_size"], stats["processed"],
+                                   stats["avg_processing_ms"], stats["avg_waiting_ms"])
+                else:
+                    logger.debug2("MITM data processing shard {}: {}", stats["shard"], stats)
 
             time.sleep(3)
 
     def launch_processors(self):
-        for i in range(self._args.mitmreceiver_data_workers):
-            data_processor: SerializedMitmDataProcessor = SerializedMitmDataProcessor(
-                self._mitm_data_queue,
-                self._args,
-                self._mitm_mapper,
-                self._db_wrapper,
-                name="SerialiedMitmDataProcessor-%s" % str(i))
+        for shard in self._mitm_data_router.shards:
+            for i, queue in enumerate(shard.queues):
+                data_processor: SerializedMitmDataProcessor = SerializedMitmDataProcessor(
+                    queue,
+                    self._args,
+                    self._mitm_mapper,
+                    self._db_wrapper,
+                    name="SerialiedMitmDataProcessor-%s-%s" % (shard.name, str(i)),
+                    stats=shard.stats[i])
 
-            data_processor.start()
-            self._worker_threads.append(data_processor)
+                data_processor.start()
+                self._worker_threads.append(data_processor)
 
     def shutdown(self):
         self._stop_queue_check_thread = True
@@ -67,5 +100,5 @@ class MitmDataProcessorManager():
             worker_thread.join()
         logger.info("Stopped MITM datap rocessors")
 
-        if self._mitm_data_queue is not None:
-            self._mitm_data_queue.close()
+        for shard in self._mitm_data_router.shards:
+            shard.close()
@@ -0,0 +1,121 @@
+import time
+import zlib
+from multiprocessing import Array, JoinableQueue
+from typing import Dict, List, Optional, Set, Tuple
+from mapadroid.utils.logging import get_logger, LoggerEnums
+
+logger = get_logger(LoggerEnums.mitm)
+
+# proto types processed by the MITM data processors
+KNOWN_PROTO_TYPES: Set[int] = {106, 102, 101, 104, 156, 4}
+
+# indices of the per-worker stats array
+STAT_PROCESSED = 0
+STAT_PROCESSING_TIME = 1
+STAT_WAITING_TIME = 2
+
+
+def parse_shard_config(shard_config: str, default_workers: int) -> List[Tuple[str, Optional[Set[int]], int]]:
+    """
+    Parses the shard configuration, e.g. "106:4;102:2;101,104,156,4:1", into a list of
+    (name, proto types, worker count). Proto types not mentioned are handled by a default shard
+    using `default_workers` workers. An empty configuration results in a single default shard.
+    Raises ValueError on invalid configurations.
+    """
+    shards: List[Tuple[str, Optional[Set[int]], int]] = []
+    assigned_types: Set[int] = set()
+    for shard_def in [part.strip() for part in shard_config.split(";") if part.strip()]:
+        if ":" not in shard_def:
+            raise ValueError("Shard '%s' is missing the worker count (<types>:<workers>)" % shard_def)
+        types_def, workers_def = shard_def.rsplit(":", 1)
+        proto_types = set(int(proto_type) for proto_type in types_def.split(",") if proto_type.strip())
+        workers = int(workers_def)
+        unknown_types = proto_types - KNOWN_PROTO_TYPES
+        if unknown_types:
+            raise ValueError("Unknown proto types in shard '%s': %s" % (shard_def, unknown_types))
+        if proto_types & assigned_types:
+            raise ValueError("Proto types of shard '%s' are assigned more than once" % shard_def)
+        if not proto_types or workers < 1:
+            raise ValueError("Shard '%s' requires at least one proto type and one worker" % shard_def)
+        assigned_types |= proto_types
+        shards.append((",".join(str(proto_type) for proto_type in sorted(proto_types)), proto_types, workers))
+    if assigned_types != KNOWN_PROTO_TYPES:
+        shards.append(("default", None, max(default_workers, 1)))
+    return shards
+
+
+class MitmDataShard:
+    def __init__(self, name: str, proto_types: Optional[Set[int]], workers: int):
+        self.name: str = name
+        # None marks the shard handling every proto type not assigned elsewhere
+        self.proto_types: Optional[Set[int]] = proto_types
+        self.queues: List[JoinableQueue] = [JoinableQueue() for _ in range(workers)]
+        self.stats: List[Array] = [Array('d', 3) for _ in range(workers)]
+
+    def get_queue_for_origin(self, origin: str) -> JoinableQueue:
+        # crc32 rather than hash() to stay consistent across processes
+        return self.queues[zlib.crc32(origin.encode()) % len(self.queues)]
+
+    def get_queue_size(self) -> int:
+        # for whatever reason, there's no actual implementation of qsize()
+        # on MacOS. There are better solutions for this but c'mon, who is
+        # running MAD on MacOS anyway?
+        try:
+            return sum(queue.qsize() for queue in self.queues)
+        except NotImplementedError:
+            return 0
+
+    def get_stats(self) -> Tuple[float, float, float]:
+        processed, processing_time, waiting_time = 0.0, 0.0, 0.0
+        for worker_stats in self.stats:
+            with worker_stats.get_lock():
+                processed += worker_stats[STAT_PROCESSED]
+                processing_time += worker_stats[STAT_PROCESSING_TIME]
+                waiting_time += worker_stats[STAT_WAITING_TIME]
+        return processed, processing_time, waiting_time
+
+    def close(self):
+        for queue in self.queues:
+            queue.close()
+
+
+class MitmDataRouter:
+    """
+    Routes received protos to the queue of the worker in charge. Protos are sharded by their type and, within a
+    shard, by the origin so that the data of a single device is always processed in order by the same worker.
+    """
+
+    def __init__(self, shards: List[MitmDataShard]):
+        self._shards: List[MitmDataShard] = shards
+        self._shard_by_type: Dict[int, MitmDataShard] = {}
+        self._default_shard: Optional[MitmDataShard] = None
+        for shard in shards:
+            if shard.proto_types is None:
+                self._default_shard = shard
+                continue
+            for proto_type in shard.proto_types:
+                self._shard_by_type[proto_type] = shard
+
+    @property
+    def shards(self) -> List[MitmDataShard]:
+        return self._shards
+
+    def put(self, item: Optional[tuple]) -> None:
+        """
+        Places (timestamp, data, origin) in the queue of the responsible worker. None is passed to every worker
+        to signal a shutdown.
+        """
+        if item is None:
+            for shard in self._shards:
+                for queue in shard.queues:
+                    queue.put(None)
+            return
+        timestamp, data, origin = item
+        shard = self._shard_by_type.get(data.get("type", None), self._default_shard)
+        if shard is None:
+            logger.warning("No MITM data processor shard configured for proto type {}", data.get("type", None))
+            return
+        shard.get_queue_for_origin(origin).put((timestamp, data, origin, time.time()))
+
+    def qsize(self) -> int:
+        return sum(shard.get_queue_size() for shard in self._shards)
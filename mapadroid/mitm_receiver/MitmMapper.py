@@ -2,8 +2,8 @@ import time
 from multiprocessing import Lock, Queue
 from multiprocessing.managers import SyncManager
 from queue import Empty
-from threading import Thread, Event
-from typing import Dict
+from threading import Condition, Thread, Event
+from typing import Dict, List, Optional
 
 from mapadroid.db.DbStatsSubmit import DbStatsSubmit
 from mapadroid.mitm_receiver.PlayerStats import PlayerStats
@@ -23,6 +23,8 @@ class MitmMapper(object):
         self.__mapping = {}
         self.__playerstats: Dict[str, PlayerStats] = {}
         self.__mapping_mutex = Lock()
+        # notified whenever data of the origin has been updated, see wait_for_proto
+        self.__update_conditions: Dict[str, Condition] = {}
         self.__mapping_manager: MappingManager = mapping_manager
         self.__injected = {}
         self.__last_cellsid = {}
@@ -131,17 +133,33 @@ class MitmMapper(object):
         with self.__mapping_mutex:
             result = None
             retrieved = self.__mapping.get(origin, None)
-            if retrieved is not None:
+            if retrieved is not None and key is None:
                 # copy in case references are overwritten... who knows
                 # TODO: double check what python does in the background
-                retrieved = retrieved.copy()
-            if key is None:
-                result = retrieved
+                result = retrieved.copy()
             elif retrieved is not None:
+                # entries are replaced rather than modified by update_latest, no need to copy the entire mapping
                 result = retrieved.get(key, None)
         origin_logger.debug2("Request latest done")
         return result
 
+    def request_latest_metadata(self, origin):
+        """
+        Returns the latest data of the origin like request_latest without the payloads, i.e. every key is mapped to
+        {"timestamp": ...} only. Payloads are to be requested by passing the key to request_latest.
+        """
+        with self.__mapping_mutex:
+            retrieved = self.__mapping.get(origin, None)
+            if retrieved is None:
+                return None
+            metadata = {}
+            for key, value in retrieved.items():
+                if isinstance(value, dict):
+                    metadata[key] = {"timestamp": value.get("timestamp", 0)}
+                else:
+                    metadata[key] = value
+        return metadata
+
     # origin, method, data, timestamp
     def update_latest(self, origin: str, key: str, values_dict, timestamp_received_raw: float = None,
                       timestamp_received_receiver: float = None, location: Location = None):
@@ -172,9 +190,36 @@ class MitmMapper(object):
                 updated = True
             else:
                 origin_logger.warning("Not updating timestamp since origin is unknown")
+        if updated:
+            update_condition = self.__get_update_condition(origin)
+            with update_condition:
+                update_condition.notify_all()
         origin_logger.debug2("Done updating proto {}", key)
         return updated
 
+    def __get_update_condition(self, origin: str) -> Condition:
+        return self.__update_conditions.setdefault(origin, Condition())
+
+    def wait_for_proto(self, origin: str, proto_types: List[int], newer_than: float,
+                       timeout: float) -> Optional[dict]:
+        """
+        Blocks until a proto of one of the given types with a timestamp newer than `newer_than` has been received
+        for the origin or `timeout` seconds passed.
+        Returns the metadata of the origin as returned by request_latest_metadata or None in case of a timeout.
+        """
+        deadline = time.time() + timeout
+        update_condition = self.__get_update_condition(origin)
+        with update_condition:
+            while True:
+                metadata = self.request_latest_metadata(origin)
+                if metadata is not None and any(metadata.get(proto_type, {}).get("timestamp", 0) > newer_than
+                                                for proto_type in proto_types):
+                    return metadata
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                update_condition.wait(remaining)
+
     def set_injection_status(self, origin, status=True):
         origin_logger = get_origin_logger(logger, origin=origin)
         if origin not in self.__injected or not self.__injected[origin] and status is True:
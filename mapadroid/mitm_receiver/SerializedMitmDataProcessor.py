@@ -1,7 +1,11 @@
+import time
 from datetime import datetime
-from multiprocessing import Queue, Process
+from multiprocessing import Array, Queue, Process
+from queue import Empty
+from typing import Optional
 from mapadroid.db.DbPogoProtoSubmit import DbPogoProtoSubmit
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.mitm_receiver.MitmDataRouter import STAT_PROCESSED, STAT_PROCESSING_TIME, STAT_WAITING_TIME
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.utils.logging import get_logger, LoggerEnums, get_origin_logger
 
@@ -10,27 +14,61 @@ logger = get_logger(LoggerEnums.mitm)
 
 class SerializedMitmDataProcessor(Process):
     def __init__(self, multi_proc_queue: Queue, application_args, mitm_mapper: MitmMapper,
-                 db_wrapper: DbWrapper, name=None):
+                 db_wrapper: DbWrapper, name=None, stats: Optional[Array] = None):
         Process.__init__(self, name=name)
         self.__queue: Queue = multi_proc_queue
         self.__db_submit: DbPogoProtoSubmit = db_wrapper.proto_submit
         self.__application_args = application_args
         self.__mitm_mapper: MitmMapper = mitm_mapper
+        self.__last_db_stats_log: float = 0
+        self.__stats: Optional[Array] = stats
 
     def run(self):
         logger.info("Starting serialized MITM data processor")
+        if self.__application_args.mitmreceiver_write_behind_delay > 0:
+            self.__db_submit.enable_write_behind(self.__application_args.mitmreceiver_write_behind_delay / 1000,
+                                                 self.__application_args.mitmreceiver_write_behind_rows)
         while True:
             try:
-                item = self.__queue.get()
+                try:
+                    item = self.__queue.get(timeout=self.__db_submit.get_write_behind_timeout())
+                except Empty:
+                    self.__db_submit.flush_write_behind()
+                    continue
                 if item is None:
                     logger.info("Received signal to stop MITM data processor")
+                    self.__db_submit.flush_write_behind(force=True)
                     break
+                processing_start = time.time()
                 self.process_data(item[0], item[1], item[2])
                 self.__queue.task_done()
+                self.__update_stats(item, processing_start)
+                self.__db_submit.flush_write_behind()
+                self.__log_db_stats()
             except KeyboardInterrupt:
                 logger.info("Received keyboard interrupt, stopping MITM data processor")
                 break
 
+    def __update_stats(self, item: tuple, processing_start: float):
+        if self.__stats is None:
+            return
+        now = time.time()
+        with self.__stats.get_lock():
+            self.__stats[STAT_PROCESSED] += 1
+            self.__stats[STAT_PROCESSING_TIME] += now - processing_start
+            if len(item) > 3:
+                # the router appends the time the item has been queued at
+                self.__stats[STAT_WAITING_TIME] += processing_start - item[3]
+
+    def __log_db_stats(self):
+        if time.time() - self.__last_db_stats_log < 300:
+            return
+        self.__last_db_stats_log = time.time()
+        logger.debug("Spawnpoint cache of {}: {}", self.name, self.__db_submit.get_spawnpoint_cache_stats())
+        write_behind_stats = self.__db_submit.get_write_behind_stats()
+        if write_behind_stats is not None:
+            logger.debug("Write-behind buffer of {}: {}", self.name, write_behind_stats)
+
     @logger.catch
     def process_data(self, received_timestamp, data, origin):
         origin_logger = get_origin_logger(logger, origin=origin)
@@ -46,15 +84,18 @@ class SerializedMitmDataProcessor(Process):
                 # process GetMapObject
                 origin_logger.info("Processing GMO received. Received at {}", processed_timestamp)
 
-                self.__db_submit.weather(origin, data["payload"], received_timestamp)
+                # all writes of a GMO share a single pooled connection and commit
+                with self.__db_submit.unit_of_work():
+                    self.__db_submit.weather(origin, data["payload"], received_timestamp)
 
-                self.__db_submit.stops(origin, data["payload"])
-                self.__db_submit.gyms(origin, data["payload"])
-                self.__db_submit.raids(origin, data["payload"], self.__mitm_mapper)
+                    self.__db_submit.stops(origin, data["payload"])
+                    self.__db_submit.gyms(origin, data["payload"])
+                    self.__db_submit.raids(origin, data["payload"], self.__mitm_mapper)
 
-                self.__db_submit.spawnpoints(origin, data["payload"], processed_timestamp)
-                self.__db_submit.mons(origin, data["payload"], self.__mitm_mapper)
-                self.__db_submit.cells(origin, data["payload"])
+                    spawnpoint_details = self.__db_submit.get_spawnpoint_details(data["payload"])
+                    self.__db_submit.spawnpoints(origin, data["payload"], processed_timestamp, spawnpoint_details)
+                    self.__db_submit.mons(origin, data["payload"], self.__mitm_mapper, spawnpoint_details)
+                    self.__db_submit.cells(origin, data["payload"])
                 self.__mitm_mapper.submit_gmo_for_location(origin, data["payload"])
                 origin_logger.debug2("Done processing GMO")
             elif data_type == 102:
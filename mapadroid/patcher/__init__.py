@@ -42,6 +42,9 @@ MAD_UPDATES = OrderedDict([
     (35, 'madrom_autoconfig'),
     (36, 'pokemon_iv_index'),
     (37, 'move_ptc_accounts'),
+    (38, 'routecalc_input_hash'),
+    (39, 'pokemon_encounter_index'),
+    (40, 'webhook_change_log'),
 ])
 
 
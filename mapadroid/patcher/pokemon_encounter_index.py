@@ -0,0 +1,20 @@
+from ._patch_base import PatchBase
+
+
+class Patch(PatchBase):
+    name = 'Add pokemon_to_be_encountered index'
+    descr = 'Index the pokemon without IV by disappear time, location and pokemon id'
+
+    def _execute(self):
+        add_new_index = (
+            "ALTER TABLE pokemon "
+            "ADD INDEX pokemon_to_be_encountered "
+            "(individual_attack, disappear_time, latitude, longitude, pokemon_id)"
+        )
+
+        try:
+            if not self._schema_updater.check_index_exists('pokemon', 'pokemon_to_be_encountered'):
+                self._db.execute(add_new_index, commit=True)
+        except Exception as e:
+            self._logger.exception("Unexpected error: {}", e)
+            self.issues = True
@@ -0,0 +1,17 @@
+from ._patch_base import PatchBase
+
+
+class Patch(PatchBase):
+    name = 'Add routecalc input hash'
+    descr = 'Store a hash of the coords and settings a route has been calculated for'
+
+    def _execute(self):
+        if not self._schema_updater.check_column_exists('settings_routecalc', 'input_hash'):
+            sql = "ALTER TABLE `settings_routecalc`\n" \
+                  "     ADD `input_hash` varchar(40) COLLATE utf8mb4_unicode_ci DEFAULT NULL\n" \
+                  "     AFTER `recalc_status`;"
+            try:
+                self._db.execute(sql, raise_exc=True, suppress_log=True, commit=True)
+            except Exception as e:
+                self._logger.exception("Unexpected error: {}", e)
+                self.issues = True
@@ -0,0 +1,23 @@
+from ._patch_base import PatchBase
+
+
+class Patch(PatchBase):
+    name = 'Add webhook change log'
+    descr = 'Track changed mons, raids, gyms, stops, quests and weather for the webhook worker'
+
+    def _execute(self):
+        change_log_sql = """
+            CREATE TABLE IF NOT EXISTS `trs_webhook_change` (
+                `id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+                `type` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+                `identifier` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL,
+                `created` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (`id`),
+                KEY `created` (`created`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """
+        try:
+            self._db.execute(change_log_sql, commit=True, raise_exc=True)
+        except Exception as e:
+            self._logger.exception("Unexpected error: {}", e)
+            self.issues = True
@@ -11,12 +11,14 @@ import numpy as np
 from dataclasses import dataclass
 from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
-from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.RouteCalcExecutor import RouteCalcError, RouteCalcExecutor
+from mapadroid.route.routecalc.SpatialClusteringHelper import SpatialClusteringHelper
+from mapadroid.route.routecalc.calculate_route_incremental import get_route_quality, update_route
 from mapadroid.utils.collections import Location
 from mapadroid.data_manager import DataManager
 from mapadroid.data_manager.modules.geofence import GeoFence
 from mapadroid.data_manager.modules.routecalc import RouteCalc
-from mapadroid.utils.geo import get_distance_of_two_points_in_meters
+from mapadroid.utils.geo import get_distance_of_two_points_in_meters, get_distances_in_meters
 from mapadroid.utils.walkerArgs import parse_args
 from mapadroid.worker.WorkerType import WorkerType
 from mapadroid.utils.logging import get_logger, LoggerEnums, routelogger_set_origin
@@ -51,7 +53,7 @@ class RouteManagerBase(ABC):
                  routefile: RouteCalc, mode=None, init: bool = False, name: str = "unknown",
                  settings: dict = None,
                  level: bool = False, calctype: str = "route", use_s2: bool = False, s2_level: int = 15,
-                 joinqueue=None):
+                 joinqueue=None, route_calc_executor: Optional[RouteCalcExecutor] = None):
         self.logger = get_logger(LoggerEnums.routemanager, name=str(name))
         self.db_wrapper: DbWrapper = db_wrapper
         self.init: bool = init
@@ -78,10 +80,13 @@ class RouteManagerBase(ABC):
         self._level = level
         self._calctype = calctype
         self._overwrite_calculation: bool = False
+        self._incremental_calculation: bool = False
+        self._route_quality: Optional[float] = None
         self._stops_not_processed: Dict[Location, int] = {}
         self._routepool: Dict[str, RoutePoolEntry] = {}
         self._roundcount: int = 0
         self._joinqueue = joinqueue
+        self._route_calc_executor: Optional[RouteCalcExecutor] = route_calc_executor
         self._worker_start_position: Dict[str] = {}
 
         # we want to store the workers using the routemanager
@@ -99,10 +104,16 @@ class RouteManagerBase(ABC):
             else:
                 fenced_coords = self.geofence_helper.get_geofenced_coordinates(
                     coords)
-            new_coords = self._route_resource.get_json_route(fenced_coords, int(max_radius),
-                                                             max_coords_within_radius,
-                                                             algorithm=calctype, route_name=self.name,
-                                                             in_memory=False)
+            try:
+                new_coords = self._route_resource.get_json_route(fenced_coords, int(max_radius),
+                                                                 max_coords_within_radius,
+                                                                 algorithm=calctype, route_name=self.name,
+                                                                 in_memory=False,
+                                                                 time_limit=args.route_calc_time_limit,
+                                                                 executor=self._route_calc_executor)
+            except RouteCalcError as e:
+                self.logger.warning("Route has not been calculated, starting without a route: {}", e)
+                new_coords = []
             for coord in new_coords:
                 self._route.append(Location(coord["lat"], coord["lng"]))
 
@@ -242,9 +253,9 @@ class RouteManagerBase(ABC):
                         max_clustering = self._max_coords_within_radius
                 else:
                     max_clustering = self._max_coords_within_radius
-                self.clustering_helper = ClusteringHelper(self._max_radius,
-                                                          max_clustering,
-                                                          self._cluster_priority_queue_criteria())
+                self.clustering_helper = SpatialClusteringHelper(self._max_radius,
+                                                                 max_clustering,
+                                                                 self._cluster_priority_queue_criteria())
             self._update_prio_queue_thread = Thread(name=self.name + "- prio_queue_update",
                                                     target=self._update_priority_queue_loop)
             self._update_prio_queue_thread.daemon = True
@@ -270,16 +281,25 @@ class RouteManagerBase(ABC):
         self.add_coords_numpy(to_be_appended)
 
     def calculate_new_route(self, coords, max_radius, max_coords_within_radius, delete_old_route, num_procs=0,
-                            in_memory=False, calctype=None):
+                            in_memory=False, calctype=None) -> Optional[List[Dict[str, float]]]:
+        """
+        Returns None if the calculation failed or has been cancelled in madmin
+        """
         if calctype is None:
             calctype = self._calctype
         if len(coords) > 0:
-            new_route = self._route_resource.calculate_new_route(coords, max_radius, max_coords_within_radius,
-                                                                 delete_old_route, calctype, self.useS2,
-                                                                 self.S2level,
-                                                                 num_procs=0,
-                                                                 overwrite_calculation=self._overwrite_calculation,
-                                                                 in_memory=in_memory, route_name=self.name)
+            try:
+                new_route = self._route_resource.calculate_new_route(coords, max_radius, max_coords_within_radius,
+                                                                     delete_old_route, calctype, self.useS2,
+                                                                     self.S2level,
+                                                                     num_procs=0,
+                                                                     overwrite_calculation=self._overwrite_calculation,
+                                                                     in_memory=in_memory, route_name=self.name,
+                                                                     time_limit=args.route_calc_time_limit,
+                                                                     executor=self._route_calc_executor)
+            except RouteCalcError as e:
+                self.logger.warning("Route has not been calculated: {}", e)
+                return None
             if self._overwrite_calculation:
                 self._overwrite_calculation = False
             return new_route
@@ -304,10 +324,19 @@ class RouteManagerBase(ABC):
     def recalc_route(self, max_radius: float, max_coords_within_radius: int, num_procs: int = 1,
                      delete_old_route: bool = False, in_memory: bool = False, calctype: str = None):
         current_coords = self._coords_unstructured
-        new_route = self.calculate_new_route(current_coords, max_radius, max_coords_within_radius,
-                                             delete_old_route, num_procs,
-                                             in_memory=in_memory,
-                                             calctype=calctype)
+        new_route = None
+        if self._incremental_calculation and args.route_calc_incremental:
+            new_route = self._update_route(current_coords, max_radius, max_coords_within_radius, in_memory)
+        self._incremental_calculation = False
+        if new_route is None:
+            new_route = self.calculate_new_route(current_coords, max_radius, max_coords_within_radius,
+                                                 delete_old_route, num_procs,
+                                                 in_memory=in_memory,
+                                                 calctype=calctype)
+            if new_route is None:
+                self.logger.warning("Keeping the current route")
+                return None
+            self._route_quality = None
         with self._manager_mutex:
             self._route.clear()
             for coord in new_route:
@@ -315,6 +344,34 @@ class RouteManagerBase(ABC):
             self._current_route_round_coords = self._route.copy()
         return new_route
 
+    def _update_route(self, coords, max_radius: float, max_coords_within_radius: int,
+                      in_memory: bool) -> Optional[List[Dict[str, float]]]:
+        """
+        Inserts new and drops obsolete positions of the current route instead of calculating a new one. Returns None
+        if a new route should be calculated instead.
+        """
+        with self._manager_mutex:
+            route = self._route.copy()
+        if not route or coords is None or len(coords) == 0:
+            return None
+        if self._route_quality is None:
+            # quality of the route as it was calculated, updates are compared to it
+            self._route_quality = get_route_quality(route)
+        updated_route = update_route(route, coords, max_radius, max_coords_within_radius, use_s2=self.useS2,
+                                     s2_level=self.S2level, time_limit=args.route_calc_incremental_time,
+                                     route_name=self.name)
+        quality = get_route_quality(updated_route)
+        if quality > self._route_quality * args.route_calc_incremental_quality:
+            self.logger.info("Updated route is {:.2f} times as long as needed compared to {:.2f} of the calculated "
+                             "route - calculating a new route", quality, self._route_quality)
+            return None
+        self._overwrite_calculation = False
+        new_route = [{'lat': location.lat, 'lng': location.lng} for location in updated_route]
+        if not in_memory:
+            self._route_resource['routefile'] = ['%s,%s' % (coord['lat'], coord['lng']) for coord in new_route]
+            self._route_resource.save(update_time=True)
+        return new_route
+
     def recalc_route_adhoc(self, max_radius: float, max_coords_within_radius: int, num_procs: int = 1,
                            active: bool = False, calctype: str = 'route'):
         self._clear_coords()
@@ -323,6 +380,8 @@ class RouteManagerBase(ABC):
         new_route = self.recalc_route(max_radius, max_coords_within_radius, num_procs,
                                       in_memory=True,
                                       calctype=calctype)
+        if new_route is None:
+            return
         calc_coords = []
         for coord in new_route:
             calc_coords.append('%s,%s' % (coord['lat'], coord['lng']))
@@ -746,13 +805,14 @@ class RouteManagerBase(ABC):
         route_logger.debug("distance to PrioQ {}: {}", prioqcoord, distance_worker)
         temp_distance = distance_worker
 
-        for worker in self._routepool.keys():
-            if worker == origin or self._routepool[worker].has_prio_event \
-                    or self._routepool[origin].last_round_prio_event:
-                continue
-            worker_pos = self._routepool[worker].current_pos
-            prio_distance = get_distance_of_two_points_in_meters(worker_pos.lat, worker_pos.lng,
-                                                                 prioqcoord.lat, prioqcoord.lng)
+        other_workers = [worker for worker in self._routepool.keys()
+                         if not (worker == origin or self._routepool[worker].has_prio_event
+                                 or self._routepool[origin].last_round_prio_event)]
+        worker_positions = [self._routepool[worker].current_pos for worker in other_workers]
+        prio_distances = get_distances_in_meters(prioqcoord.lat, prioqcoord.lng,
+                                                 [worker_pos.lat for worker_pos in worker_positions],
+                                                 [worker_pos.lng for worker_pos in worker_positions])
+        for worker, prio_distance in zip(other_workers, prio_distances.tolist()):
             route_logger.debug("distance to PrioQ {}: {}", prioqcoord, prio_distance)
             if prio_distance < temp_distance:
                 route_logger.debug("Worker {} closer by {} meters", worker,
@@ -1063,6 +1123,9 @@ class RouteManagerBase(ABC):
     def get_calc_type(self):
         return self._calctype
 
+    def get_routefile(self) -> List[str]:
+        return self._route_resource['routefile']
+
     def redo_stop(self, worker, lat, lon):
         route_logger = routelogger_set_origin(self.logger, origin=worker)
         route_logger.info('redo a unprocessed Stop ({}, {})', lat, lon)
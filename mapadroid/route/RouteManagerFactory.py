@@ -17,14 +17,14 @@ class RouteManagerFactory:
                          init: bool = False, name: str = "unknown", settings=None,
                          coords_spawns_known: bool = False,
                          level: bool = False, calctype: str = "route", use_s2: bool = False,
-                         s2_level: int = 15, joinqueue=None, include_event_id=None):
+                         s2_level: int = 15, joinqueue=None, include_event_id=None, route_calc_executor=None):
 
         if mode == WorkerType.RAID_MITM.value:
             route_manager = RouteManagerRaids(db_wrapper, dbm, area_id, coords, max_radius,
                                               max_coords_within_radius,
                                               path_to_include_geofence, path_to_exclude_geofence, routefile,
                                               mode=mode, settings=settings, init=init, name=name,
-                                              joinqueue=joinqueue,
+                                              joinqueue=joinqueue, route_calc_executor=route_calc_executor,
                                               use_s2=use_s2, s2_level=s2_level
                                               )
         elif mode == WorkerType.MON_MITM.value:
@@ -32,7 +32,7 @@ class RouteManagerFactory:
                                             max_coords_within_radius,
                                             path_to_include_geofence, path_to_exclude_geofence, routefile,
                                             mode=mode, settings=settings, init=init, name=name,
-                                            joinqueue=joinqueue,
+                                            joinqueue=joinqueue, route_calc_executor=route_calc_executor,
                                             coords_spawns_known=coords_spawns_known,
                                             include_event_id=include_event_id
                                             )
@@ -40,14 +40,14 @@ class RouteManagerFactory:
             route_manager = RouteManagerIV(db_wrapper, dbm, area_id, coords, 0, 99999999,
                                            path_to_include_geofence, path_to_exclude_geofence, routefile,
                                            mode=mode, settings=settings, init=False, name=name,
-                                           joinqueue=joinqueue
+                                           joinqueue=joinqueue, route_calc_executor=route_calc_executor
                                            )
         elif mode == WorkerType.IDLE.value:
             route_manager = RouteManagerRaids(db_wrapper, dbm, area_id, coords, max_radius,
                                               max_coords_within_radius,
                                               path_to_include_geofence, path_to_exclude_geofence, routefile,
                                               mode=mode, settings=settings, init=init, name=name,
-                                              joinqueue=joinqueue
+                                              joinqueue=joinqueue, route_calc_executor=route_calc_executor
                                               )
         elif mode == WorkerType.STOPS.value:
             if level and calctype == 'routefree':
@@ -57,7 +57,8 @@ class RouteManagerFactory:
                                                               routefile,
                                                               mode=mode, settings=settings, init=init, name=name,
                                                               level=True,
-                                                              calctype=calctype, joinqueue=joinqueue
+                                                              calctype=calctype, joinqueue=joinqueue,
+                                                              route_calc_executor=route_calc_executor
                                                               )
             elif level:
                 route_manager = RouteManagerLeveling(db_wrapper, dbm, area_id, coords, max_radius,
@@ -66,7 +67,8 @@ class RouteManagerFactory:
                                                      routefile,
                                                      mode=mode, settings=settings, init=init, name=name,
                                                      level=True,
-                                                     calctype=calctype, joinqueue=joinqueue
+                                                     calctype=calctype, joinqueue=joinqueue,
+                                                     route_calc_executor=route_calc_executor
                                                      )
             else:
                 route_manager = RouteManagerQuests(db_wrapper, dbm, area_id, coords, max_radius,
@@ -75,7 +77,8 @@ class RouteManagerFactory:
                                                    routefile,
                                                    mode=mode, settings=settings, init=init, name=name,
                                                    level=level,
-                                                   calctype=calctype, joinqueue=joinqueue
+                                                   calctype=calctype, joinqueue=joinqueue,
+                                                   route_calc_executor=route_calc_executor
                                                    )
         else:
             raise RuntimeError("Invalid mode found in mapping parser.")
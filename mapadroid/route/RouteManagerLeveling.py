@@ -15,14 +15,14 @@ class RouteManagerLeveling(RouteManagerQuests):
     def __init__(self, db_wrapper: DbWrapper, dbm, area_id, coords: List[Location], max_radius: float,
                  max_coords_within_radius: int, path_to_include_geofence: str, path_to_exclude_geofence: str,
                  routefile: str, mode=None, init: bool = False, name: str = "unknown", settings: dict = None,
-                 level: bool = False, calctype: str = "route", joinqueue=None):
+                 level: bool = False, calctype: str = "route", joinqueue=None, route_calc_executor=None):
         RouteManagerQuests.__init__(self, db_wrapper=db_wrapper, dbm=dbm, area_id=area_id, coords=coords,
                                     max_radius=max_radius, max_coords_within_radius=max_coords_within_radius,
                                     path_to_include_geofence=path_to_include_geofence,
                                     path_to_exclude_geofence=path_to_exclude_geofence,
                                     routefile=routefile, init=init,
                                     name=name, settings=settings, mode=mode, level=level, calctype=calctype,
-                                    joinqueue=joinqueue
+                                    joinqueue=joinqueue, route_calc_executor=route_calc_executor
                                     )
 
     def _worker_changed_update_routepools(self):
@@ -76,7 +76,9 @@ class RouteManagerLeveling(RouteManagerQuests):
         new_route = self.calculate_new_route(to_be_route, self._max_radius, self._max_coords_within_radius,
                                              False, 1,
                                              True)
-
+        if new_route is None:
+            # the calculation failed or has been cancelled, visit the stops unordered instead
+            return [{'lat': stop.lat, 'lng': stop.lng} for stop in unvisited_stops]
         return new_route
 
     def generate_stop_list(self):
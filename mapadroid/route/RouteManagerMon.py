@@ -9,14 +9,15 @@ class RouteManagerMon(RouteManagerBase):
     def __init__(self, db_wrapper, dbm, area_id, coords, max_radius, max_coords_within_radius,
                  path_to_include_geofence,
                  path_to_exclude_geofence, routefile, mode=None, coords_spawns_known=False, init=False,
-                 name="unknown", settings=None, joinqueue=None, include_event_id=None):
+                 name="unknown", settings=None, joinqueue=None, route_calc_executor=None, include_event_id=None):
         RouteManagerBase.__init__(self, db_wrapper=db_wrapper, dbm=dbm, area_id=area_id, coords=coords,
                                   max_radius=max_radius,
                                   max_coords_within_radius=max_coords_within_radius,
                                   path_to_include_geofence=path_to_include_geofence,
                                   path_to_exclude_geofence=path_to_exclude_geofence,
                                   routefile=routefile, init=init,
-                                  name=name, settings=settings, mode=mode, joinqueue=joinqueue
+                                  name=name, settings=settings, mode=mode, joinqueue=joinqueue,
+                                  route_calc_executor=route_calc_executor
                                   )
         self.coords_spawns_known = coords_spawns_known
         self.include_event_id = include_event_id
@@ -14,7 +14,7 @@ class RouteManagerQuests(RouteManagerBase):
     def __init__(self, db_wrapper: DbWrapper, dbm, area_id, coords: List[Location], max_radius: float,
                  max_coords_within_radius: int, path_to_include_geofence: str, path_to_exclude_geofence: str,
                  routefile: str, mode=None, init: bool = False, name: str = "unknown", settings: dict = None,
-                 level: bool = False, calctype: str = "route", joinqueue=None):
+                 level: bool = False, calctype: str = "route", joinqueue=None, route_calc_executor=None):
         RouteManagerBase.__init__(self, db_wrapper=db_wrapper, dbm=dbm, area_id=area_id, coords=coords,
                                   max_radius=max_radius,
                                   max_coords_within_radius=max_coords_within_radius,
@@ -22,7 +22,7 @@ class RouteManagerQuests(RouteManagerBase):
                                   path_to_exclude_geofence=path_to_exclude_geofence,
                                   routefile=routefile, init=init,
                                   name=name, settings=settings, mode=mode, level=level, calctype=calctype,
-                                  joinqueue=joinqueue
+                                  joinqueue=joinqueue, route_calc_executor=route_calc_executor
                                   )
         self.starve_route = False
         self._stoplist: List[Location] = []
@@ -202,6 +202,7 @@ class RouteManagerQuests(RouteManagerBase):
         self._clear_coords()
         self.add_coords_list(stops)
         self._overwrite_calculation = True
+        self._incremental_calculation = True
         self._recalc_route_workertype()
         self._init_route_queue()
 
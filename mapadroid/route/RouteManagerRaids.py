@@ -9,7 +9,7 @@ class RouteManagerRaids(RouteManagerBase):
     def __init__(self, db_wrapper, dbm, area_id, coords, max_radius, max_coords_within_radius,
                  path_to_include_geofence,
                  path_to_exclude_geofence, routefile, mode=None, settings=None, init=False,
-                 name="unknown", joinqueue=None, use_s2: bool = False, s2_level: int = 15):
+                 name="unknown", joinqueue=None, route_calc_executor=None, use_s2: bool = False, s2_level: int = 15):
         RouteManagerBase.__init__(self, db_wrapper=db_wrapper, dbm=dbm, area_id=area_id, coords=coords,
                                   max_radius=max_radius,
                                   max_coords_within_radius=max_coords_within_radius,
@@ -17,7 +17,7 @@ class RouteManagerRaids(RouteManagerBase):
                                   path_to_exclude_geofence=path_to_exclude_geofence,
                                   routefile=routefile, init=init,
                                   name=name, settings=settings, mode=mode, use_s2=True, s2_level=s2_level,
-                                  joinqueue=joinqueue
+                                  joinqueue=joinqueue, route_calc_executor=route_calc_executor
                                   )
 
     def _priority_queue_update_interval(self):
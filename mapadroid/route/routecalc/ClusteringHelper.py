@@ -1,8 +1,9 @@
+import numpy as np
 import s2sphere
 
 from mapadroid.utils.collections import Relation
 from mapadroid.utils.geo import (
-    get_distance_of_two_points_in_meters,
+    get_distances_in_meters,
     get_middle_of_coord_list
 )
 from mapadroid.utils.s2Helper import S2Helper
@@ -19,27 +20,28 @@ class ClusteringHelper:
 
     def _get_relations_in_range_within_time(self, queue, max_radius):
         relations = {}
+        lats = [event[1].lat for event in queue]
+        lngs = [event[1].lng for event in queue]
+        timestamps = np.array([event[0] for event in queue])
         for event in queue:
-            for other_event in queue:
-                if event[1].lat == other_event[1].lat and event[1].lng == other_event[1].lng and \
-                   event not in relations.keys():
-                    relations[event] = []
-                distance = get_distance_of_two_points_in_meters(event[1].lat, event[1].lng,
-                                                                other_event[1].lat, other_event[1].lng)
-                # we will always build relations from the event at hand subtracted by the event inspected
-                timedelta = event[0] - other_event[0]
-                if 0 <= distance <= max_radius * 2 and 0 <= timedelta <= self.max_timedelta_seconds:
-                    if event not in relations.keys():
-                        relations[event] = []
-                    # avoid duplicates
-                    already_present = False
-                    for relation in relations[event]:
-                        if relation[0][1].lat == other_event[1].lat and \
-                           relation[0][1].lng == other_event[1].lng:
-                            already_present = True
-                    if not already_present:
-                        relations[event].append(
-                            Relation(other_event, distance, timedelta))
+            # every event is related to itself, compute the distances to all other events at once
+            relations.setdefault(event, [])
+            distances = get_distances_in_meters(event[1].lat, event[1].lng, lats, lngs)
+            # we will always build relations from the event at hand subtracted by the event inspected
+            timedeltas = event[0] - timestamps
+            in_range = np.flatnonzero((distances <= max_radius * 2) & (timedeltas >= 0)
+                                      & (timedeltas <= self.max_timedelta_seconds))
+            for index in in_range.tolist():
+                other_event = queue[index]
+                # avoid duplicates
+                already_present = False
+                for relation in relations[event]:
+                    if relation[0][1].lat == other_event[1].lat and \
+                       relation[0][1].lng == other_event[1].lng:
+                        already_present = True
+                if not already_present:
+                    relations[event].append(
+                        Relation(other_event, float(distances[index]), event[0] - other_event[0]))
         return relations
 
     def _get_most_west_amongst_relations(self, relations):
@@ -72,14 +74,14 @@ class ClusteringHelper:
             region = s2sphere.CellUnion(
                 S2Helper.get_s2cells_from_circle(middle.lat, middle.lng, self.max_radius, self.S2level))
 
-        for event_relations in relations:
+        events = list(relations)
+        distances = get_distances_in_meters(middle.lat, middle.lng, [event[1].lat for event in events],
+                                            [event[1].lng for event in events])
+        for event_relations, distance in zip(events, distances.tolist()):
             # exclude previously clustered events...
             if len(event_relations) == 4 and event_relations[3]:
                 inside_circle.append(event_relations)
                 continue
-            distance = get_distance_of_two_points_in_meters(middle.lat, middle.lng,
-                                                            event_relations[1].lat,
-                                                            event_relations[1].lng)
             event_in_range = 0 <= distance <= max_radius
             if self.useS2:
                 event_in_range = region.contains(s2sphere.LatLng.from_degrees(event_relations[1].lat,
@@ -0,0 +1,263 @@
+import hashlib
+import multiprocessing
+import pickle
+import time
+import traceback
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from multiprocessing.connection import wait
+from threading import Event, Lock, RLock, Thread
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from mapadroid.utils.logging import get_logger, LoggerEnums
+
+
+logger = get_logger(LoggerEnums.routemanager)
+
+
+class RouteCalcError(Exception):
+    pass
+
+
+class RouteCalcCancelledError(RouteCalcError):
+    pass
+
+
+class RouteCalcJobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class RouteCalcJob:
+    job_id: int
+    name: str
+    identifier: Optional[int]
+    key: str
+    func: Callable
+    args: tuple
+    kwargs: dict
+    submitted: float
+    status: RouteCalcJobStatus = RouteCalcJobStatus.QUEUED
+    progress: Any = None
+    result: Any = None
+    error: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    cancel_requested: bool = False
+    done: Event = field(default_factory=Event)
+    process: Optional[multiprocessing.Process] = None
+    connection: Any = None
+
+    def get_status(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "identifier": self.identifier,
+            "status": self.status.value,
+            "progress": round(self.progress.value, 1) if self.progress is not None else 0.0,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished
+        }
+
+
+def _run_job(func, args, kwargs, progress, connection):
+    def set_progress(percent: float):
+        progress.value = percent
+
+    try:
+        result = func(*args, progress=set_progress, **kwargs)
+        progress.value = 100.0
+        connection.send((True, result))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+class RouteCalcExecutor:
+    """
+    Runs route calculations in processes of their own to keep them from holding the GIL of the process scheduling
+    them. Jobs are queued and started as soon as one of max_processes slots is free, identical jobs submitted while
+    one of them is queued or running are merged. The called function has to accept a progress keyword, a callable
+    taking the percentage done.
+    """
+
+    def __init__(self, max_processes: int = 2, finished_jobs_kept: int = 100):
+        self._max_processes: int = max(1, max_processes)
+        self._finished_jobs_kept: int = finished_jobs_kept
+        self._jobs: Dict[int, RouteCalcJob] = OrderedDict()
+        self._queue: Deque[RouteCalcJob] = deque()
+        self._running: Dict[int, RouteCalcJob] = {}
+        self._next_job_id: int = 1
+        self._lock = RLock()
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+        self._wakeup_lock = Lock()
+        self._stop_event = Event()
+        self._dispatcher = Thread(name='system', target=self._dispatch)
+        self._dispatcher.daemon = True
+        self._dispatcher.start()
+
+    @staticmethod
+    def _get_key(func: Callable, args: tuple, kwargs: dict) -> str:
+        return hashlib.sha1(pickle.dumps((func.__module__, func.__qualname__, args, sorted(kwargs.items())))
+                            ).hexdigest()
+
+    def submit(self, name: str, func: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+               identifier: Optional[int] = None) -> int:
+        kwargs = kwargs or {}
+        key = self._get_key(func, args, kwargs)
+        with self._lock:
+            for job in list(self._queue) + list(self._running.values()):
+                if job.key == key:
+                    logger.info("Route calculation for {} is already queued as job {}", name, job.job_id)
+                    return job.job_id
+            job = RouteCalcJob(job_id=self._next_job_id, name=name, identifier=identifier, key=key, func=func,
+                               args=args, kwargs=kwargs, submitted=time.time(),
+                               progress=multiprocessing.Value('d', 0.0, lock=False))
+            self._next_job_id += 1
+            self._jobs[job.job_id] = job
+            self._queue.append(job)
+            self._forget_finished_jobs()
+            logger.info("Queued route calculation for {} as job {} ({} queued, {} running)", name, job.job_id,
+                        len(self._queue), len(self._running))
+        self._wakeup()
+        return job.job_id
+
+    def get_result(self, job_id: int, timeout: Optional[float] = None):
+        """
+        Waits for the job to finish and returns its result. Raises RouteCalcCancelledError for cancelled and
+        RouteCalcError for failed jobs or if the job did not finish in time.
+        """
+        job = self._get_job(job_id)
+        if not job.done.wait(timeout):
+            raise RouteCalcError("Route calculation job {} did not finish in time".format(job_id))
+        if job.status == RouteCalcJobStatus.CANCELLED:
+            raise RouteCalcCancelledError("Route calculation job {} has been cancelled".format(job_id))
+        elif job.status == RouteCalcJobStatus.FAILED:
+            raise RouteCalcError("Route calculation job {} failed: {}".format(job_id, job.error))
+        return job.result
+
+    def calculate(self, name: str, func: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+                  identifier: Optional[int] = None):
+        return self.get_result(self.submit(name, func, args=args, kwargs=kwargs, identifier=identifier))
+
+    def get_status(self, job_id: int) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id, None)
+            return job.get_status() if job is not None else None
+
+    def get_jobs(self) -> List[dict]:
+        with self._lock:
+            return [job.get_status() for job in self._jobs.values()]
+
+    def cancel(self, job_id: int) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id, None)
+            if job is None or job.done.is_set() or job.cancel_requested:
+                return False
+            logger.info("Cancelling route calculation job {} of {}", job_id, job.name)
+            if job.status == RouteCalcJobStatus.QUEUED:
+                self._queue.remove(job)
+                self._finish(job, RouteCalcJobStatus.CANCELLED)
+            else:
+                # the dispatcher collects the job once the process is gone
+                job.cancel_requested = True
+                job.process.terminate()
+        self._wakeup()
+        return True
+
+    def stop(self):
+        with self._lock:
+            for job_id in [job.job_id for job in self._queue] + list(self._running.keys()):
+                self.cancel(job_id)
+        self._stop_event.set()
+        self._wakeup()
+        self._dispatcher.join(timeout=5)
+        with self._lock:
+            for job in list(self._running.values()):
+                job.process.join()
+                job.connection.close()
+                self._running.pop(job.job_id)
+                self._finish(job, RouteCalcJobStatus.CANCELLED)
+
+    def _get_job(self, job_id: int) -> RouteCalcJob:
+        with self._lock:
+            job = self._jobs.get(job_id, None)
+        if job is None:
+            raise RouteCalcError("Unknown route calculation job {}".format(job_id))
+        return job
+
+    def _wakeup(self):
+        with self._wakeup_lock:
+            self._wakeup_writer.send_bytes(b'\0')
+
+    def _forget_finished_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self._finished_jobs_kept)]:
+            self._jobs.pop(job_id)
+
+    def _finish(self, job: RouteCalcJob, status: RouteCalcJobStatus, result=None, error: Optional[str] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished = time.time()
+        job.process = None
+        job.connection = None
+        job.done.set()
+
+    def _start_queued_jobs(self):
+        while self._queue and len(self._running) < self._max_processes:
+            job = self._queue.popleft()
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            job.process = multiprocessing.Process(name='routecalc', target=_run_job,
+                                                  args=(job.func, job.args, job.kwargs, job.progress, writer))
+            job.process.daemon = True
+            job.process.start()
+            # the reader only reports the end of the job once the process closed its end of the pipe
+            writer.close()
+            job.connection = reader
+            job.status = RouteCalcJobStatus.RUNNING
+            job.started = time.time()
+            self._running[job.job_id] = job
+            logger.info("Started route calculation job {} of {}", job.job_id, job.name)
+
+    def _collect(self, job: RouteCalcJob):
+        try:
+            successful, payload = job.connection.recv()
+        except EOFError:
+            successful, payload = False, "Process exited with code {}".format(job.process.exitcode)
+        job.process.join()
+        job.connection.close()
+        self._running.pop(job.job_id)
+        if job.cancel_requested:
+            self._finish(job, RouteCalcJobStatus.CANCELLED)
+        elif successful:
+            logger.info("Route calculation job {} of {} finished after {:.1f}s", job.job_id, job.name,
+                        time.time() - job.started)
+            self._finish(job, RouteCalcJobStatus.FINISHED, result=payload)
+        else:
+            logger.error("Route calculation job {} of {} failed: {}", job.job_id, job.name, payload)
+            self._finish(job, RouteCalcJobStatus.FAILED, error=payload)
+
+    def _dispatch(self):
+        while not self._stop_event.is_set():
+            with self._lock:
+                self._start_queued_jobs()
+                connections = {job.connection: job for job in self._running.values()}
+            ready = wait(list(connections.keys()) + [self._wakeup_reader])
+            with self._lock:
+                for connection in ready:
+                    if connection is self._wakeup_reader:
+                        while self._wakeup_reader.poll():
+                            self._wakeup_reader.recv_bytes()
+                        continue
+                    job = connections[connection]
+                    if job.job_id in self._running:
+                        self._collect(job)
@@ -0,0 +1,136 @@
+import math
+from collections import defaultdict
+from itertools import product
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.utils.collections import Relation
+from mapadroid.utils.geo import get_distances_in_meters
+
+# radius of the earth in meters as used by get_distance_of_two_points_in_meters
+EARTH_RADIUS = 6373000.0
+
+
+class SpatialClusteringHelper(ClusteringHelper):
+    """
+    ClusteringHelper answering neighbour queries by a spatial hash instead of comparing every event with every other
+    event. Events are hashed to cubes of 2 * max_radius on a sphere with the radius used for distances. The chord
+    between two points never exceeds their distance on the surface, events within 2 * max_radius of each other
+    thus lie in the same or in adjacent cubes. The results are identical to the ones of ClusteringHelper.
+    """
+
+    def __init__(self, max_radius, max_count_per_circle, max_timedelta_seconds, use_s2: bool = False,
+                 s2_level: int = 30):
+        ClusteringHelper.__init__(self, max_radius, max_count_per_circle, max_timedelta_seconds, use_s2=use_s2,
+                                  s2_level=s2_level)
+        # a meter of slack to be safe from rounding issues
+        self._cell_size: float = max_radius * 2 + 1
+        self._events: List[tuple] = []
+        self._cells: Dict[Tuple[int, int, int], List[int]] = {}
+        self._event_cells: List[Tuple[int, int, int]] = []
+        self._clustered: List[int] = []
+
+    def _get_cell(self, location) -> Tuple[int, int, int]:
+        lat, lng = math.radians(location.lat), math.radians(location.lng)
+        return (int(math.floor(EARTH_RADIUS * math.cos(lat) * math.cos(lng) / self._cell_size)),
+                int(math.floor(EARTH_RADIUS * math.cos(lat) * math.sin(lng) / self._cell_size)),
+                int(math.floor(EARTH_RADIUS * math.sin(lat) / self._cell_size)))
+
+    @staticmethod
+    def _get_neighbours(cells: Dict[Tuple[int, int, int], List[int]], cell: Tuple[int, int, int]) -> List[int]:
+        """
+        Indices of the events in the given cell and all adjacent cells in ascending order
+        """
+        neighbours = []
+        for offset in product((-1, 0, 1), repeat=3):
+            neighbours.extend(cells.get((cell[0] + offset[0], cell[1] + offset[1], cell[2] + offset[2]), ()))
+        neighbours.sort()
+        return neighbours
+
+    def _get_relations_in_range_within_time(self, queue, max_radius):
+        cells = defaultdict(list)
+        event_cells = []
+        for index, event in enumerate(queue):
+            cell = self._get_cell(event[1])
+            event_cells.append(cell)
+            cells[cell].append(index)
+
+        relations = {}
+        related_locations = {}
+        lats = np.array([event[1].lat for event in queue])
+        lngs = np.array([event[1].lng for event in queue])
+        timestamps = np.array([event[0] for event in queue])
+        for index, event in enumerate(queue):
+            # every event is related to itself, other events are inspected in the order of the queue just like
+            # ClusteringHelper does
+            if event not in relations:
+                relations[event] = []
+                related_locations[event] = set()
+            neighbours = np.array(self._get_neighbours(cells, event_cells[index]))
+            distances = get_distances_in_meters(event[1].lat, event[1].lng, lats[neighbours], lngs[neighbours])
+            timedeltas = event[0] - timestamps[neighbours]
+            in_range = np.flatnonzero((distances <= max_radius * 2) & (timedeltas >= 0)
+                                      & (timedeltas <= self.max_timedelta_seconds))
+            for position in in_range.tolist():
+                other_event = queue[neighbours[position]]
+                # avoid duplicates
+                other_location = (other_event[1].lat, other_event[1].lng)
+                if other_location not in related_locations[event]:
+                    related_locations[event].add(other_location)
+                    relations[event].append(Relation(other_event, float(distances[position]),
+                                                     event[0] - other_event[0]))
+        return relations
+
+    def _get_count_and_coords_in_circle_within_timedelta(self, middle, relations, earliest_timestamp,
+                                                         latest_timestamp, max_radius):
+        if self.useS2:
+            # S2 coverings may exceed the radius, inspect every event
+            return ClusteringHelper._get_count_and_coords_in_circle_within_timedelta(
+                self, middle, relations, earliest_timestamp, latest_timestamp, max_radius)
+        # events out of range do not affect the circle, previously clustered events are part of every circle
+        candidates = sorted(set(self._get_neighbours(self._cells, self._get_cell(middle)) + self._clustered))
+        remaining_events = [self._events[index] for index in candidates if self._events[index] in relations]
+        return ClusteringHelper._get_count_and_coords_in_circle_within_timedelta(
+            self, middle, remaining_events, earliest_timestamp, latest_timestamp, max_radius)
+
+    def _remove_coords_from_relations(self, relations, events_to_be_removed):
+        removed_events = set(events_to_be_removed)
+        removed_locations = set(event[1] for event in events_to_be_removed)
+        affected = set()
+        for event in events_to_be_removed:
+            affected.update(self._get_neighbours(self._cells, self._get_cell(event[1])))
+        for index in affected:
+            source_event = self._events[index]
+            if source_event not in relations:
+                continue
+            if source_event in removed_events:
+                relations.pop(source_event)
+                continue
+            relations_to_source = relations[source_event]
+            relations_to_source[:] = [relation for relation in relations_to_source
+                                      if relation.other_event[1] not in removed_locations]
+        return relations
+
+    def _sum_up_relations(self, relations):
+        self._events = list(relations.keys())
+        self._cells = defaultdict(list)
+        for index, event in enumerate(self._events):
+            self._cells[self._get_cell(event[1])].append(index)
+        self._clustered = [index for index, event in enumerate(self._events) if len(event) == 4 and event[3]]
+        # most west first, the northern one for equal longitudes, the first one for equal locations
+        west_order = sorted(range(len(self._events)),
+                            key=lambda index: (self._events[index][1].lng, -self._events[index][1].lat, index))
+
+        final_set = []
+        west_position = 0
+        while len(relations) > 0:
+            while self._events[west_order[west_position]] not in relations:
+                west_position += 1
+            west_next = self._events[west_order[west_position]]
+            middle_event, events_to_be_removed = self._get_circle(west_next, relations[west_next], relations,
+                                                                  self.max_radius)
+            final_set.append(middle_event)
+            relations = self._remove_coords_from_relations(relations, events_to_be_removed)
+        return final_set
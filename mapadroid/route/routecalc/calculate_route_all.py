@@ -1,4 +1,6 @@
-import math
+import time
+import numpy as np
+from mapadroid.utils.geo import get_distance_matrix_in_meters
 from mapadroid.utils.logging import logger, get_origin_logger
 try:
     from ortools.constraint_solver import routing_enums_pb2
@@ -6,36 +8,68 @@ try:
 except Exception:
     pass
 
+# share of the progress of the OR-Tools route calculation taken by the distance matrix, the rest is the search
+DISTANCE_MATRIX_PROGRESS = 5
+
+
+def scale_progress(progress, start, end):
+    """Maps the percentage done of a part of the calculation to the range from start to end of the whole one."""
+    if progress is None:
+        return None
+    return lambda percent: progress(start + (end - start) * percent / 100)
+
+
+class SearchProgress:
+    """
+    Reports the progress of the OR-Tools search whenever a solution is found. Searches with a time limit only stop
+    at the limit, the share of the time limit elapsed is reported. Searches without one stop at the first local
+    optimum, which is estimated to take about as many improving solutions as there are locations.
+    """
+
+    def __init__(self, progress, time_limit, location_count):
+        self._progress = progress
+        self._time_limit = time_limit
+        self._location_count = location_count
+        self._started = time.time()
+        self._solutions = 0
+
+    def on_solution(self):
+        self._solutions += 1
+        if self._time_limit > 0:
+            percent = (time.time() - self._started) / self._time_limit * 100
+        else:
+            percent = self._solutions / (self._solutions + self._location_count) * 100
+        # the search is only done once it returns
+        self._progress(min(percent, 99))
+
 
 def create_data_model(less_coordinates):
     """Stores the data for the problem."""
 
     data = {}
 
-    # ortools requires x,y data to be integers
-    # we will scale lat,lng to large numbers so that rounding won't adversely affect the path calculation
     data['locations'] = []
     for coord in less_coordinates:
-        data['locations'].append((int(float(coord[0]) * 1e9), int(float(coord[1]) * 1e9)))
+        data['locations'].append((float(coord[0]), float(coord[1])))
 
     data['num_vehicles'] = 1  # calculate as if only one walker on route
     data['depot'] = 0  # route will start at the first lat,lng
     return data
 
 
-def compute_euclidean_distance_matrix(locations):
-    """Creates callback to return distance between points."""
-    distances = {}
-    for from_counter, from_node in enumerate(locations):
-        distances[from_counter] = {}
-        for to_counter, to_node in enumerate(locations):
-            if from_counter == to_counter:
-                distances[from_counter][to_counter] = 0
-            else:
-                # Euclidean distance
-                distances[from_counter][to_counter] = (int(
-                    math.hypot((from_node[0] - to_node[0]),
-                               (from_node[1] - to_node[1]))))
+def compute_distance_matrix(locations, rows_per_chunk=500, progress=None):
+    """Creates the matrix of distances between points in meters."""
+    # ortools requires distances to be integers, meters are fine grained enough for routes
+    lats = np.array([location[0] for location in locations], dtype=float)
+    lngs = np.array([location[1] for location in locations], dtype=float)
+    distances = np.zeros(shape=(len(locations), len(locations)), dtype=np.int32)
+    # limit the size of the intermediate float matrices for large routes
+    for start in range(0, len(locations), rows_per_chunk):
+        end = start + rows_per_chunk
+        distances[start:end] = np.rint(get_distance_matrix_in_meters(lats[start:end], lngs[start:end],
+                                                                     lats, lngs))
+        if progress is not None:
+            progress(min(end, len(locations)) / len(locations) * 100)
     return distances
 
 
@@ -49,7 +83,7 @@ def format_solution(manager, routing, solution):
     return route_through_nodes
 
 
-def route_calc_ortools(less_coordinates, route_name):
+def route_calc_ortools(less_coordinates, route_name, time_limit=0, progress=None):
     route_logger = get_origin_logger(logger, origin=route_name)
     data = create_data_model(less_coordinates)
 
@@ -60,14 +94,15 @@ def route_calc_ortools(less_coordinates, route_name):
     # Create Routing Model.
     routing = pywrapcp.RoutingModel(manager)
 
-    distance_matrix = compute_euclidean_distance_matrix(data['locations'])
+    distance_matrix = compute_distance_matrix(data['locations'],
+                                              progress=scale_progress(progress, 0, DISTANCE_MATRIX_PROGRESS))
 
     def distance_callback(from_index, to_index):
         """Returns the distance between the two nodes."""
         # Convert from routing variable Index to distance matrix NodeIndex.
         from_node = manager.IndexToNode(from_index)
         to_node = manager.IndexToNode(to_index)
-        return distance_matrix[from_node][to_node]
+        return int(distance_matrix[from_node, to_node])
 
     transit_callback_index = routing.RegisterTransitCallback(distance_callback)
 
@@ -77,6 +112,16 @@ def route_calc_ortools(less_coordinates, route_name):
     # Setting first solution heuristic.
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
     search_parameters.first_solution_strategy = (routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    if time_limit > 0:
+        # guided local search escapes local minima but only ever stops at the time limit
+        search_parameters.local_search_metaheuristic = (
+            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+        search_parameters.time_limit.seconds = time_limit
+
+    if progress is not None:
+        search_progress = SearchProgress(scale_progress(progress, DISTANCE_MATRIX_PROGRESS, 100), time_limit,
+                                         len(data['locations']))
+        routing.AddAtSolutionCallback(search_progress.on_solution)
 
     # Solve the problem.
     route_logger.debug("OR-Tools routecalc starting for route: {}", route_name)
@@ -86,7 +131,7 @@ def route_calc_ortools(less_coordinates, route_name):
     return format_solution(manager, routing, solution)
 
 
-def route_calc_all(less_coordinates, route_name, num_processes, algorithm):
+def route_calc_all(less_coordinates, route_name, num_processes, algorithm, time_limit=0, progress=None):
     route_logger = get_origin_logger(logger, origin=route_name)
     # check to see if we can use OR-Tools to perform our routecalc
     import platform
@@ -99,8 +144,8 @@ def route_calc_all(less_coordinates, route_name, num_processes, algorithm):
             route_logger.debug("OR-Tools not available, using MAD routecalc")
         else:
             route_logger.debug("Using OR-Tools for routecalc")
-            return route_calc_ortools(less_coordinates, route_name)
+            return route_calc_ortools(less_coordinates, route_name, time_limit=time_limit, progress=progress)
 
     route_logger.debug("Using MAD quick routecalc")
     from mapadroid.route.routecalc.calculate_route_quick import route_calc_impl
-    return route_calc_impl(less_coordinates, route_name, num_processes)
+    return route_calc_impl(less_coordinates, route_name, num_processes, progress=progress)
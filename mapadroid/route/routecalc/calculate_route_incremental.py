@@ -0,0 +1,182 @@
+import time
+from typing import List
+
+import numpy as np
+from mapadroid.route.routecalc.SpatialClusteringHelper import SpatialClusteringHelper
+from mapadroid.utils.collections import Location
+from mapadroid.utils.geo import get_distance_matrix_in_meters, get_distances_in_meters
+from mapadroid.utils.logging import logger, get_origin_logger
+
+# improvements below a meter are not worth another pass
+MIN_GAIN = 1.0
+
+
+def _get_nearest(from_lats, from_lngs, to_lats, to_lngs, exclude_same_index=False, rows_per_chunk=500):
+    """Index of and distance to the nearest destination for every start."""
+    nearest = np.zeros(len(from_lats), dtype=int)
+    distances = np.zeros(len(from_lats))
+    for start in range(0, len(from_lats), rows_per_chunk):
+        end = min(start + rows_per_chunk, len(from_lats))
+        matrix = get_distance_matrix_in_meters(from_lats[start:end], from_lngs[start:end], to_lats, to_lngs)
+        if exclude_same_index:
+            matrix[np.arange(end - start), np.arange(start, end)] = np.inf
+        nearest[start:end] = np.argmin(matrix, axis=1)
+        distances[start:end] = matrix[np.arange(end - start), nearest[start:end]]
+    return nearest, distances
+
+
+def _get_tour_length(lats, lngs, tour) -> float:
+    following = np.roll(tour, -1)
+    return float(get_distances_in_meters(lats[tour], lngs[tour], lats[following], lngs[following]).sum())
+
+
+def get_route_quality(route: List[Location]) -> float:
+    """
+    Length of the closed route relative to the sum of the distances of each location to its nearest neighbour.
+    Every location is left and entered at least that far, the ratio thus is at least 1 and does not depend on the
+    density of the locations. Lower is better.
+    """
+    if len(route) < 3:
+        return 1.0
+    lats = np.array([location.lat for location in route], dtype=float)
+    lngs = np.array([location.lng for location in route], dtype=float)
+    _, nearest_distances = _get_nearest(lats, lngs, lats, lngs, exclude_same_index=True)
+    if nearest_distances.sum() == 0:
+        return 1.0
+    return _get_tour_length(lats, lngs, np.arange(len(route))) / float(nearest_distances.sum())
+
+
+def _insert_cheapest(lats, lngs, tour, new_points):
+    for point in new_points:
+        if len(tour) < 2:
+            tour = np.append(tour, point)
+            continue
+        following = np.roll(tour, -1)
+        costs = get_distances_in_meters(lats[point], lngs[point], lats[tour], lngs[tour]) \
+            + get_distances_in_meters(lats[point], lngs[point], lats[following], lngs[following]) \
+            - get_distances_in_meters(lats[tour], lngs[tour], lats[following], lngs[following])
+        tour = np.insert(tour, int(np.argmin(costs)) + 1, point)
+    return tour
+
+
+def _get_distances(lats, lngs, origins, destinations):
+    """Distances between the locations at the given indices of lats and lngs."""
+    return get_distances_in_meters(lats[origins], lngs[origins], lats[destinations], lngs[destinations])
+
+
+def _two_opt(lats, lngs, tour, deadline):
+    """Reverses parts of the tour as long as that shortens it, returns whether anything changed."""
+    changed = False
+    improved = True
+    while improved and time.time() < deadline:
+        improved = False
+        for i in range(len(tour) - 2):
+            if time.time() >= deadline:
+                break
+            # replace the edge (edge_start, edge_end) and a later edge by the edges connecting both starts and both
+            # ends, evaluated for every later edge at once
+            edge_start, edge_end = tour[i], tour[i + 1]
+            later_starts = tour[i + 2:]
+            later_ends = np.roll(tour, -1)[i + 2:]
+            if i == 0:
+                # the last edge leads back to edge_start
+                later_starts, later_ends = later_starts[:-1], later_ends[:-1]
+            if len(later_starts) == 0:
+                continue
+            gains = _get_distances(lats, lngs, edge_start, edge_end) \
+                + _get_distances(lats, lngs, later_starts, later_ends) \
+                - _get_distances(lats, lngs, edge_start, later_starts) \
+                - _get_distances(lats, lngs, edge_end, later_ends)
+            best = int(np.argmax(gains))
+            if gains[best] > MIN_GAIN:
+                reverse_end = i + 2 + best
+                tour[i + 1:reverse_end + 1] = tour[i + 1:reverse_end + 1][::-1].copy()
+                improved = changed = True
+    return changed
+
+
+def _or_opt(lats, lngs, tour, deadline, max_segment_length=3):
+    """Moves segments of up to max_segment_length locations to cheaper positions, returns the new tour."""
+    improved = True
+    while improved and time.time() < deadline:
+        improved = False
+        for length in range(1, max_segment_length + 1):
+            i = 0
+            while i + length <= len(tour) and len(tour) >= length + 3 and time.time() < deadline:
+                segment = tour[i:i + length]
+                first, last = segment[0], segment[-1]
+                # the remaining tour starts after the segment and ends right before it
+                rest = np.concatenate((tour[i + length:], tour[:i]))
+                previous, following = rest[-1], rest[0]
+                removal_gain = _get_distances(lats, lngs, previous, first) \
+                    + _get_distances(lats, lngs, last, following) \
+                    - _get_distances(lats, lngs, previous, following)
+                # insert between insert_after and insert_before, the closing edge from previous to following is
+                # where the segment came from
+                insert_after, insert_before = rest[:-1], rest[1:]
+                edges = _get_distances(lats, lngs, insert_after, insert_before)
+                forward = _get_distances(lats, lngs, insert_after, first) \
+                    + _get_distances(lats, lngs, last, insert_before) - edges
+                backward = _get_distances(lats, lngs, insert_after, last) \
+                    + _get_distances(lats, lngs, first, insert_before) - edges
+                best_forward, best_backward = int(np.argmin(forward)), int(np.argmin(backward))
+                if min(forward[best_forward], backward[best_backward]) < removal_gain - MIN_GAIN:
+                    if forward[best_forward] <= backward[best_backward]:
+                        position = best_forward
+                    else:
+                        position, segment = best_backward, segment[::-1]
+                    moved = np.concatenate((rest[:position + 1], segment, rest[position + 1:]))
+                    # keep the start of the tour where it was
+                    tour = np.roll(moved, -int(np.flatnonzero(moved == tour[0])[0]))
+                    improved = True
+                else:
+                    i += 1
+    return tour
+
+
+def update_route(route: List[Location], coords, max_radius, max_coords_within_radius, use_s2: bool = False,
+                 s2_level: int = 15, time_limit: float = 5, route_name: str = 'Unknown') -> List[Location]:
+    """
+    Adapts a calculated route to changed coords instead of calculating a new one. Locations of the route no longer
+    covering any coord within max_radius are dropped, coords not covered by the route are clustered and inserted
+    at the cheapest positions. The result is improved by 2-opt and Or-opt moves for at most time_limit seconds.
+    """
+    route_logger = get_origin_logger(logger, origin=route_name)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+    route_lats = np.array([location.lat for location in route], dtype=float)
+    route_lngs = np.array([location.lng for location in route], dtype=float)
+    if len(coords) == 0:
+        return []
+    if len(route) == 0:
+        covered = np.zeros(len(coords), dtype=bool)
+        kept = np.zeros(0, dtype=int)
+    else:
+        nearest, distances = _get_nearest(coords[:, 0], coords[:, 1], route_lats, route_lngs)
+        covered = distances <= (max_radius or 0)
+        kept = np.flatnonzero(np.isin(np.arange(len(route)), nearest[covered]))
+
+    uncovered = coords[~covered]
+    if len(uncovered) > 0 and max_radius and max_coords_within_radius:
+        clustering_helper = SpatialClusteringHelper(max_radius=max_radius,
+                                                    max_count_per_circle=max_coords_within_radius,
+                                                    max_timedelta_seconds=0, use_s2=use_s2, s2_level=s2_level)
+        clustered = clustering_helper.get_clustered([(0, Location(lat, lng)) for lat, lng in uncovered.tolist()])
+        uncovered = np.array([(event[1].lat, event[1].lng) for event in clustered], dtype=float).reshape(-1, 2)
+    route_logger.info("Updating route: keeping {} of {} positions, inserting {} new ones", len(kept), len(route),
+                      len(uncovered))
+
+    lats = np.concatenate((route_lats[kept], uncovered[:, 0]))
+    lngs = np.concatenate((route_lngs[kept], uncovered[:, 1]))
+    tour = _insert_cheapest(lats, lngs, np.arange(len(kept)), range(len(kept), len(lats)))
+    if len(tour) > 3:
+        deadline = time.time() + time_limit
+        length_before = _get_tour_length(lats, lngs, tour)
+        while time.time() < deadline:
+            changed = _two_opt(lats, lngs, tour, deadline)
+            length = _get_tour_length(lats, lngs, tour)
+            tour = _or_opt(lats, lngs, tour, deadline)
+            if not changed and _get_tour_length(lats, lngs, tour) >= length - MIN_GAIN:
+                break
+        route_logger.debug("Improved updated route from {:.0f}m to {:.0f}m", length_before,
+                           _get_tour_length(lats, lngs, tour))
+    return [Location(lat, lng) for lat, lng in zip(lats[tour].tolist(), lngs[tour].tolist())]
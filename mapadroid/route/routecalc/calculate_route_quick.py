@@ -4,26 +4,31 @@ from mapadroid.utils.logging import get_logger, LoggerEnums
 logger = get_logger(LoggerEnums.routemanager)
 
 
-def route_calc_impl(coords, route_name, num_processes=1):
+def route_calc_impl(coords, route_name, num_processes=1, progress=None):
     with logger.contextualize(origin=route_name):
         less_coords_array = []
         for i in range(len(coords)):
             less_coords_array.append([coords[i][0].item(), coords[i][1].item()])
 
-        length, path = tsp(less_coords_array)
+        length, path = tsp(less_coords_array, progress=progress)
         logger.info("Found {} long solution: ", length)
 
     return path
 
 
-def tsp(data):
+def tsp(data, progress=None):
+    def report(percent):
+        if progress is not None:
+            progress(percent)
+
     logger.info("building the graph for a route of {}", len(data))
     # build a graph
-    graph_data = build_graph(data)
+    graph_data = build_graph(data, progress=lambda percent: report(percent * 0.15))
 
-    # build a minimum spanning tree
+    # build a minimum spanning tree, sorting the edges takes most of the time
     logger.info("Building a min span tree..")
     min_span_tree = minimum_spanning_tree(graph_data)
+    report(95)
 
     # find odd vertexes
     logger.info("Finding odd vertexes...")
@@ -32,6 +37,7 @@ def tsp(data):
     # add minimum weight matching edges to MST
     logger.info("Adding minimum weight matching edges to MST...")
     minimum_weight_matching(min_span_tree, graph_data, odd_vertexes)
+    report(97)
 
     # find an eulerian tour
     logger.info("Finding and Eulerian tour...")
@@ -61,9 +67,11 @@ def get_length(x1, y1, x2, y2):
     return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** (1 / 2)
 
 
-def build_graph(data):
+def build_graph(data, progress=None):
     graph = {}
     for this in range(len(data)):
+        if progress is not None:
+            progress(this / len(data) * 100)
         for another_point in range(len(data)):
             if this != another_point:
                 if this not in graph:
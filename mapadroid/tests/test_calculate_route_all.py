@@ -0,0 +1,59 @@
+import random
+import time
+from unittest import TestCase
+
+from mapadroid.route.routecalc.calculate_route_all import (compute_distance_matrix, create_data_model,
+                                                           scale_progress, SearchProgress)
+from mapadroid.route.routecalc.calculate_route_quick import tsp
+from mapadroid.utils.geo import get_distance_of_two_points_in_meters
+
+
+class DistanceMatrixTests(TestCase):
+    def test_distances_in_meters(self):
+        random.seed(0)
+        coords = [(50 + random.uniform(0, 0.05), 8 + random.uniform(0, 0.05)) for _ in range(120)]
+        locations = create_data_model(coords)['locations']
+        distances = compute_distance_matrix(locations, rows_per_chunk=50)
+        self.assertEqual(distances.shape, (120, 120))
+        for from_node in range(0, 120, 7):
+            for to_node in range(120):
+                expected = get_distance_of_two_points_in_meters(*coords[from_node], *coords[to_node])
+                self.assertLessEqual(abs(distances[from_node, to_node] - expected), 0.5)
+        self.assertTrue((distances == distances.T).all())
+        self.assertEqual(distances.diagonal().tolist(), [0] * 120)
+
+    def test_progress(self):
+        reported = []
+        locations = create_data_model([(50 + i / 1000, 8.0) for i in range(120)])['locations']
+        compute_distance_matrix(locations, rows_per_chunk=50, progress=scale_progress(reported.append, 0, 10))
+        self.assertEqual([round(percent, 1) for percent in reported], [round(50 / 12, 1), round(100 / 12, 1), 10])
+
+
+class ProgressTests(TestCase):
+    def test_search_with_time_limit(self):
+        reported = []
+        search_progress = SearchProgress(reported.append, time_limit=10, location_count=100)
+        search_progress._started = time.time() - 5
+        search_progress.on_solution()
+        search_progress._started = time.time() - 20
+        search_progress.on_solution()
+        self.assertAlmostEqual(reported[0], 50, delta=1)
+        self.assertEqual(reported[1], 99)
+
+    def test_search_without_time_limit(self):
+        reported = []
+        search_progress = SearchProgress(reported.append, time_limit=0, location_count=100)
+        for _ in range(100):
+            search_progress.on_solution()
+        self.assertEqual(reported[-1], 50)
+        self.assertEqual(reported, sorted(reported))
+
+    def test_quick_routecalc(self):
+        random.seed(0)
+        reported = []
+        length, path = tsp([(50 + random.uniform(0, 0.05), 8 + random.uniform(0, 0.05)) for _ in range(50)],
+                           progress=reported.append)
+        self.assertEqual(sorted(path), list(range(50)))
+        self.assertEqual(reported, sorted(reported))
+        self.assertEqual(reported[0], 0)
+        self.assertEqual(reported[-1], 97)
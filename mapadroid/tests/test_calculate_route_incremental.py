@@ -0,0 +1,50 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from mapadroid.route.routecalc.calculate_route_incremental import get_route_quality, update_route
+from mapadroid.utils.collections import Location
+from mapadroid.utils.geo import get_distance_matrix_in_meters
+
+
+class UpdateRouteTests(TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.coords = np.array([(50 + random.uniform(0, 0.02), 8 + random.uniform(0, 0.02)) for _ in range(300)])
+        self.route = update_route([], self.coords, 70, 10, time_limit=2)
+
+    def assert_covers(self, route, coords):
+        distances = get_distance_matrix_in_meters(coords[:, 0], coords[:, 1], [location.lat for location in route],
+                                                  [location.lng for location in route])
+        self.assertLessEqual(distances.min(axis=1).max(), 70)
+        self.assertEqual(len(set(route)), len(route))
+
+    def test_route_from_scratch(self):
+        self.assert_covers(self.route, self.coords)
+        self.assertLess(len(self.route), len(self.coords))
+        self.assertLess(get_route_quality(self.route), 2)
+
+    def test_drop_positions(self):
+        remaining = self.coords[::4]
+        route = update_route(self.route, remaining, 70, 10, time_limit=1)
+        self.assert_covers(route, remaining)
+        self.assertTrue(set(route) <= set(self.route))
+        self.assertLess(len(route), len(self.route))
+
+    def test_insert_positions(self):
+        coords = np.concatenate((self.coords, [(50.03, 8.03), (49.99, 8.01)]))
+        route = update_route(self.route, coords, 70, 10, time_limit=1)
+        self.assert_covers(route, coords)
+        self.assertIn(Location(50.03, 8.03), route)
+        self.assertIn(Location(49.99, 8.01), route)
+
+    def test_unchanged_coords(self):
+        self.assertEqual(set(update_route(self.route, self.coords, 70, 10, time_limit=1)), set(self.route))
+        self.assertEqual(update_route(self.route, [], 70, 10), [])
+
+    def test_route_quality(self):
+        square = [Location(0.0, 0.0), Location(0.0, 0.001), Location(0.001, 0.001), Location(0.001, 0.0)]
+        self.assertAlmostEqual(get_route_quality(square), 1.0, places=3)
+        crossed = [square[0], square[2], square[1], square[3]]
+        self.assertGreater(get_route_quality(crossed), 1.2)
@@ -0,0 +1,40 @@
+import random
+from unittest import TestCase
+from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper
+from mapadroid.route.routecalc.SpatialClusteringHelper import SpatialClusteringHelper
+from mapadroid.utils.collections import Location
+
+
+class SpatialClusteringHelperTests(TestCase):
+    def setUp(self):
+        random.seed(0)
+
+    def get_queue(self, events, spread, max_timestamp):
+        queue = [(random.randint(0, max_timestamp),
+                  Location(round(50 + random.uniform(0, spread), 5), round(8 + random.uniform(0, spread), 5)))
+                 for _ in range(events)]
+        # duplicate events as well as events sharing a location
+        queue += random.sample(queue, 5)
+        queue += [(random.randint(0, max_timestamp), event[1]) for event in random.sample(queue, 5)]
+        return queue
+
+    def assert_same_clusters(self, queue, max_radius, max_count_per_circle, max_timedelta_seconds):
+        expected = ClusteringHelper(max_radius, max_count_per_circle,
+                                    max_timedelta_seconds).get_clustered(list(queue))
+        clustered = SpatialClusteringHelper(max_radius, max_count_per_circle,
+                                            max_timedelta_seconds).get_clustered(list(queue))
+        self.assertEqual(clustered, expected)
+        return clustered
+
+    def test_same_as_pairwise(self):
+        queue = self.get_queue(300, 0.01, 0)
+        clustered = self.assert_same_clusters(queue, 70, 10, 0)
+        self.assertLess(len(clustered), len(queue))
+
+    def test_same_as_pairwise_within_time(self):
+        queue = self.get_queue(300, 0.01, 900)
+        self.assert_same_clusters(queue, 70, 5, 300)
+
+    def test_single_event(self):
+        queue = [(0, Location(50.0, 8.0))]
+        self.assertEqual(self.assert_same_clusters(queue, 70, 10, 0), [(0, Location(50.0, 8.0))])
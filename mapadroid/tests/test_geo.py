@@ -0,0 +1,48 @@
+import random
+from unittest import TestCase
+
+import gpxdata
+import numpy as np
+
+from mapadroid.utils.geo import (
+    get_bearings,
+    get_destinations,
+    get_distance_matrix_in_meters,
+    get_distance_of_two_points_in_meters,
+    get_distances_in_meters
+)
+
+
+class GeoTests(TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.lats = np.array([random.uniform(-80, 80) for _ in range(100)])
+        self.lngs = np.array([random.uniform(-180, 180) for _ in range(100)])
+
+    def test_distances(self):
+        expected = [get_distance_of_two_points_in_meters(self.lats[0], self.lngs[0], lat, lng)
+                    for lat, lng in zip(self.lats, self.lngs)]
+        np.testing.assert_allclose(get_distances_in_meters(self.lats[0], self.lngs[0], self.lats, self.lngs),
+                                   expected, rtol=1e-12, atol=1e-6)
+        self.assertEqual(get_distances_in_meters(50.0, 8.0, [], []).shape, (0,))
+
+    def test_distance_matrix(self):
+        matrix = get_distance_matrix_in_meters(self.lats[:10], self.lngs[:10], self.lats, self.lngs)
+        self.assertEqual(matrix.shape, (10, 100))
+        for row in range(10):
+            np.testing.assert_allclose(matrix[row], get_distances_in_meters(self.lats[row], self.lngs[row],
+                                                                            self.lats, self.lngs))
+        np.testing.assert_allclose(np.diagonal(matrix), 0, atol=1e-6)
+
+    def test_bearings_and_destinations(self):
+        bearings = get_bearings(self.lats[0], self.lngs[0], self.lats[1:], self.lngs[1:])
+        expected = [gpxdata.Util.course(self.lats[0], self.lngs[0], lat, lng)
+                    for lat, lng in zip(self.lats[1:], self.lngs[1:])]
+        np.testing.assert_allclose(bearings, expected, atol=1e-9)
+
+        lats, lngs = get_destinations(self.lats, self.lngs, 1000, bearings[0], earth_radius=gpxdata.Util.r_earth)
+        expected = [gpxdata.Util.endPosition(lat, lng, bearings[0], 1000) for lat, lng in zip(self.lats, self.lngs)]
+        np.testing.assert_allclose(lats, [position[0] for position in expected], atol=1e-9)
+        np.testing.assert_allclose(lngs, [position[1] for position in expected], atol=1e-9)
+        np.testing.assert_allclose(get_distances_in_meters(self.lats[0], self.lngs[0], lats[:1], lngs[:1]),
+                                   [1000 * 6373000.0 / gpxdata.Util.r_earth], rtol=1e-9)
@@ -0,0 +1,86 @@
+import math
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from mapadroid.geofence.geofenceHelper import GeofenceHelper
+from mapadroid.geofence.preparedPolygon import PreparedPolygon
+
+
+def random_polygon(vertices, center_lat, center_lon, radius):
+    fence = []
+    for i in range(vertices):
+        angle = 2 * math.pi * i / vertices
+        distance = radius * random.uniform(0.3, 1.0)
+        fence.append("%f,%f" % (center_lat + distance * math.cos(angle), center_lon + distance * math.sin(angle)))
+    return fence
+
+
+class GeofenceHelperTests(TestCase):
+    def setUp(self):
+        random.seed(0)
+        include = {"fence_data": ["[star]"] + random_polygon(200, 50.0, 8.0, 0.2) +
+                   ["[square]", "50,8", "50,8.1", "50.1,8.1", "50.1,8"]}
+        exclude = {"fence_data": ["[hole]"] + random_polygon(50, 50.0, 8.0, 0.05)}
+        self.geofence_helper = GeofenceHelper(include, exclude)
+        self.coordinates = [(random.uniform(49.7, 50.3), random.uniform(7.7, 8.3)) for _ in range(2000)]
+        # vertices and edges of the square
+        self.coordinates += [(50.0, 8.0), (50.1, 8.1), (50.05, 8.0), (50.05, 8.1), (50.0, 8.05), (50.1, 8.05)]
+
+    def get_geofenced_point_by_point(self):
+        geofenced_coordinates = []
+        for coord in self.coordinates:
+            point = {'lat': coord[0], 'lon': coord[1]}
+            if any(GeofenceHelper.is_point_in_polygon_custom(point, area['polygon'])
+                   for area in self.geofence_helper.excluded_areas):
+                continue
+            if any(GeofenceHelper.is_point_in_polygon_custom(point, area['polygon'])
+                   for area in self.geofence_helper.geofenced_areas):
+                geofenced_coordinates.append(coord)
+        return geofenced_coordinates
+
+    def test_matches_point_by_point(self):
+        expected = self.get_geofenced_point_by_point()
+        self.assertTrue(0 < len(expected) < len(self.coordinates))
+        self.assertEqual(self.geofence_helper.get_geofenced_coordinates(self.coordinates), expected)
+        self.assertEqual([coord for coord in self.coordinates
+                          if self.geofence_helper.is_coord_inside_include_geofence(coord)], expected)
+
+    def test_keeps_tuples(self):
+        coordinates = [(50.05, 8.05, "spawn"), (0.0, 0.0, "outside")]
+        self.assertEqual(self.geofence_helper.get_geofenced_coordinates(coordinates), [(50.05, 8.05, "spawn")])
+        self.assertEqual(self.geofence_helper.get_geofenced_coordinates([]), [])
+
+    def test_no_geofence(self):
+        geofence_helper = GeofenceHelper(None, None)
+        self.assertEqual(geofence_helper.get_geofenced_coordinates(self.coordinates), self.coordinates)
+
+
+class PreparedPolygonTests(TestCase):
+    def test_contains(self):
+        polygon = PreparedPolygon([{"lat": 0.0, "lon": 0.0}, {"lat": 0.0, "lon": 1.0}, {"lat": 1.0, "lon": 1.0},
+                                   {"lat": 1.0, "lon": 0.0}])
+        lats = np.array([0.5, 1.5, 0.5, -0.1])
+        lons = np.array([0.5, 0.5, 1.5, 0.5])
+        self.assertEqual(polygon.contains(lats, lons).tolist(), [True, False, False, False])
+        self.assertTrue(polygon.contains_point(0.5, 0.5))
+        self.assertFalse(polygon.contains_point(1.5, 0.5))
+
+    def test_grid(self):
+        random.seed(0)
+        fence = random_polygon(500, 50.0, 8.0, 0.2)
+        polygon = PreparedPolygon([{"lat": float(lat), "lon": float(lon)}
+                                   for lat, lon in (coord.split(",") for coord in fence)])
+        self.assertLess(polygon.get_boundary_share(), 0.5)
+        # points on the borders of the cells
+        lats = polygon.min_lat + np.repeat(np.arange(polygon._grid_size + 1), 50) * polygon._cell_lat
+        lons = np.tile(np.linspace(polygon.min_lon, polygon.max_lon, 50), polygon._grid_size + 1)
+        expected = polygon._contains_exact(lats, lons)
+        self.assertEqual(polygon.contains(lats, lons).tolist(), expected.tolist())
+        self.assertEqual([polygon.contains_point(lat, lon) for lat, lon in zip(lats, lons)], expected.tolist())
+
+    def test_empty_polygon(self):
+        polygon = PreparedPolygon([])
+        self.assertFalse(polygon.contains_point(0.0, 0.0))
+        self.assertEqual(polygon.contains(np.array([0.0]), np.array([0.0])).tolist(), [False])
@@ -0,0 +1,60 @@
+from multiprocessing import Process
+from threading import Thread
+from unittest import TestCase
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
+from mapadroid.utils.collections import Location
+
+
+def update_store(store: LatestProtoStore):
+    store.update("other", 106, 300.0, 301.0, Location(3.0, 4.0))
+
+
+class LatestProtoStoreTests(TestCase):
+    def test_metadata(self):
+        store = LatestProtoStore(max_origins=4)
+        self.assertIsNone(store.get("origin"))
+        store.update("origin", 106, 100.0, 101.0, Location(1.0, 2.0))
+        store.update("origin", 102, 200.0, 202.0, Location(1.5, 2.5))
+        latest = store.get("origin")
+        self.assertEqual(latest[106], {"timestamp": 100.0})
+        self.assertEqual(latest[102], {"timestamp": 200.0})
+        self.assertNotIn(101, latest)
+        self.assertEqual(latest["location"], Location(1.5, 2.5))
+        self.assertEqual(latest["timestamp_last_data"], 200.0)
+        self.assertEqual(latest["timestamp_receiver"], 202.0)
+
+    def test_unknown_proto_type(self):
+        store = LatestProtoStore(max_origins=4)
+        store.update("origin", 1, 100.0, 101.0, Location(1.0, 2.0))
+        self.assertIsNone(store.get("origin"))
+
+    def test_full(self):
+        store = LatestProtoStore(max_origins=1)
+        store.update("origin", 106, 100.0, 101.0, Location(1.0, 2.0))
+        store.update("other", 106, 100.0, 101.0, Location(1.0, 2.0))
+        self.assertIsNotNone(store.get("origin"))
+        self.assertIsNone(store.get("other"))
+
+    def test_shared_across_processes(self):
+        store = LatestProtoStore(max_origins=4)
+        store.update("origin", 106, 100.0, 101.0, Location(1.0, 2.0))
+        process = Process(target=update_store, args=(store,))
+        process.start()
+        process.join()
+        self.assertEqual(store.get("other")[106], {"timestamp": 300.0})
+        self.assertEqual(store.get("origin")[106], {"timestamp": 100.0})
+
+    def test_partially_written_origin(self):
+        store = LatestProtoStore(max_origins=4)
+        results = []
+        with store._write_lock:
+            store._origins[0:3] = b"ori"
+            reader = Thread(target=lambda: results.append(store.get("origin")))
+            reader.start()
+            reader.join(timeout=0.2)
+            # the reader waits for the origin to be written completely
+            self.assertTrue(reader.is_alive())
+            store._origins[3:6] = b"gin"
+        reader.join()
+        self.assertEqual(results, [None])
+        self.assertNotIn("ori", store._slots)
@@ -0,0 +1,25 @@
+from unittest import TestCase
+from mapadroid.mitm_receiver.MitmDataRouter import MitmDataRouter, MitmDataShard, parse_shard_config
+
+
+class MitmDataRouterTests(TestCase):
+    def test_default_shard(self):
+        self.assertEqual(parse_shard_config("", 2), [("default", None, 2)])
+
+    def test_dedicated_shards(self):
+        shards = parse_shard_config("106:4;102,101:2", 1)
+        self.assertEqual(shards, [("106", {106}, 4), ("101,102", {101, 102}, 2), ("default", None, 1)])
+
+    def test_invalid_config(self):
+        for shard_config in ["106", "999:1", "106:1;106:2", "106:0"]:
+            with self.assertRaises(ValueError):
+                parse_shard_config(shard_config, 1)
+
+    def test_origin_keeps_worker(self):
+        shard = MitmDataShard("106", {106}, 4)
+        router = MitmDataRouter([shard, MitmDataShard("default", None, 1)])
+        self.assertIs(shard.get_queue_for_origin("device1"), shard.get_queue_for_origin("device1"))
+        self.assertIs(router._shard_by_type[106], shard)
+        self.assertIs(router._default_shard, router.shards[1])
+        for sub_shard in router.shards:
+            sub_shard.close()
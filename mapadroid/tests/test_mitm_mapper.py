@@ -0,0 +1,45 @@
+import tempfile
+import time
+from threading import Thread
+from types import SimpleNamespace
+from unittest import TestCase
+from mapadroid.mitm_receiver.MitmMapper import MitmMapper
+from mapadroid.utils.collections import Location
+
+
+class DeviceMappings:
+    def get_all_devicemappings(self):
+        return {"origin": {}}
+
+
+class MitmMapperWaitTests(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        args = SimpleNamespace(game_stats=False, file_path=self.tempdir.name)
+        self.mitm_mapper = MitmMapper(args, DeviceMappings(), None)
+
+    def tearDown(self):
+        self.mitm_mapper.shutdown()
+        self.tempdir.cleanup()
+
+    def test_returns_available_data(self):
+        self.mitm_mapper.update_latest("origin", 106, {"payload": {}}, 100.0, 101.0, Location(1.0, 2.0))
+        metadata = self.mitm_mapper.wait_for_proto("origin", [106], 50.0, 1)
+        self.assertEqual(metadata[106], {"timestamp": 100.0})
+        self.assertEqual(metadata["location"], Location(1.0, 2.0))
+
+    def test_timeout(self):
+        self.mitm_mapper.update_latest("origin", 106, {"payload": {}}, 100.0, 101.0, Location(1.0, 2.0))
+        self.assertIsNone(self.mitm_mapper.wait_for_proto("origin", [106], 100.0, 0.1))
+        self.assertIsNone(self.mitm_mapper.wait_for_proto("origin", [101], 0.0, 0.1))
+
+    def test_woken_by_update(self):
+        update = Thread(target=lambda: (time.sleep(0.2),
+                                        self.mitm_mapper.update_latest("origin", 102, {}, 200.0, 201.0,
+                                                                       Location(1.0, 2.0))))
+        update.start()
+        start = time.time()
+        metadata = self.mitm_mapper.wait_for_proto("origin", [106, 102], 0.0, 5)
+        update.join()
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(metadata[102], {"timestamp": 200.0})
@@ -0,0 +1,59 @@
+import time
+from unittest import TestCase
+from mapadroid.route.routecalc.RouteCalcExecutor import (RouteCalcCancelledError, RouteCalcError, RouteCalcExecutor,
+                                                         RouteCalcJobStatus)
+
+
+def add(first, second, progress=None):
+    progress(50)
+    return first + second
+
+
+def sleep(seconds, progress=None):
+    time.sleep(seconds)
+    return seconds
+
+
+def fail(progress=None):
+    raise ValueError("no route")
+
+
+class RouteCalcExecutorTests(TestCase):
+    def setUp(self):
+        self.executor = RouteCalcExecutor(max_processes=1)
+
+    def tearDown(self):
+        self.executor.stop()
+
+    def test_result(self):
+        self.assertEqual(self.executor.calculate("add", add, args=(1, 2)), 3)
+        status = self.executor.get_jobs()[0]
+        self.assertEqual(status["status"], RouteCalcJobStatus.FINISHED.value)
+        self.assertEqual(status["progress"], 100.0)
+
+    def test_identical_jobs_are_merged(self):
+        first = self.executor.submit("sleep", sleep, args=(0.5,))
+        second = self.executor.submit("sleep", sleep, args=(0.5,))
+        other = self.executor.submit("sleep", sleep, args=(0.1,))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(self.executor.get_result(second, timeout=10), 0.5)
+        self.assertEqual(self.executor.get_result(other, timeout=10), 0.1)
+
+    def test_failure(self):
+        with self.assertRaises(RouteCalcError) as context:
+            self.executor.calculate("fail", fail)
+        self.assertIn("no route", str(context.exception))
+
+    def test_cancel(self):
+        running = self.executor.submit("sleep", sleep, args=(30,), identifier=1)
+        queued = self.executor.submit("add", add, args=(1, 2), identifier=2)
+        while self.executor.get_status(running)["status"] != RouteCalcJobStatus.RUNNING.value:
+            time.sleep(0.05)
+        self.assertTrue(self.executor.cancel(queued))
+        self.assertTrue(self.executor.cancel(running))
+        self.assertFalse(self.executor.cancel(running))
+        for job_id in (running, queued):
+            with self.assertRaises(RouteCalcCancelledError):
+                self.executor.get_result(job_id, timeout=10)
+            self.assertEqual(self.executor.get_status(job_id)["status"], RouteCalcJobStatus.CANCELLED.value)
@@ -0,0 +1,47 @@
+import time
+from threading import Thread
+from unittest import TestCase, mock
+from mapadroid.route.RouteManagerLeveling import RouteManagerLeveling
+from mapadroid.route.RouteManagerLevelingRoutefree import RouteManagerLevelingRoutefree
+from mapadroid.route.routecalc.RouteCalcExecutor import RouteCalcExecutor, RouteCalcJobStatus
+from mapadroid.utils.collections import Location
+
+
+def sleep(seconds, progress=None):
+    time.sleep(seconds)
+    return seconds
+
+
+class LevelingSubrouteTests(TestCase):
+    def setUp(self):
+        self.executor = RouteCalcExecutor(max_processes=1)
+
+    def tearDown(self):
+        self.executor.stop()
+
+    def calculate_subroute(self, *args, **kwargs):
+        return self.executor.calculate("leveling", sleep, args=(30,), identifier=1)
+
+    def cancel_when_running(self):
+        while True:
+            running = [job for job in self.executor.get_jobs()
+                       if job["status"] == RouteCalcJobStatus.RUNNING.value]
+            if running:
+                self.executor.cancel(running[0]["job_id"])
+                return
+            time.sleep(0.05)
+
+    def test_cancelled_subroute(self):
+        stops = [Location(50.0, 8.0), Location(50.1, 8.1)]
+        for route_manager_class in (RouteManagerLeveling, RouteManagerLevelingRoutefree):
+            route_resource = mock.MagicMock()
+            route_resource.calculate_new_route.side_effect = self.calculate_subroute
+            route_manager = route_manager_class(mock.MagicMock(), mock.MagicMock(), 1, None, 10, 1, None, None,
+                                                route_resource, name="leveling", settings={},
+                                                route_calc_executor=self.executor)
+            canceller = Thread(target=self.cancel_when_running)
+            canceller.start()
+            # the unvisited stops are visited unordered instead
+            self.assertEqual(route_manager._local_recalc_subroute(stops),
+                             [{'lat': 50.0, 'lng': 8.0}, {'lat': 50.1, 'lng': 8.1}])
+            canceller.join()
@@ -0,0 +1,60 @@
+from unittest import TestCase, mock
+import numpy as np
+from mapadroid.data_manager.modules import routecalc
+from mapadroid.data_manager.modules.routecalc import RouteCalc, get_route_input_hash, get_routefile
+
+
+class DataManager:
+    instance_id = 1
+    dbc = None
+
+
+class RouteInputHashTests(TestCase):
+    coords = [(50.0, 8.0), (50.001, 8.001), (50.002, 8.0)]
+
+    def get_hash(self, coords=None, **kwargs):
+        settings = dict(max_radius=70, max_coords_within_radius=10, algorithm='route', use_s2=False, s2_level=15,
+                        time_limit=0)
+        settings.update(kwargs)
+        return get_route_input_hash(self.coords if coords is None else coords, **settings)
+
+    def test_order_does_not_matter(self):
+        self.assertEqual(self.get_hash(), self.get_hash(list(reversed(self.coords))))
+        self.assertEqual(self.get_hash(), self.get_hash([(str(lat), str(lng)) for lat, lng in self.coords]))
+
+    def test_inputs_matter(self):
+        self.assertNotEqual(self.get_hash(), self.get_hash(self.coords[:2]))
+        self.assertNotEqual(self.get_hash(), self.get_hash(max_radius=80))
+        self.assertNotEqual(self.get_hash(), self.get_hash(algorithm='quick'))
+        self.assertNotEqual(self.get_hash(), self.get_hash(use_s2=True))
+        self.assertNotEqual(self.get_hash(), self.get_hash(time_limit=10))
+        # the S2 level is not used without S2
+        self.assertEqual(self.get_hash(), self.get_hash(s2_level=13))
+
+
+class RouteCalcCacheTests(TestCase):
+    coords = np.array([(50.0, 8.0), (50.01, 8.01)])
+
+    def setUp(self):
+        self.resource = RouteCalc(DataManager())
+        patcher = mock.patch.object(routecalc, 'calculate_route', wraps=routecalc.calculate_route)
+        self.calculate_route = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_route(self, coords=None):
+        return self.resource.get_json_route(self.coords if coords is None else coords, 70, 10, in_memory=True)
+
+    def test_calculated_route_is_reused(self):
+        route = self.get_route()
+        self.resource['routefile'] = get_routefile(route)
+        self.assertEqual(self.get_route(), route)
+        self.assertEqual(self.calculate_route.call_count, 1)
+        self.get_route(self.coords[:1])
+        self.assertEqual(self.calculate_route.call_count, 2)
+
+    def test_edited_route_is_not_reused(self):
+        route = self.get_route()
+        self.resource['routefile'] = list(reversed(get_routefile(route)))
+        self.assertIsNone(self.resource.input_hash)
+        self.get_route()
+        self.assertEqual(self.calculate_route.call_count, 2)
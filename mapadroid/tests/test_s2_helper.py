@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from mapadroid.geofence.geofenceHelper import GeofenceHelper
+from mapadroid.utils.collections import Location
+from mapadroid.utils.s2Helper import S2Helper
+
+
+class S2HelperTests(TestCase):
+    def test_hex_grid(self):
+        center = Location(50.0, 8.0)
+        lats, lngs = S2Helper._generate_hex_grid(center, 70, 5)
+        expected = []
+        for ring in range(1, 5):
+            for i in range(0, 6):
+                star_loc = S2Helper.get_new_coords(center, 70 * ring, 90 + 60 * i)
+                for index in range(0, ring):
+                    expected.append(S2Helper.get_new_coords(star_loc, 70 * index, 210 + 60 * i))
+        self.assertEqual(len(lats), len(expected))
+        for lat, lng, location in zip(lats, lngs, expected):
+            self.assertAlmostEqual(lat, location.lat, places=9)
+            self.assertAlmostEqual(lng, location.lng, places=9)
+
+    def test_generate_locations(self):
+        geofence_helper = GeofenceHelper({"fence_data": ["[square]", "50,8", "50,8.02", "50.01,8.02", "50.01,8"]},
+                                         None)
+        locations = S2Helper._generate_locations(70, geofence_helper)
+        self.assertTrue(locations)
+        self.assertTrue(all(geofence_helper.is_coord_inside_include_geofence(location) for location in locations))
+        # rows from north to south, the first one from west to east, the second one from east to west
+        self.assertGreater(locations[0].lat, locations[-1].lat)
+        self.assertLess(locations[0].lng, locations[1].lng)
+
+    def test_order_location_list_rows(self):
+        locations = [Location(1.0, 1.0), Location(2.0, 2.0), Location(2.00005, 1.0), Location(1.0, 2.0),
+                     Location(0.0, 0.0)]
+        self.assertEqual(S2Helper.order_location_list_rows(locations),
+                         [Location(2.00005, 1.0), Location(2.0, 2.0), Location(1.0, 2.0), Location(1.0, 1.0),
+                          Location(0.0, 0.0)])
+        self.assertEqual(S2Helper.order_location_list_rows([]), [])
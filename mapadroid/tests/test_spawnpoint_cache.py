@@ -0,0 +1,60 @@
+import multiprocessing
+import pickle
+import time
+from unittest import TestCase
+from mapadroid.db.SpawnpointCache import SpawnpointCache
+from mapadroid.utils.collections import SpawnpointDetails
+
+
+class SpawnpointCacheTests(TestCase):
+    def test_hits_and_misses(self):
+        cache = SpawnpointCache(maxsize=10, ttl=60)
+        cache.update({1: SpawnpointDetails(240, "12:34", 1)})
+        found, missing = cache.get_many([1, 2])
+        self.assertEqual(found, {1: SpawnpointDetails(240, "12:34", 1)})
+        self.assertEqual(missing, [2])
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_eviction(self):
+        cache = SpawnpointCache(maxsize=2, ttl=60)
+        cache.update({1: SpawnpointDetails(240, None, 1), 2: SpawnpointDetails(240, None, 1)})
+        cache.get_many([1])
+        cache.update({3: SpawnpointDetails(240, None, 1)})
+        found, missing = cache.get_many([1, 2, 3])
+        self.assertEqual(set(found.keys()), {1, 3})
+        self.assertEqual(missing, [2])
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = SpawnpointCache(maxsize=10, ttl=1)
+        cache.update({1: SpawnpointDetails(240, None, 1)})
+        cache._entries[1] = (cache._entries[1][0], time.time() - 2)
+        found, missing = cache.get_many([1])
+        self.assertEqual(found, {})
+        self.assertEqual(missing, [1])
+
+    def test_disabled(self):
+        cache = SpawnpointCache(maxsize=0)
+        cache.update({1: SpawnpointDetails(240, None, 1)})
+        found, missing = cache.get_many([1])
+        self.assertEqual(found, {})
+        self.assertEqual(missing, [1])
+
+    def test_invalidation_reaches_child_processes(self):
+        cache = SpawnpointCache(maxsize=10, ttl=60)
+        cache.update({1: SpawnpointDetails(240, None, 1), 2: SpawnpointDetails(240, None, 1)})
+        process = multiprocessing.Process(target=cache.invalidate, args=([1],))
+        process.start()
+        process.join()
+        found, missing = cache.get_many([1, 2])
+        self.assertEqual(found, {})
+        self.assertEqual(missing, [1, 2])
+
+    def test_pickled_for_other_processes(self):
+        cache = SpawnpointCache(maxsize=10, ttl=60)
+        cache.update({1: SpawnpointDetails(240, None, 1)})
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(copy.get_stats()["maxsize"], 10)
+        self.assertEqual(copy.get_many([1]), ({}, [1]))
@@ -0,0 +1,65 @@
+from unittest import TestCase, mock
+from mapadroid.db.DbWebhookReader import DbWebhookReader
+
+
+class ChangeLog:
+    """Fake executor serving the committed rows of the change log"""
+
+    def __init__(self):
+        self.rows = []
+
+    def commit(self, *rows):
+        self.rows.extend(rows)
+
+    def autofetch_value(self, sql, args=()):
+        return max((row[0] for row in self.rows), default=None)
+
+    def execute(self, sql, args=(), commit=False):
+        rows = sorted(self.rows)
+        if "WHERE id > %s" in sql:
+            return [row for row in rows if row[0] > args[0]][:args[1]]
+        return [row for row in rows if row[0] in args]
+
+
+class ChangeCursorTests(TestCase):
+    def setUp(self):
+        self.change_log = ChangeLog()
+        self.change_log.commit((1, "pokemon", "1"))
+        self.reader = DbWebhookReader(self.change_log, None)
+        self.reader.init_change_cursor()
+
+    def test_changes_are_read_once(self):
+        self.assertEqual(self.reader.get_changes(), ({}, False))
+        self.change_log.commit((2, "pokemon", "2"), (3, "pokemon", "2"), (4, "raid", "a"))
+        self.assertEqual(self.reader.get_changes(), ({"pokemon": {"2"}, "raid": {"a"}}, False))
+        self.assertEqual(self.reader.get_changes(), ({}, False))
+
+    def test_pages(self):
+        self.change_log.commit((2, "pokemon", "2"), (3, "pokemon", "3"), (4, "pokemon", "4"))
+        self.assertEqual(self.reader.get_changes(limit=2), ({"pokemon": {"2", "3"}}, True))
+        self.assertEqual(self.reader.get_changes(limit=2), ({"pokemon": {"4"}}, False))
+
+    def test_late_commits_are_picked_up(self):
+        self.change_log.commit((3, "gym", "b"))
+        self.assertEqual(self.reader.get_changes(), ({"gym": {"b"}}, False))
+        self.change_log.commit((2, "gym", "a"), (4, "gym", "c"))
+        self.assertEqual(self.reader.get_changes(), ({"gym": {"a", "c"}}, False))
+        self.assertEqual(self.reader.get_changes(), ({}, False))
+
+    def test_missing_changes_expire(self):
+        self.reader.missing_change_timeout = 0
+        self.change_log.commit((3, "gym", "b"))
+        self.reader.get_changes()
+        self.change_log.commit((2, "gym", "a"))
+        self.assertEqual(self.reader.get_changes(), ({}, False))
+
+    def test_missing_changes_are_limited(self):
+        self.reader.max_missing_changes = 1
+        self.change_log.commit((4, "gym", "c"))
+        with mock.patch("mapadroid.db.DbWebhookReader.logger") as logger:
+            self.assertEqual(self.reader.get_changes(), ({"gym": {"c"}}, False))
+        logger.warning.assert_called_once()
+        self.assertEqual(logger.warning.call_args[0][1:], (1, 1))
+        # only the first skipped id is tracked
+        self.change_log.commit((2, "gym", "a"), (3, "gym", "b"))
+        self.assertEqual(self.reader.get_changes(), ({"gym": {"a"}}, False))
@@ -0,0 +1,37 @@
+import json
+from unittest import TestCase, mock
+from mapadroid.webhook import webhookencoder
+from mapadroid.webhook.webhookencoder import encode, PayloadEncoder
+
+
+PAYLOADS = [
+    {"type": "pokemon", "message": {"encounter_id": 2 ** 64 - 1, "latitude": 50.1, "name": "Pokéstop"}},
+    {"type": "raid", "message": {"level": 5}},
+    {"type": "pokemon", "message": {"encounter_id": 1, "weight": None}},
+]
+
+
+class PayloadEncoderTests(TestCase):
+    def test_chunks(self):
+        encoder = PayloadEncoder(PAYLOADS, max_payload_size=2)
+        chunks = encoder.get_chunks()
+        self.assertEqual([json.loads(chunk.data) for chunk in chunks], [PAYLOADS[:2], PAYLOADS[2:]])
+        self.assertEqual([chunk.type_count for chunk in chunks], [{"pokemon": 1, "raid": 1}, {"pokemon": 1}])
+        filtered = encoder.get_chunks("[pokemon]")
+        self.assertEqual([json.loads(chunk.data) for chunk in filtered], [[PAYLOADS[0], PAYLOADS[2]]])
+        self.assertEqual(encoder.get_chunks("[weather]"), [])
+
+    def test_payloads_are_encoded_once(self):
+        with mock.patch.object(webhookencoder, "encode", wraps=encode) as wrapped:
+            encoder = PayloadEncoder(PAYLOADS)
+            self.assertIs(encoder.get_chunks("[raid]"), encoder.get_chunks("[raid]"))
+            encoder.get_chunks()
+            encoder.get_chunks("[pokemon]")
+        self.assertEqual(wrapped.call_count, len(PAYLOADS))
+
+    def test_encode_backends_match(self):
+        payload = {"type": "quest", "message": {1: "key that is no string", "list": [1.5, None, True]}}
+        with mock.patch.object(webhookencoder, "use_orjson", False):
+            expected = json.loads(encode(payload))
+        self.assertEqual(json.loads(encode(payload)), expected)
+        self.assertEqual(json.loads(encode(PAYLOADS)), PAYLOADS)
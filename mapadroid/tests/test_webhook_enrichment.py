@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from unittest import TestCase, mock
+from mapadroid.utils import gamemechanicutil
+from mapadroid.utils.gamemechanicutil import calculate_mon_level, get_mon_level
+from mapadroid.utils.rarity import Rarity
+
+
+class RefreshDoneError(Exception):
+    pass
+
+
+class SpawnCounts:
+    def __init__(self, *results):
+        self.results = list(results)
+
+    def get_pokemon_spawns(self, hours):
+        return self.results.pop(0)
+
+
+def refresh(rarity: Rarity):
+    # the refresher sleeps after every update, stop it there
+    with mock.patch("mapadroid.utils.rarity.time.sleep", side_effect=RefreshDoneError):
+        with TestCase().assertRaises(RefreshDoneError):
+            rarity.dynamic_rarity_refresher()
+
+
+class RarityTests(TestCase):
+    def test_lookup_table(self):
+        spawns = SpawnCounts({"pokemon": [(1, 9000), (150, 1)], "total": 9001},
+                             {"pokemon": [(1, 9000), (3, 1000)], "total": 10000})
+        rarity = Rarity(SimpleNamespace(rarity_hours=72, rarity_update_frequency=60), spawns)
+        self.assertEqual(rarity.rarity_by_id(1), 0)
+        refresh(rarity)
+        self.assertEqual([rarity.rarity_by_id(pokemon_id) for pokemon_id in (1, 2, 150, 151, -1)], [1, 0, 4, 0, 0])
+        refresh(rarity)
+        # pokemon which have not been seen again keep their rarity
+        self.assertEqual([rarity.rarity_by_id(pokemon_id) for pokemon_id in (1, 3, 150)], [1, 1, 4])
+
+
+class MonLevelTests(TestCase):
+    def test_levels_match_calculation(self):
+        for cp_multiplier in (0.094, 0.1351374, 0.5974, 0.7317, 0.7339, 0.7903, 0.84529999):
+            self.assertEqual(get_mon_level(cp_multiplier), calculate_mon_level(cp_multiplier))
+            self.assertEqual(get_mon_level(cp_multiplier), calculate_mon_level(cp_multiplier))
+
+    def test_table_size_is_limited(self):
+        with mock.patch.object(gamemechanicutil, "MON_LEVEL_TABLE_SIZE", 2):
+            for cp_multiplier in (0.1, 0.2, 0.3):
+                get_mon_level(cp_multiplier)
+            self.assertLessEqual(len(gamemechanicutil._mon_levels), 2)
@@ -0,0 +1,75 @@
+from queue import Queue
+from unittest import TestCase
+from mapadroid.db.DbPogoProtoSubmit import DbPogoProtoSubmit
+from mapadroid.db.DbWebhookReader import DbWebhookReader
+
+
+class BatchRecorder:
+    def __init__(self):
+        self.batches = []
+
+    def execute_batch(self, statements):
+        self.batches.append(statements)
+        return True
+
+
+def get_map_proto(*stop_ids):
+    return {"cells": [{"forts": [{"type": 1, "id": stop_id, "latitude": 50.0, "longitude": 8.0,
+                                  "last_modified_timestamp_ms": 0, "active_fort_modifier": []}
+                                 for stop_id in stop_ids]}]}
+
+
+def get_queued(queue: Queue):
+    queued = []
+    while not queue.empty():
+        queued.append(queue.get_nowait())
+    return queued
+
+
+class ChangePushTests(TestCase):
+    def setUp(self):
+        self.db_exec = BatchRecorder()
+        self.queue = Queue()
+        self.submit = DbPogoProtoSubmit(self.db_exec, track_changes=True, change_queue=self.queue)
+
+    def test_pushed_after_write_behind_flush(self):
+        self.submit.enable_write_behind(max_delay=60, max_rows=100)
+        self.submit.stops("origin", get_map_proto("a", "b"))
+        self.submit.flush_write_behind()
+        self.assertEqual(get_queued(self.queue), [])
+        self.submit.flush_write_behind(force=True)
+        self.assertEqual(len(self.db_exec.batches), 1)
+        self.assertEqual(get_queued(self.queue), [("pokestop", ["a", "b"])])
+
+    def test_pushed_after_unit_of_work(self):
+        with self.submit.unit_of_work():
+            self.submit.stops("origin", get_map_proto("a"))
+            self.assertEqual(get_queued(self.queue), [])
+        self.assertEqual(get_queued(self.queue), [("pokestop", ["a"])])
+        # the change log is not written if changes are pushed
+        self.assertEqual(len(self.db_exec.batches[0]), 1)
+
+    def test_not_pushed_if_unit_of_work_fails(self):
+        with self.assertRaises(ValueError):
+            with self.submit.unit_of_work():
+                self.submit.stops("origin", get_map_proto("a"))
+                raise ValueError()
+        self.assertEqual(get_queued(self.queue), [])
+
+    def test_logged_within_the_same_transaction(self):
+        submit = DbPogoProtoSubmit(self.db_exec, track_changes=True)
+        with submit.unit_of_work():
+            submit.stops("origin", get_map_proto("a"))
+        statements = self.db_exec.batches[0]
+        self.assertTrue(statements[0][0].startswith("INSERT INTO pokestop"))
+        self.assertIn("trs_webhook_change", statements[1][0])
+        self.assertEqual(statements[1][1], [("a",)])
+
+    def test_reader_collects_pushed_changes(self):
+        reader = DbWebhookReader(None, None, change_queue=self.queue)
+        reader.push_batch_delay = 0
+        self.queue.put(("pokemon", ["1", "2"]))
+        self.queue.put(("pokemon", ["2"]))
+        self.queue.put(("raid", ["a"]))
+        self.assertEqual(reader.get_changes(limit=3), ({"pokemon": {"1", "2"}}, True))
+        self.assertEqual(reader.get_changes(limit=3), ({"raid": {"a"}}, False))
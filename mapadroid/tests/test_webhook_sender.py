@@ -0,0 +1,116 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from types import SimpleNamespace
+from unittest import TestCase
+from mapadroid.webhook.webhookencoder import PayloadEncoder
+from mapadroid.webhook.webhooksender import WebhookEndpoint, WebhookSender
+
+
+class Receiver(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.received.append((self.path, body))
+        if self.path == "/slow":
+            time.sleep(1)
+        status = 200
+        if self.path == "/flaky" and server.failures > 0:
+            server.failures -= 1
+            status = 503
+        elif self.path == "/broken":
+            status = 400
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class WebhookSenderTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Receiver)
+        self.server.received = []
+        self.server.failures = 0
+        self.base_url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+        thread = Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.endpoints = []
+
+    def tearDown(self):
+        for endpoint in self.endpoints:
+            endpoint.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_endpoint(self, path, **kwargs):
+        endpoint = WebhookEndpoint(self.base_url + path, backoff=0.01, **kwargs)
+        self.endpoints.append(endpoint)
+        return endpoint
+
+    @staticmethod
+    def send(endpoint, payloads, max_payload_size=0):
+        # the way WebhookSender.send queues the payloads
+        endpoint.queue_chunks(PayloadEncoder(payloads, max_payload_size).get_chunks(endpoint.sub_types))
+
+    def wait_for(self, condition, timeout=5):
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                self.fail("Condition not met in time")
+            time.sleep(0.01)
+
+    def received(self, path):
+        return [body for received_path, body in self.server.received if received_path == path]
+
+    def test_slow_endpoint_does_not_delay_others(self):
+        slow = self.get_endpoint("/slow")
+        fast = self.get_endpoint("/fast")
+        for _ in range(3):
+            self.send(slow, [{"type": "pokemon"}])
+            self.send(fast, [{"type": "pokemon"}])
+        self.wait_for(lambda: fast.get_stats()["sent"] == 3, timeout=1)
+        self.assertLess(slow.get_stats()["sent"], 3)
+
+    def test_retry(self):
+        self.server.failures = 2
+        endpoint = self.get_endpoint("/flaky", max_retries=3)
+        self.send(endpoint, [{"type": "raid"}])
+        self.wait_for(lambda: endpoint.get_stats()["sent"] == 1)
+        stats = endpoint.get_stats()
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["failed"], 0)
+        self.assertIsNotNone(stats["avg_latency"])
+
+    def test_client_errors_are_not_retried(self):
+        endpoint = self.get_endpoint("/broken", max_retries=3)
+        self.send(endpoint, [{"type": "raid"}])
+        self.wait_for(lambda: endpoint.get_stats()["failed"] == 1)
+        self.assertEqual(endpoint.get_stats()["retries"], 0)
+        self.assertEqual(len(self.received("/broken")), 1)
+
+    def test_oldest_chunks_are_dropped(self):
+        endpoint = self.get_endpoint("/slow", queue_size=2)
+        self.send(endpoint, [{"type": "pokemon", "message": number} for number in range(5)], max_payload_size=1)
+        self.wait_for(lambda: endpoint.get_stats()["queue_depth"] == 0)
+        self.assertEqual(endpoint.get_stats()["dropped"], 3)
+        self.wait_for(lambda: len(self.received("/slow")) == 2)
+        self.assertEqual([body[0]["message"] for body in self.received("/slow")], [3, 4])
+
+    def test_sub_types_and_chunks(self):
+        args = SimpleNamespace(webhook_url="[raid|weather]{0}/first, {0}/second".format(self.base_url),
+                               webhook_max_payload_size=2, webhook_queue_size=10, webhook_max_retries=0,
+                               webhook_timeout=5)
+        sender = WebhookSender(args)
+        try:
+            sender.send([{"type": "raid"}, {"type": "pokemon"}, {"type": "weather"}])
+            self.wait_for(lambda: sum(stats["sent"] for stats in sender.get_stats()) == 3)
+            self.assertEqual(self.received("/first"), [[{"type": "raid"}, {"type": "weather"}]])
+            self.assertEqual(self.received("/second"), [[{"type": "raid"}, {"type": "pokemon"}],
+                                                        [{"type": "weather"}]])
+            self.assertEqual([stats["sent"] for stats in sender.get_stats()], [1, 2])
+        finally:
+            sender.stop()
@@ -0,0 +1,45 @@
+from unittest import TestCase
+from mapadroid.db.WriteBehindBuffer import WriteBehindBuffer
+
+
+class BatchRecorder:
+    def __init__(self):
+        self.batches = []
+
+    def execute_batch(self, statements):
+        self.batches.append(statements)
+        return True
+
+
+class WriteBehindBufferTests(TestCase):
+    def test_deduplicates_by_primary_key(self):
+        db_exec = BatchRecorder()
+        buffer = WriteBehindBuffer(db_exec, max_delay=60, max_rows=100)
+        buffer.add("INSERT stop", [("a", 1), ("b", 1)])
+        buffer.add("INSERT stop", [("a", 2)])
+        buffer.add("INSERT gym", [("a", 3)])
+        buffer.flush()
+        self.assertEqual(db_exec.batches, [])
+        buffer.flush(force=True)
+        self.assertEqual(db_exec.batches, [[("INSERT stop", [("b", 1), ("a", 2)], True),
+                                            ("INSERT gym", [("a", 3)], True)]])
+        stats = buffer.get_stats()
+        self.assertEqual(stats["rows_received"], 4)
+        self.assertEqual(stats["rows_flushed"], 3)
+        self.assertIsNone(buffer.get_timeout())
+
+    def test_flushes_on_row_limit(self):
+        db_exec = BatchRecorder()
+        buffer = WriteBehindBuffer(db_exec, max_delay=60, max_rows=2)
+        buffer.add("INSERT stop", [("a", 1), ("b", 1)])
+        self.assertTrue(buffer.is_due())
+        buffer.flush()
+        self.assertEqual(len(db_exec.batches), 1)
+
+    def test_flushes_after_delay(self):
+        db_exec = BatchRecorder()
+        buffer = WriteBehindBuffer(db_exec, max_delay=0, max_rows=100)
+        buffer.add("INSERT stop", [("a", 1)])
+        self.assertEqual(buffer.get_timeout(), 0)
+        buffer.flush()
+        self.assertEqual(len(db_exec.batches), 1)
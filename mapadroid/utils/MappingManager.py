@@ -1,3 +1,4 @@
+import copy
 import time
 from multiprocessing import Lock, Event
 from multiprocessing.managers import SyncManager
@@ -9,6 +10,7 @@ from mapadroid.db.DbWrapper import DbWrapper
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.route import RouteManagerIV, RouteManagerBase
 from mapadroid.route.RouteManagerFactory import RouteManagerFactory
+from mapadroid.route.routecalc.RouteCalcExecutor import RouteCalcExecutor
 from mapadroid.utils.collections import Location
 from mapadroid.utils.s2Helper import S2Helper
 from mapadroid.worker.WorkerType import WorkerType
@@ -92,6 +94,9 @@ class MappingManager:
         self.__shutdown_event: Event = Event()
         self.join_routes_queue = JoinQueue(self.__shutdown_event, self)
         self.__mappings_mutex: Lock = Lock()
+        self.__route_calc_executor: Optional[RouteCalcExecutor] = None
+        if not configmode and args.route_calc_processes > 0:
+            self.__route_calc_executor = RouteCalcExecutor(args.route_calc_processes)
 
         self.update(full_lock=True)
 
@@ -103,6 +108,8 @@ class MappingManager:
 
     def shutdown(self):
         logger.fatal("MappingManager exiting")
+        if self.__route_calc_executor is not None:
+            self.__route_calc_executor.stop()
 
     def get_auths(self) -> Optional[dict]:
         return self._auths
@@ -295,6 +302,20 @@ class MappingManager:
         routemanager = self.__fetch_routemanager(routemanager_name)
         return routemanager.get_max_radius() if routemanager is not None else None
 
+    def get_route_calc_jobs(self) -> List[dict]:
+        if self.__route_calc_executor is None:
+            return []
+        return self.__route_calc_executor.get_jobs()
+
+    def cancel_route_calc(self, routecalc_id) -> bool:
+        if self.__route_calc_executor is None:
+            return False
+        cancelled = False
+        for job in self.__route_calc_executor.get_jobs():
+            if str(job["identifier"]) == str(routecalc_id):
+                cancelled = self.__route_calc_executor.cancel(job["job_id"]) or cancelled
+        return cancelled
+
     def routemanager_recalcualte(self, routemanager_name):
         successful = False
         try:
@@ -334,7 +355,12 @@ class MappingManager:
             inheritsettings[device_setting] = devicesettings[device_setting]
         return inheritsettings
 
-    def __get_latest_routemanagers(self) -> Optional[Dict[str, dict]]:
+    def __get_latest_routemanagers(self, current_routemanagers: Optional[Dict[str, dict]] = None
+                                   ) -> Optional[Dict[str, dict]]:
+        """
+        Builds the routemanagers of all areas. Routemanagers of current_routemanagers are kept if neither their area,
+        geofences, IV list nor routefile changed since they have been built.
+        """
         global mode_mapping
         areas: Optional[Dict[str, dict]] = {}
 
@@ -371,11 +397,33 @@ class MappingManager:
                     )
                 )
 
+            # map iv list to ids
+            mon_ids_iv = None
+            if area.get('settings', None) is not None and 'mon_ids_iv' in area['settings']:
+                mon_ids_iv = self.get_monlist(area['settings'].get('mon_ids_iv', None), area.get("name", "unknown"))
+            route_resource = self.__data_manager.get_resource('routecalc', identifier=area["routecalc"])
+            # everything the routemanager is built from besides the routefile
+            area_config = {
+                "mode": area_true.area_type,
+                "area": copy.deepcopy(area),
+                "geofence_included": geofence_included.get_resource(),
+                "geofence_excluded": geofence_excluded.get_resource() if geofence_excluded is not None else None,
+                "mon_ids_iv": mon_ids_iv
+            }
+            current = current_routemanagers.get(area_id, None) if current_routemanagers else None
+            # routemanagers save the routes they calculate, a different routefile has been edited in MADmin
+            if current is not None and current["config"] == area_config and \
+                    current["routemanager"].get_routefile() == route_resource['routefile']:
+                logger.info("Area {} is unchanged, keeping its routemanager", area["name"])
+                areas[area_id] = current
+                continue
+
             area_dict = {"mode": area_true.area_type,
                          "geofence_included": geofence_included,
                          "geofence_excluded": geofence_excluded,
                          "routecalc": area["routecalc"],
-                         "name": area['name']}
+                         "name": area['name'],
+                         "config": area_config}
             # also build a routemanager for each area...
 
             # grab coords
@@ -384,12 +432,9 @@ class MappingManager:
             mode = area_true.area_type
             # build routemanagers
 
-            # map iv list to ids
-            if area.get('settings', None) is not None and 'mon_ids_iv' in area['settings']:
+            if mon_ids_iv is not None:
                 # replace list name
-                area['settings']['mon_ids_iv_raw'] = \
-                    self.get_monlist(area['settings'].get('mon_ids_iv', None), area.get("name", "unknown"))
-            route_resource = self.__data_manager.get_resource('routecalc', identifier=area["routecalc"])
+                area['settings']['mon_ids_iv_raw'] = mon_ids_iv
 
             calc_type: str = area.get("route_calc_algorithm", "route")
             route_manager = RouteManagerFactory.get_routemanager(self.__db_wrapper, self.__data_manager,
@@ -409,6 +454,7 @@ class MappingManager:
                                                                  routefile=route_resource,
                                                                  calctype=calc_type,
                                                                  joinqueue=self.join_routes_queue,
+                                                                 route_calc_executor=self.__route_calc_executor,
                                                                  s2_level=mode_mapping.get(mode, {}).get(
                                                                      "s2_cell_level", 30),
                                                                  include_event_id=area.get(
@@ -588,16 +634,21 @@ class MappingManager:
             self._monlists = self.__get_latest_monlists()
             areas_tmp = self.__get_latest_areas()
             devicemappings_tmp = self.__get_latest_devicemappings()
-            routemanagers_tmp = self.__get_latest_routemanagers()
+            routemanagers_tmp = self.__get_latest_routemanagers(self._routemanagers)
             auths_tmp = self.__get_latest_auths()
 
-            for area in self._routemanagers:
-                logger.info("Stopping all routemanagers and join threads")
-                self._routemanagers[area]['routemanager'].stop_routemanager(joinwithqueue=False)
-                self._routemanagers[area]['routemanager'].join_threads()
+            for area_id, area in self._routemanagers.items():
+                if routemanagers_tmp.get(area_id, None) is area:
+                    continue
+                logger.info("Stopping routemanager of area {} and join threads", area['name'])
+                area['routemanager'].stop_routemanager(joinwithqueue=False)
+                area['routemanager'].join_threads()
 
             logger.info("Restoring old devicesettings")
             for dev in self._devicemappings:
+                if dev not in devicemappings_tmp or not self._devicemappings[dev]['settings'] \
+                        or devicemappings_tmp[dev]['settings'] is None:
+                    continue
                 if "last_location" in self._devicemappings[dev]['settings']:
                     devicemappings_tmp[dev]['settings']["last_location"] = \
                         self._devicemappings[dev]['settings']["last_location"]
@@ -6,3 +6,4 @@ Relation = collections.namedtuple(
 Trash = collections.namedtuple('Trash', ['x', 'y'])
 Login_PTC = collections.namedtuple('PTC', ['username', 'password'])
 Login_GGL = collections.namedtuple('GGL', ['username'])
+SpawnpointDetails = collections.namedtuple('SpawnpointDetails', ['spawndef', 'calc_endminsec', 'eventid'])
@@ -16,7 +16,7 @@ class Event(object):
     def event_checker(self):
         while True:
             self._event_id, self._lure_duration = self._dbwrapper.get_current_event()
-            self._dbwrapper.set_event_id(self._event_id)
+            self._dbwrapper.set_event_id(self._event_id, self._lure_duration)
             time.sleep(60)
 
     def start_event_checker(self):
@@ -1,5 +1,11 @@
 import time
 from datetime import datetime, timedelta
+from typing import Dict
+
+# levels of the cp multipliers seen so far. There is one cp multiplier per (half) level, so the table stays small
+# unless it's fed arbitrary values, in which case it is cleared once it exceeds MON_LEVEL_TABLE_SIZE
+MON_LEVEL_TABLE_SIZE = 2048
+_mon_levels: Dict[float, float] = {}
 
 
 def calculate_mon_level(cp_multiplier):
@@ -10,6 +16,17 @@ def calculate_mon_level(cp_multiplier):
     return round(pokemon_level) * 2 / 2
 
 
+def get_mon_level(cp_multiplier):
+    """Same as calculate_mon_level, looking up cp multipliers that were calculated before"""
+    level = _mon_levels.get(cp_multiplier, None)
+    if level is None:
+        if len(_mon_levels) >= MON_LEVEL_TABLE_SIZE:
+            _mon_levels.clear()
+        level = calculate_mon_level(cp_multiplier)
+        _mon_levels[cp_multiplier] = level
+    return level
+
+
 def gen_despawn_timestamp(known_despawn):
     despawn_time = datetime.now() + timedelta(seconds=300)
     despawn_time = datetime.utcfromtimestamp(
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from mapadroid.utils.collections import Location
 
 
@@ -31,6 +33,79 @@ def get_distance_of_two_points_in_meters(start_lat, start_lon, dest_lat, dest_lo
     return distance * 1000
 
 
+def _get_haversine_in_meters(lat1, lon1, lat2, lon2) -> np.ndarray:
+    # same formula and radius as get_distance_of_two_points_in_meters, arguments in radians and broadcasted
+    earth_radius = 6373.0
+
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+
+    angle = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    circ = 2 * np.arctan2(np.sqrt(angle), np.sqrt(1 - angle))
+
+    return earth_radius * circ * 1000
+
+
+def get_distances_in_meters(start_lat, start_lon, dest_lats, dest_lons) -> np.ndarray:
+    """
+    Distances of a single start to any number of destinations, the array counterpart of
+    get_distance_of_two_points_in_meters. Starts and destinations are broadcasted, arrays of starts yield the
+    distances of each start to the destination at the same position.
+    """
+    return _get_haversine_in_meters(np.radians(np.asarray(start_lat, dtype=float)),
+                                    np.radians(np.asarray(start_lon, dtype=float)),
+                                    np.radians(np.asarray(dest_lats, dtype=float)),
+                                    np.radians(np.asarray(dest_lons, dtype=float)))
+
+
+def get_distance_matrix_in_meters(start_lats, start_lons, dest_lats, dest_lons) -> np.ndarray:
+    """
+    Distances of every start to every destination, row i holds the distances of start i
+    """
+    start_lats = np.radians(np.asarray(start_lats, dtype=float))[:, np.newaxis]
+    start_lons = np.radians(np.asarray(start_lons, dtype=float))[:, np.newaxis]
+    return _get_haversine_in_meters(start_lats, start_lons,
+                                    np.radians(np.asarray(dest_lats, dtype=float))[np.newaxis, :],
+                                    np.radians(np.asarray(dest_lons, dtype=float))[np.newaxis, :])
+
+
+def get_bearings(start_lats, start_lons, dest_lats, dest_lons) -> np.ndarray:
+    """
+    Initial bearings in degrees (-180 < bearing <= 180, 0 = north, 90 = east) on the great circles from the starts to
+    the destinations. Starts and destinations are broadcasted, a single start may be passed as scalars.
+    """
+    lat1 = np.radians(np.asarray(start_lats, dtype=float))
+    lat2 = np.radians(np.asarray(dest_lats, dtype=float))
+    dlon = np.radians(np.asarray(dest_lons, dtype=float) - np.asarray(start_lons, dtype=float))
+    bearings = np.arctan2(np.sin(dlon) * np.cos(lat2),
+                          np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon))
+    return np.degrees(bearings)
+
+
+def get_destinations(start_lats, start_lons, distances, bearings, earth_radius: float = 6373000.0):
+    """
+    Destinations reached when travelling the distances in meters along the great circles starting with the bearings
+    in degrees. Arguments are broadcasted, the result is a tuple of arrays of latitudes and longitudes with the
+    longitudes normalized to -180 < lng <= 180.
+    """
+    lat1 = np.radians(np.asarray(start_lats, dtype=float))
+    lon1 = np.asarray(start_lons, dtype=float)
+    angular_distance = np.asarray(distances, dtype=float) / earth_radius
+    bearings = np.radians(np.asarray(bearings, dtype=float))
+
+    sin_lat1 = np.sin(lat1)
+    cos_lat1 = np.cos(lat1)
+    sin_distance = np.sin(angular_distance)
+    cos_distance = np.cos(angular_distance)
+    sin_lat = sin_lat1 * cos_distance + cos_lat1 * sin_distance * np.cos(bearings)
+    dlon = np.arctan2(np.sin(bearings) * sin_distance * cos_lat1, cos_distance - sin_lat1 * sin_lat)
+
+    lats = np.degrees(np.arcsin(np.clip(sin_lat, -1, 1)))
+    lons = (lon1 + np.degrees(dlon)) % 360
+    lons = np.where(lons > 180, lons - 360, lons)
+    return lats, lons
+
+
 def get_middle_of_coord_list(list_of_coords):
     if len(list_of_coords) == 1:
         return list_of_coords[0]
@@ -1,6 +1,7 @@
 import time
 from threading import Thread
 from timeit import default_timer
+from typing import List
 from mapadroid.utils.logging import get_logger, LoggerEnums
 
 
@@ -11,7 +12,8 @@ class Rarity(object):
     def __init__(self, args, dbwrapper):
         self.args = args
         self._dbwrapper = dbwrapper
-        self._rarity = {}
+        # rarity of every pokemon indexed by its id, replaced as a whole by every refresh
+        self._rarity: List[int] = []
 
     def get_pokemon_rarity(self, total_spawns_all, total_spawns_pokemon):
         spawn_group = 1
@@ -54,10 +56,15 @@ class Rarity(object):
             pokemon = db_rarities['pokemon']
 
             # Store as an easy lookup table for front-end.
+            rarity = list(self._rarity)
+            max_id = max((int(poke[0]) for poke in pokemon), default=0)
+            if max_id >= len(rarity):
+                rarity.extend([0] * (max_id + 1 - len(rarity)))
 
             for poke in pokemon:
-                self._rarity[poke[0]] = self.get_pokemon_rarity(
+                rarity[int(poke[0])] = self.get_pokemon_rarity(
                     total, int(poke[1]))
+            self._rarity = rarity
 
             duration = default_timer() - start
             logger.info('Updated dynamic rarity. It took {}s for {} entries.', round(duration, 2), total)
@@ -65,7 +72,8 @@ class Rarity(object):
             time.sleep(refresh_time_sec)
 
     def rarity_by_id(self, pokemonid):
-        if pokemonid in self._rarity:
-            return self._rarity[pokemonid]
+        rarity = self._rarity
+        if 0 <= pokemonid < len(rarity):
+            return rarity[pokemonid]
         else:
             return 0
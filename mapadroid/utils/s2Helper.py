@@ -1,12 +1,13 @@
 import math
-import multiprocessing
 from typing import List
 import gpxdata
+import numpy as np
 import s2sphere
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.utils.collections import Location
 from mapadroid.utils.geo import (
-    get_distance_of_two_points_in_meters,
+    get_destinations,
+    get_distances_in_meters,
     get_middle_of_coord_list
 )
 from mapadroid.utils.logging import get_logger, LoggerEnums
@@ -51,21 +52,24 @@ class S2Helper:
         return s2sphere.math.degrees(cell.lat().radians), s2sphere.math.degrees(cell.lng().radians), 0
 
     @staticmethod
-    def _generate_star_locs(center, distance, ring):
-        results = []
-        for i in range(0, 6):
-            # Star_locs will contain the locations of the 6 vertices of
-            # the current ring (90,150,210,270,330 and 30 degrees from
-            # origin) to form a star
-            star_loc = S2Helper.get_new_coords(center, distance * ring,
-                                               90 + 60 * i)
-            for index in range(0, ring):
-                # Then from each point on the star, create locations
-                # towards the next point of star along the edge of the
-                # current ring
-                loc = S2Helper.get_new_coords(star_loc, distance * index, 210 + 60 * i)
-                results.append(loc)
-        return results
+    def _generate_hex_grid(center, distance, step_limit):
+        """
+        Locations of the rings 1 to step_limit - 1 of the hex grid around center as arrays of latitudes and
+        longitudes. Each ring is built from the 6 vertices of a star (90, 150, 210, 270, 330 and 30 degrees from
+        origin) with locations along the edge towards the next vertex.
+        """
+        rings = np.arange(1, step_limit)
+        # one entry per vertex of a star
+        star_rings = np.repeat(rings, 6)
+        star_sides = np.tile(np.arange(6), len(rings))
+        star_lats, star_lngs = get_destinations(center.lat, center.lng, distance * star_rings,
+                                                90 + 60 * star_sides, earth_radius=gpxdata.Util.r_earth)
+        # one entry per location, a vertex of ring r is followed by r - 1 locations along its edge
+        stars = np.repeat(np.arange(len(star_rings)), star_rings)
+        first_of_star = np.repeat(np.cumsum(star_rings) - star_rings, star_rings)
+        steps = np.arange(len(stars)) - first_of_star
+        return get_destinations(star_lats[stars], star_lngs[stars], distance * steps,
+                                210 + 60 * star_sides[stars], earth_radius=gpxdata.Util.r_earth)
 
     # the following stuff is drafts for further consideration
     @staticmethod
@@ -82,99 +86,61 @@ class S2Helper:
         center = get_middle_of_coord_list(corners)
 
         # get the farthest to the center...
-        farthest_dist = 0
-        for corner in corners:
-            dist_temp = get_distance_of_two_points_in_meters(
-                center.lat, center.lng, corner.lat, corner.lng)
-            if dist_temp > farthest_dist:
-                farthest_dist = dist_temp
+        farthest_dist = get_distances_in_meters(center.lat, center.lng, [corner.lat for corner in corners],
+                                                [corner.lng for corner in corners]).max()
 
         # calculate step_limit, round up to reduce risk of losing stuff
         step_limit = math.ceil(farthest_dist / distance)
 
-        # This will loop thorugh all the rings in the hex from the centre
-        # moving outwards
         logger.info("Calculating positions for init scan")
-        num_cores = multiprocessing.cpu_count()
-        with multiprocessing.Pool(processes=num_cores) as pool:
-            temp = [pool.apply(S2Helper._generate_star_locs, args=(
-                center, distance, i)) for i in range(1, step_limit)]
-
-        results = [item for sublist in temp for item in sublist]
-        results.append(Location(center.lat, center.lng))
+        lats, lngs = S2Helper._generate_hex_grid(center, distance, step_limit)
+        lats = np.append(lats, center.lat)
+        lngs = np.append(lngs, center.lng)
 
         logger.info("Filtering positions for init scan")
         # Geofence results.
         if geofence_helper is not None and geofence_helper.is_enabled():
-            results = geofence_helper.get_geofenced_coordinates(results)
-            if not results:
+            inside = geofence_helper.get_geofenced_mask(lats, lngs)
+            lats, lngs = lats[inside], lngs[inside]
+            if len(lats) == 0:
                 logger.error('No cells regarded as valid for desired scan area. Check your provided geofences. '
                              'Aborting.')
             else:
                 logger.info("Ordering location")
-                results = S2Helper.order_location_list_rows(results)
-        return results
-
-    @staticmethod
-    def get_most_north(location_list):
-        if location_list is None or len(location_list) == 0:
-            return None
-        most_north_and_east = location_list[0]
-        for location in location_list:
-            if location.lat > most_north_and_east.lat + 1e-5:
-                most_north_and_east = location
-        return most_north_and_east
+                order = S2Helper._get_row_order(lats, lngs)
+                lats, lngs = lats[order], lngs[order]
+        return [Location(lat, lng) for lat, lng in zip(lats.tolist(), lngs.tolist())]
 
     @staticmethod
-    def order_location_list_rows(location_list: List[Location]):
-        if location_list is None or len(location_list) == 0:
-            return []
-
-        new_list = []
+    def _get_row_order(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        """
+        Indices ordering the locations in rows from north to south, alternating west to east and east to west.
+        A row consists of the locations within 1e-4 degrees of latitude of the most northern remaining location.
+        """
+        order = np.argsort(-lats, kind="stable")
+        sorted_lats = lats[order]
+        rows = []
         flip = False
-        while len(location_list) > 0:
-            next_row = S2Helper.get_most_northern_row(location_list)
-            next_row = S2Helper.sort_row_from_west(next_row)
+        row_start = 0
+        while row_start < len(order):
+            # sorted_lats is descending, search in the negated ascending one
+            row_end = np.searchsorted(-sorted_lats, 1e-4 - sorted_lats[row_start], side="right")
+            row = order[row_start:row_end]
+            row = row[np.argsort(lngs[row], kind="stable")]
             if flip:
-                next_row.reverse()
-                flip = False
-            else:
-                flip = True
-            for loc in next_row:
-                new_list.append(loc)
-            location_list = S2Helper.delete_row_from_list(
-                location_list, next_row)
-        return new_list
+                row = row[::-1]
+            flip = not flip
+            rows.append(row)
+            row_start = row_end
+        return np.concatenate(rows) if rows else np.zeros(0, dtype=int)
 
     @staticmethod
-    def get_most_northern_row(location_list: List[Location]):
+    def order_location_list_rows(location_list: List[Location]):
         if location_list is None or len(location_list) == 0:
             return []
-
-        most_north = S2Helper.get_most_north(location_list)
-        row = []
-        for location in location_list:
-            if most_north.lat - 1e-4 <= location.lat <= most_north.lat + 1e-4:
-                row.append(location)
-
-        return row
-
-    @staticmethod
-    def delete_row_from_list(location_list, row):
-        if row is None or len(row) == 0:
-            return location_list
-        elif location_list is None or len(location_list) == 0:
-            return []
-
-        for loc in row:
-            location_list.remove(loc)
-        return location_list
-
-    @staticmethod
-    def sort_row_from_west(row):
-        if row is None or len(row) == 0:
-            return []
-        return sorted(row, key=lambda x: x.lng)
+        order = S2Helper._get_row_order(np.array([location.lat for location in location_list]),
+                                        np.array([location.lng for location in location_list]))
+        return [location_list[index] for index in order]
 
     @staticmethod
     # Returns destination coords given origin coords, distance (Kms) and bearing.
@@ -56,6 +56,10 @@ def parse_args():
                         help='Port of MySql Server.')
     parser.add_argument('-dbps', '--db_poolsize', type=int, default=2,
                         help='Size of MySQL pool (open connections to DB). Default: 2.')
+    parser.add_argument('-dbscs', '--spawnpoint_cache_size', type=int, default=50000,
+                        help='Amount of spawnpoints to keep cached per process. 0 disables the cache. Default: 50000.')
+    parser.add_argument('-dbsct', '--spawnpoint_cache_ttl', type=int, default=300,
+                        help='Seconds until a cached spawnpoint is read from the DB again. Default: 300.')
 
     # MITM Receiver
     parser.add_argument('-mrip', '--mitmreceiver_ip', required=False, default="0.0.0.0", type=str,
@@ -64,6 +68,15 @@ def parse_args():
                         help='Port to listen on for proto data (MITM data). Default: 8000.')
     parser.add_argument('-mrdw', '--mitmreceiver_data_workers', type=int, default=2,
                         help='Amount of workers to work off the data that queues up. Default: 2.')
+    parser.add_argument('-mrds', '--mitmreceiver_data_shards', type=str, default='',
+                        help='Dedicated MITM data workers per proto type as <types>:<workers> separated by ";", e.g. '
+                             '"106:4;102:2". Types not listed are handled by mitmreceiver_data_workers. '
+                             'Default: empty (all types share the same workers).')
+    parser.add_argument('-mrwbd', '--mitmreceiver_write_behind_delay', type=int, default=0,
+                        help='Buffer mon, stop, gym and cell upserts of the MITM data workers for up to N '
+                             'milliseconds and write them deduplicated in one batch. Default: 0 (disabled).')
+    parser.add_argument('-mrwbr', '--mitmreceiver_write_behind_rows', type=int, default=2000,
+                        help='Flush the write-behind buffer once it holds this many rows. Default: 2000.')
     parser.add_argument('-mipb', '--mitm_ignore_pre_boot', default=False, type=bool,
                         help='Ignore MITM data having a timestamp pre MAD\'s startup time.')
 
@@ -207,6 +220,21 @@ def parse_args():
                         help='Debug: Set initial timestamp to fetch changed elements from the DB to send via WH.')
     parser.add_argument('-whmps', '--webhook_max_payload_size', default=0, type=int,
                         help='Split up the payload into chunks and send multiple requests. Default: 0 (unlimited)')
+    parser.add_argument('-whqs', '--webhook_queue_size', default=100, type=int,
+                        help='Number of payload chunks queued per webhook url before the oldest ones are dropped. '
+                             'Default: 100')
+    parser.add_argument('-whmr', '--webhook_max_retries', default=3, type=int,
+                        help='Retry sending a payload chunk after connection or server errors this many times. '
+                             'Default: 3')
+    parser.add_argument('-whto', '--webhook_timeout', default=5, type=float,
+                        help='Timeout in seconds for a single webhook request. Default: 5')
+    parser.add_argument('-whp', '--webhook_push', action='store_true', default=False,
+                        help='Have the MITM data processors push changes to the webhook worker directly instead of '
+                             'logging them to the DB. Only data received by this instance is sent, '
+                             'webhook_start_time is ignored')
+    parser.add_argument('-whcb', '--webhook_change_batch_size', default=5000, type=int,
+                        help='Maximum number of changed rows read from the DB at once to build webhook payloads. '
+                             'Default: 5000')
     # weather
     parser.add_argument('-w', '--weather', action='store_true', default=False,
                         help='Read weather and post to db - if supported! (Default: False)')
@@ -266,6 +294,20 @@ def parse_args():
 
     parser.add_argument('-ods', '--outdated_spawnpoints', type=int, default=3,
                         help='Define when a spawnpoint is out of date (in days). Default: 3.')
+    parser.add_argument('-rctl', '--route_calc_time_limit', type=int, default=0,
+                        help='Seconds OR-Tools may spend improving a route with guided local search. '
+                             '0 stops at the first local optimum. (Default: 0)')
+    parser.add_argument('-rcp', '--route_calc_processes', type=int, default=2,
+                        help='Number of route calculations running in background processes at the same time. 0 '
+                             'calculates routes in the thread requesting them. (Default: 2)')
+    parser.add_argument('-rci', '--route_calc_incremental', action='store_true', default=False,
+                        help='Update quest routes to the remaining stops by dropping and inserting positions instead '
+                             'of calculating a new route.')
+    parser.add_argument('-rcit', '--route_calc_incremental_time', type=float, default=5,
+                        help='Seconds spent improving an incrementally updated route. (Default: 5)')
+    parser.add_argument('-rciq', '--route_calc_incremental_quality', type=float, default=1.2,
+                        help='Calculate a new route instead once an updated route gets this many times as long as '
+                             'needed compared to the calculated route. (Default: 1.2)')
 
     # etc
 
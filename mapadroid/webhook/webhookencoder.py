@@ -0,0 +1,80 @@
+import json
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+# orjson encodes payloads several times faster than the json module, but is an optional requirement
+try:
+    import orjson
+except ImportError:
+    # Pass as this is an optional requirement. We're going to check later if it
+    # was properly imported and only use it if it's installed.
+    pass
+
+
+use_orjson = 'orjson' in sys.modules
+
+
+def encode(obj) -> bytes:
+    if use_orjson:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # e.g. dicts with keys other than strings, which the json module converts
+            pass
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def payload_type_count(payload) -> Dict[str, int]:
+    count = {}
+
+    for elem in payload:
+        count[elem["type"]] = count.get(elem["type"], 0) + 1
+
+    return count
+
+
+def payload_chunk(payload, size) -> List[list]:
+    if size == 0:
+        return [payload]
+
+    return [payload[x: x + size] for x in range(0, len(payload), size)]
+
+
+def is_wanted(sub_types: Optional[str], payload_type: str) -> bool:
+    return sub_types is None or payload_type in sub_types
+
+
+class EncodedChunk(NamedTuple):
+    data: bytes
+    type_count: Dict[str, int]
+
+
+class PayloadEncoder:
+    """
+    Encodes the payloads of a run for the webhook endpoints. Every payload is encoded at most once, the chunks are
+    joined from the encoded payloads and shared by all endpoints using the same filter.
+    """
+
+    def __init__(self, payloads: List[dict], max_payload_size: int = 0):
+        self._payloads: List[dict] = payloads
+        self._max_payload_size: int = max_payload_size
+        self._encoded: List[Optional[bytes]] = [None] * len(payloads)
+        self._chunks: Dict[Optional[str], List[EncodedChunk]] = {}
+
+    def get_chunks(self, sub_types: Optional[str] = None) -> List[EncodedChunk]:
+        chunks = self._chunks.get(sub_types, None)
+        if chunks is None:
+            indices = [index for index, payload in enumerate(self._payloads)
+                       if is_wanted(sub_types, payload["type"])]
+            chunks = []
+            if indices:
+                chunks = [self.__encode_chunk(chunk) for chunk in payload_chunk(indices, self._max_payload_size)]
+            self._chunks[sub_types] = chunks
+        return chunks
+
+    def __encode_chunk(self, indices: List[int]) -> EncodedChunk:
+        for index in indices:
+            if self._encoded[index] is None:
+                self._encoded[index] = encode(self._payloads[index])
+        data = b"[" + b",".join([self._encoded[index] for index in indices]) + b"]"
+        return EncodedChunk(data, payload_type_count([self._payloads[index] for index in indices]))
@@ -0,0 +1,202 @@
+import json
+import time
+from collections import deque
+from threading import Condition, Event, Lock, Thread
+from typing import Deque, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from mapadroid.utils.logging import get_logger, LoggerEnums
+from mapadroid.webhook.webhookencoder import EncodedChunk, is_wanted, PayloadEncoder
+
+
+logger = get_logger(LoggerEnums.webhook)
+
+
+class WebhookEndpoint:
+    """
+    Delivers payloads to a single webhook url. Chunks are queued and posted by a thread of their own using a
+    keep-alive session, a slow or unreachable receiver thus only delays its own queue. Once the queue holds
+    queue_size chunks, the oldest one is dropped in favour of the new one. Chunks failing with a connection error,
+    a timeout or a server error are retried up to max_retries times with exponential backoff.
+    """
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, url: str, sub_types: Optional[str] = None, name: str = "", queue_size: int = 100,
+                 max_retries: int = 3, timeout: float = 5, backoff: float = 1, max_backoff: float = 30):
+        self.url: str = url
+        self.sub_types: Optional[str] = sub_types
+        self.name: str = name
+        self._queue_size: int = max(1, queue_size)
+        self._max_retries: int = max(0, max_retries)
+        self._timeout: float = timeout
+        self._backoff: float = backoff
+        self._max_backoff: float = max_backoff
+
+        self._queue: Deque[EncodedChunk] = deque()
+        self._queue_condition = Condition()
+        self._stats_lock = Lock()
+        self._stop_event = Event()
+        self._sent: int = 0
+        self._failed: int = 0
+        self._dropped: int = 0
+        self._retries: int = 0
+        self._last_latency: Optional[float] = None
+        self._total_latency: float = 0.0
+        self._last_success: Optional[float] = None
+
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._thread = Thread(name='system', target=self._deliver)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wants(self, payload_type: str) -> bool:
+        return is_wanted(self.sub_types, payload_type)
+
+    def queue_chunks(self, chunks: List[EncodedChunk]) -> int:
+        """Queues chunks encoded for the filter of this endpoint, returns the number of queued chunks."""
+        if len(chunks) == 0:
+            logger.debug2("Payload empty. Skip sending to: {} (Filter: {})", self.url, self.sub_types or "all")
+            return 0
+        logger.debug2("Sending to webhook url: {} (Filter: {})", self.url, self.sub_types or "all")
+
+        dropped = 0
+        with self._queue_condition:
+            for chunk in chunks:
+                if len(self._queue) >= self._queue_size:
+                    self._queue.popleft()
+                    dropped += 1
+                self._queue.append(chunk)
+            self._queue_condition.notify()
+        if dropped > 0:
+            with self._stats_lock:
+                self._dropped += dropped
+            logger.warning("Webhook{} is not keeping up, dropped {} queued payload chunks", self.name, dropped)
+        return len(chunks)
+
+    def get_stats(self) -> dict:
+        with self._queue_condition:
+            queue_depth = len(self._queue)
+        with self._stats_lock:
+            return {
+                "url": self.url,
+                "sub_types": self.sub_types,
+                "queue_depth": queue_depth,
+                "sent": self._sent,
+                "failed": self._failed,
+                "dropped": self._dropped,
+                "retries": self._retries,
+                "last_latency": self._last_latency,
+                "avg_latency": self._total_latency / self._sent if self._sent > 0 else None,
+                "last_success": self._last_success
+            }
+
+    def stop(self, timeout: float = 5):
+        self._stop_event.set()
+        with self._queue_condition:
+            self._queue_condition.notify()
+        self._thread.join(timeout=timeout)
+        self._session.close()
+
+    def _next_chunk(self) -> Optional[EncodedChunk]:
+        with self._queue_condition:
+            while not self._queue and not self._stop_event.is_set():
+                self._queue_condition.wait()
+            if self._stop_event.is_set():
+                return None
+            return self._queue.popleft()
+
+    def _post(self, chunk: EncodedChunk) -> Optional[bool]:
+        """Posts the chunk, returns whether it has been delivered or None if it is worth another try."""
+        logger.opt(lazy=True).log("DEBUG4", "Payload: {}", lambda: chunk.data.decode("utf-8"))
+        start = time.time()
+        try:
+            response = self._session.post(self.url, data=chunk.data, timeout=self._timeout)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Exception occured while sending webhook{}: {}", self.name, e)
+            return None
+
+        latency = time.time() - start
+        if response.status_code == 200:
+            with self._stats_lock:
+                self._sent += 1
+                self._last_latency = latency
+                self._total_latency += latency
+                self._last_success = time.time()
+            logger.success("Successfully sent payload to webhook{} in {:.2f}s. Stats: {}", self.name, latency,
+                           json.dumps(chunk.type_count))
+            return True
+
+        logger.warning("Got status code other than 200 OK from webhook destination{}: {}", self.name,
+                       response.status_code)
+        return None if response.status_code in self.RETRY_STATUS_CODES else False
+
+    def _deliver(self):
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                break
+
+            attempt = 0
+            delivered = self._post(chunk)
+            while delivered is None and attempt < self._max_retries:
+                delay = min(self._backoff * 2 ** attempt, self._max_backoff)
+                attempt += 1
+                with self._stats_lock:
+                    self._retries += 1
+                logger.debug("Retrying webhook{} in {}s ({}/{})", self.name, delay, attempt, self._max_retries)
+                if self._stop_event.wait(delay):
+                    break
+                delivered = self._post(chunk)
+            if not delivered:
+                with self._stats_lock:
+                    self._failed += 1
+
+
+class WebhookSender:
+    """Parses the configured webhook urls and hands payloads to their endpoints."""
+
+    def __init__(self, args):
+        self.__endpoints: List[WebhookEndpoint] = []
+        self.__max_payload_size: int = args.webhook_max_payload_size
+
+        # get list of urls
+        webhooks = [webhook for webhook in args.webhook_url.replace(" ", "").split(",") if webhook]
+        for number, webhook in enumerate(webhooks, start=1):
+            sub_types = None
+            url = webhook
+
+            if url.startswith("["):
+                end_index = webhook.rindex("]")
+                end_index += 1
+                sub_types = webhook[:end_index]
+                url = url[end_index:]
+
+            name = " [wh {}/{}]".format(number, len(webhooks)) if len(webhooks) > 1 else ""
+            self.__endpoints.append(WebhookEndpoint(url, sub_types=sub_types, name=name,
+                                                    queue_size=args.webhook_queue_size,
+                                                    max_retries=args.webhook_max_retries,
+                                                    timeout=args.webhook_timeout))
+
+    def send(self, payloads: List[dict]):
+        if len(payloads) == 0:
+            logger.debug2("Payload empty. Skip sending to webhook.")
+            return
+
+        # payloads are encoded once and shared by all endpoints
+        encoder = PayloadEncoder(payloads, self.__max_payload_size)
+        for endpoint in self.__endpoints:
+            endpoint.queue_chunks(encoder.get_chunks(endpoint.sub_types))
+
+    def get_stats(self) -> List[dict]:
+        return [endpoint.get_stats() for endpoint in self.__endpoints]
+
+    def stop(self):
+        for endpoint in self.__endpoints:
+            endpoint.stop()
@@ -1,15 +1,15 @@
 import json
 import time
-from typing import Optional, List
-import requests
+from typing import Dict, List, Optional, Set
 from mapadroid.db.DbWebhookReader import DbWebhookReader
 from mapadroid.geofence.geofenceHelper import GeofenceHelper
 from mapadroid.utils import MappingManager
-from mapadroid.utils.gamemechanicutil import calculate_mon_level
+from mapadroid.utils.gamemechanicutil import get_mon_level
 from mapadroid.utils.madGlobals import terminate_mad
 from mapadroid.utils.questGen import generate_quest
 from mapadroid.utils.s2Helper import S2Helper
 from mapadroid.utils.logging import get_logger, LoggerEnums
+from mapadroid.webhook.webhooksender import WebhookSender
 
 
 logger = get_logger(LoggerEnums.webhook)
@@ -22,32 +22,32 @@ class WebhookWorker:
     def __init__(self, args, data_manager, mapping_manager: MappingManager, rarity,
                  db_webhook_reader: DbWebhookReader):
         self.__worker_interval_sec = 10
+        self.__stats_log_interval_sec = 300
+        self.__change_cleanup_interval_sec = 600
+        self.__change_max_age_sec = 3600
         self.__args = args
         self.__data_manager = data_manager
         self.__db_wrapper = self.__data_manager.dbc
         self._db_reader = db_webhook_reader
         self.__rarity = rarity
-        self.__last_check = int(time.time())
+        self.__last_change_cleanup = 0
+        self.__last_stats_log = 0
+        self.__sender = WebhookSender(args)
+        # spawnpoints don't move, whether a spawnpoint is within an excluded area is only checked once
+        self.__excluded_spawnpoints: Dict[int, bool] = {}
+        self.__excluded_spawnpoints_max_size = 200000
 
         self.__build_ivmon_list(mapping_manager)
         self.__build_excluded_areas(mapping_manager)
 
-        if self.__args.webhook_start_time != 0:
-            self.__last_check = int(self.__args.webhook_start_time)
+        if self.__args.webhook_push:
+            logger.info("Sending webhooks for the changes pushed by the MITM data processors")
+        else:
+            self._db_reader.init_change_cursor(int(self.__args.webhook_start_time))
 
-    def __payload_type_count(self, payload):
-        count = {}
-
-        for elem in payload:
-            count[elem["type"]] = count.get(elem["type"], 0) + 1
-
-        return count
-
-    def __payload_chunk(self, payload, size):
-        if size == 0:
-            return [payload]
-
-        return [payload[x: x + size] for x in range(0, len(payload), size)]
+    def get_endpoint_stats(self) -> List[dict]:
+        """Queue depth, latency and delivery counters of every configured webhook url."""
+        return self.__sender.get_stats()
 
     def __is_in_excluded_area(self, coordinate):
         for gfh in self.__excluded_areas:
@@ -56,78 +56,17 @@ class WebhookWorker:
 
         return False
 
-    def __send_webhook(self, payloads):
-        if len(payloads) == 0:
-            logger.debug2("Payload empty. Skip sending to webhook.")
-            return
-
-        # get list of urls
-        webhooks = self.__args.webhook_url.replace(" ", "").split(",")
-
-        webhook_count = len(webhooks)
-        current_wh_num = 1
+    def __is_spawnpoint_in_excluded_area(self, spawnpoint_id, coordinate):
+        if not self.__excluded_areas:
+            return False
 
-        for webhook in webhooks:
-            payload_to_send = []
-            sub_types = "all"
-            url = webhook.strip()
-
-            if url.startswith("["):
-                end_index = webhook.rindex("]")
-                end_index += 1
-                sub_types = webhook[:end_index]
-                url = url[end_index:]
-
-                for payload in payloads:
-                    if payload["type"] in sub_types:
-                        payload_to_send.append(payload)
-            else:
-                payload_to_send = payloads
-
-            if len(payload_to_send) == 0:
-                logger.debug2("Payload empty. Skip sending to: {} (Filter: {})", url, sub_types)
-                continue
-            else:
-                logger.debug2("Sending to webhook url: {} (Filter: {})", url, sub_types)
-
-            payload_list = self.__payload_chunk(
-                payload_to_send, self.__args.webhook_max_payload_size
-            )
-
-            current_pl_num = 1
-            for payload_chunk in payload_list:
-                logger.debug4("Python data for payload: {}", payload_chunk)
-                logger.debug4("Payload: {}", json.dumps(payload_chunk))
-
-                try:
-                    response = requests.post(
-                        url,
-                        data=json.dumps(payload_chunk),
-                        headers={"Content-Type": "application/json"},
-                        timeout=5,
-                    )
-
-                    if response.status_code != 200:
-                        logger.warning("Got status code other than 200 OK from webhook destination: {}",
-                                       response.status_code)
-                    else:
-                        if webhook_count > 1:
-                            whcount_text = " [wh {}/{}]".format(current_wh_num, webhook_count)
-                        else:
-                            whcount_text = ""
-
-                        if len(payload_list) > 1:
-                            whchunk_text = " [pl {}/{}]".format(current_pl_num, len(payload_list))
-                        else:
-                            whchunk_text = ""
-
-                        logger.success("Successfully sent payload to webhook{}{}. Stats: {}", whchunk_text,
-                                       whcount_text, json.dumps(self.__payload_type_count(payload_chunk)))
-                except Exception as e:
-                    logger.warning("Exception occured while sending webhook: {}", e)
-
-                current_pl_num += 1
-            current_wh_num += 1
+        excluded = self.__excluded_spawnpoints.get(spawnpoint_id, None)
+        if excluded is None:
+            if len(self.__excluded_spawnpoints) >= self.__excluded_spawnpoints_max_size:
+                self.__excluded_spawnpoints.clear()
+            excluded = self.__is_in_excluded_area(coordinate)
+            self.__excluded_spawnpoints[spawnpoint_id] = excluded
+        return excluded
 
     def __prepare_quest_data(self, quest_data):
         ret = []
@@ -355,7 +294,7 @@ class WebhookWorker:
         ret = []
 
         for mon in mon_data:
-            if self.__is_in_excluded_area([mon["latitude"], mon["longitude"]]):
+            if self.__is_spawnpoint_in_excluded_area(mon["spawnpoint_id"], [mon["latitude"], mon["longitude"]]):
                 continue
 
             if not self.__args.pokemon_webhook_nonivs \
@@ -379,7 +318,7 @@ class WebhookWorker:
 
             if mon.get("cp_multiplier", None) is not None:
                 mon_payload["cp_multiplier"] = mon["cp_multiplier"]
-                mon_payload["pokemon_level"] = calculate_mon_level(mon["cp_multiplier"])
+                mon_payload["pokemon_level"] = get_mon_level(mon["cp_multiplier"])
 
             if mon["form"] is not None and mon["form"] > 0:
                 mon_payload["form"] = mon["form"]
@@ -535,8 +474,8 @@ class WebhookWorker:
         if len(self.__excluded_areas) > 0:
             logger.info("Excluding {} areas from webhooks", len(self.__excluded_areas))
 
-    def __create_payload(self):
-        logger.debug("Fetching data changed since {}", self.__last_check)
+    def __create_payload(self, changes: Dict[str, Set[str]]):
+        logger.debug("Fetching data of {} changed rows", sum(len(identifiers) for identifiers in changes.values()))
 
         # the payload that is about to be sent
         full_payload = []
@@ -544,42 +483,42 @@ class WebhookWorker:
         try:
             # raids
             raids = self.__prepare_raid_data(
-                self._db_reader.get_raids_changed_since(self.__last_check)
+                self._db_reader.get_raids(changes.get("raid", ()))
             )
             full_payload += raids
 
             # quests
             if self.__args.quest_webhook:
                 quest = self.__prepare_quest_data(
-                    self._db_reader.get_quests_changed_since(self.__last_check)
+                    self._db_reader.get_quests(changes.get("quest", ()))
                 )
                 full_payload += quest
 
             # weather
             if self.__args.weather_webhook:
                 weather = self.__prepare_weather_data(
-                    self._db_reader.get_weather_changed_since(self.__last_check)
+                    self._db_reader.get_weather(changes.get("weather", ()))
                 )
                 full_payload += weather
 
             # gyms
             if self.__args.gym_webhook:
                 gyms = self.__prepare_gyms_data(
-                    self._db_reader.get_gyms_changed_since(self.__last_check)
+                    self._db_reader.get_gyms(changes.get("gym", ()))
                 )
                 full_payload += gyms
 
             # stops
             if self.__args.pokestop_webhook:
                 pokestops = self.__prepare_stops_data(
-                    self._db_reader.get_stops_changed_since(self.__last_check)
+                    self._db_reader.get_stops(changes.get("pokestop", ()))
                 )
                 full_payload += pokestops
 
             # mon
             if self.__args.pokemon_webhook:
                 mon = self.__prepare_mon_data(
-                    self._db_reader.get_mon_changed_since(self.__last_check)
+                    self._db_reader.get_mons(changes.get("pokemon", ()))
                 )
                 full_payload += mon
         except Exception:
@@ -589,19 +528,46 @@ class WebhookWorker:
 
         return full_payload
 
+    def __log_endpoint_stats(self):
+        if time.time() - self.__last_stats_log < self.__stats_log_interval_sec:
+            return
+        self.__last_stats_log = time.time()
+        for number, stats in enumerate(self.get_endpoint_stats(), start=1):
+            logger.debug("Webhook {}: {}", number, stats)
+
+    def __cleanup_changes(self):
+        if time.time() - self.__last_change_cleanup < self.__change_cleanup_interval_sec:
+            return
+        try:
+            self._db_reader.cleanup_changes(self.__change_max_age_sec)
+        except Exception:
+            logger.exception("Error while cleaning up the webhook change log")
+        self.__last_change_cleanup = time.time()
+
     def run_worker(self):
         logger.info("Starting webhook worker thread")
 
         while not terminate_mad.is_set():
-            preparing_timestamp = int(time.time())
+            # read the changes logged since the last run in pages of bounded size
+            pending = True
+            while pending and not terminate_mad.is_set():
+                try:
+                    changes, pending = self._db_reader.get_changes(self.__args.webhook_change_batch_size)
+                except Exception:
+                    logger.exception("Error while reading changes for the webhook")
+                    break
 
-            # fetch data and create payload
-            full_payload = self.__create_payload()
+                # fetch data and create payload
+                full_payload = self.__create_payload(changes)
 
-            # send our payload
-            self.__send_webhook(full_payload)
+                # queue our payload, the endpoints deliver it on their own
+                self.__sender.send(full_payload)
 
-            self.__last_check = preparing_timestamp
-            time.sleep(self.__worker_interval_sec)
+            self.__log_endpoint_stats()
+            if not self.__args.webhook_push:
+                # pushed changes are awaited by the reader
+                self.__cleanup_changes()
+                time.sleep(self.__worker_interval_sec)
 
+        self.__sender.stop()
         logger.info("Stopping webhook worker thread")
@@ -7,6 +7,7 @@ import random as rand
 import websockets
 import asyncio
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.utils.CustomTypes import MessageTyping
@@ -32,7 +33,8 @@ logger = get_logger(LoggerEnums.websocket)
 
 class WebsocketServer(object):
     def __init__(self, args, mitm_mapper: MitmMapper, db_wrapper: DbWrapper, mapping_manager: MappingManager,
-                 pogo_window_manager: PogoWindows, data_manager: DataManager, event, enable_configmode: bool = False):
+                 pogo_window_manager: PogoWindows, data_manager: DataManager, event, enable_configmode: bool = False,
+                 latest_proto_store: Optional[LatestProtoStore] = None):
         self.__args = args
         self.__db_wrapper: DbWrapper = db_wrapper
         self.__mapping_manager: MappingManager = mapping_manager
@@ -52,7 +54,8 @@ class WebsocketServer(object):
         self.__users_connecting_mutex: Optional[asyncio.Lock] = None
 
         self.__worker_factory: WorkerFactory = WorkerFactory(self.__args, self.__mapping_manager, self.__mitm_mapper,
-                                                             self.__db_wrapper, self.__pogo_window_manager, event)
+                                                             self.__db_wrapper, self.__pogo_window_manager, event,
+                                                             latest_proto_store=latest_proto_store)
 
         # asyncio loop for the entire server
         self.__loop: Optional[asyncio.AbstractEventLoop] = asyncio.new_event_loop()
@@ -3,8 +3,9 @@ import time
 from abc import abstractmethod
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional
 
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.utils import MappingManager
@@ -18,6 +19,8 @@ from mapadroid.utils.logging import get_logger, LoggerEnums
 
 logger = get_logger(LoggerEnums.worker)
 Location = collections.namedtuple('Location', ['lat', 'lng'])
+# seconds to block for new data at most before checking the state of the worker again
+MAX_DATA_WAIT_INTERVAL = 5
 
 
 class LatestReceivedType(Enum):
@@ -34,7 +37,7 @@ class MITMBase(WorkerBase):
                  mapping_manager: MappingManager,
                  area_id: int, routemanager_name: str, db_wrapper, mitm_mapper: MitmMapper,
                  pogo_window_manager: PogoWindows,
-                 walker=None, event=None):
+                 walker=None, event=None, latest_proto_store: Optional[LatestProtoStore] = None):
         WorkerBase.__init__(self, args, dev_id, origin, last_known_state, communicator,
                             mapping_manager=mapping_manager, area_id=area_id,
                             routemanager_name=routemanager_name,
@@ -44,6 +47,9 @@ class MITMBase(WorkerBase):
         self._restart_count = 0
         self._rec_data_time = ""
         self._mitm_mapper = mitm_mapper
+        self._latest_proto_store: Optional[LatestProtoStore] = latest_proto_store
+        # payloads of the latest protos fetched from the mitm_mapper, keyed by proto type
+        self._latest_payloads: Dict[int, dict] = {}
         self._latest_encounter_update = 0
         self._encounter_ids = {}
         self._current_sleep_time = 0
@@ -105,6 +111,35 @@ class MITMBase(WorkerBase):
                               avg_lng, self.current_location.lat, self.current_location.lng, distance, max_radius, mode)
             return True
 
+    def _request_latest(self, proto_to_wait_for, metadata: Optional[dict] = None) -> Optional[dict]:
+        """
+        Returns the latest data of the origin in the layout of MitmMapper.request_latest. Only the payload of
+        proto_to_wait_for is included and it is only requested from the mitm_mapper if a newer proto arrived.
+        Metadata already retrieved (e.g. by MitmMapper.wait_for_proto) may be passed to be completed.
+        """
+        latest = metadata
+        if latest is None and self._latest_proto_store is not None:
+            latest = self._latest_proto_store.get(self._origin)
+        if latest is None:
+            latest = self._mitm_mapper.request_latest_metadata(self._origin)
+        if latest is None or proto_to_wait_for not in latest:
+            return latest
+
+        latest_payload = self._latest_payloads.get(proto_to_wait_for, None)
+        if latest_payload is None or latest_payload.get("timestamp", 0) < latest[proto_to_wait_for]["timestamp"]:
+            latest_payload = self._mitm_mapper.request_latest(self._origin, proto_to_wait_for)
+            if latest_payload is None:
+                return latest
+            self._latest_payloads[proto_to_wait_for] = latest_payload
+        latest[proto_to_wait_for] = latest_payload
+        return latest
+
+    def _get_protos_to_wait_for(self, proto_to_wait_for) -> List[int]:
+        """
+        Proto types whose arrival may satisfy _wait_data_worker while waiting for proto_to_wait_for
+        """
+        return [proto_to_wait_for]
+
     def _wait_for_data(self, timestamp: float = None, proto_to_wait_for=106, timeout=None):
         if timestamp is None:
             timestamp = time.time()
@@ -119,7 +154,7 @@ class MITMBase(WorkerBase):
                 self._routemanager_name):
             timeout *= 2
         # let's fetch the latest data to add the offset to timeout (in case device and server times are off...)
-        latest = self._mitm_mapper.request_latest(self._origin)
+        latest = self._request_latest(proto_to_wait_for)
         timestamp_last_data = latest.get("timestamp_last_data", 0)
         timestamp_last_received = latest.get("timestamp_receiver", 0)
 
@@ -132,11 +167,13 @@ class MITMBase(WorkerBase):
         data_requested = LatestReceivedType.UNDEFINED
 
         failover_timestamp: int = time.time()
+        protos_to_wait_for: List[int] = self._get_protos_to_wait_for(proto_to_wait_for)
+        metadata: Optional[dict] = None
 
         while data_requested == LatestReceivedType.UNDEFINED and \
-                (timestamp + timeout >= int(time.time()) and int(failover_timestamp + timeout) >= int(time.time())) \
+                min(timestamp, failover_timestamp) + timeout >= time.time() \
                 and not self._stop_worker_event.is_set():
-            latest = self._mitm_mapper.request_latest(self._origin)
+            latest = self._request_latest(proto_to_wait_for, metadata)
             latest_location: Optional[Location] = latest.get("location", None)
             check_data = True
             if (proto_to_wait_for == 106 and latest_location is not None and
@@ -162,8 +199,14 @@ class MITMBase(WorkerBase):
                     or self._stop_worker_event.is_set():
                 self.logger.error("killed while sleeping")
                 raise InternalStopWorkerException
-
-            time.sleep(1)
+            if data_requested != LatestReceivedType.UNDEFINED:
+                break
+
+            # block until a proto newer than the ones just checked arrives rather than polling
+            newer_than = max(latest.get(proto_type, {}).get("timestamp", 0) for proto_type in protos_to_wait_for)
+            remaining = min(timestamp, failover_timestamp) + timeout - time.time()
+            metadata = self._mitm_mapper.wait_for_proto(self._origin, protos_to_wait_for, newer_than,
+                                                        max(0.0, min(remaining, MAX_DATA_WAIT_INTERVAL)))
 
         position_type = self._mapping_manager.routemanager_get_position_type(self._routemanager_name,
                                                                              self._origin)
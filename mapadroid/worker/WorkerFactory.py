@@ -2,6 +2,7 @@ import asyncio
 from typing import Optional, NamedTuple
 
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.utils.MappingManager import MappingManager
@@ -29,13 +30,14 @@ class WalkerConfiguration(NamedTuple):
 
 class WorkerFactory:
     def __init__(self, args, mapping_manager: MappingManager, mitm_mapper: MitmMapper, db_wrapper: DbWrapper,
-                 pogo_windows: PogoWindows, event):
+                 pogo_windows: PogoWindows, event, latest_proto_store: Optional[LatestProtoStore] = None):
         self.__args = args
         self.__mapping_manager: MappingManager = mapping_manager
         self.__mitm_mapper: MitmMapper = mitm_mapper
         self.__db_wrapper: DbWrapper = db_wrapper
         self.__pogo_windows: PogoWindows = pogo_windows
         self.__event = event
+        self.__latest_proto_store: Optional[LatestProtoStore] = latest_proto_store
 
     async def __get_walker_index(self, devicesettings, origin):
         walker_index = devicesettings.get('walker_area_index', 0)
@@ -188,12 +190,14 @@ class WorkerFactory:
             return WorkerMITM(self.__args, dev_id, origin, last_known_state, communicator, area_id=area_id,
                               routemanager_name=walker_area_name, mitm_mapper=self.__mitm_mapper,
                               mapping_manager=self.__mapping_manager, db_wrapper=self.__db_wrapper,
-                              pogo_window_manager=self.__pogo_windows, walker=walker_settings, event=self.__event)
+                              pogo_window_manager=self.__pogo_windows, walker=walker_settings, event=self.__event,
+                              latest_proto_store=self.__latest_proto_store)
         elif worker_type in [WorkerType.STOPS, WorkerType.STOPS.value]:
             return WorkerQuests(self.__args, dev_id, origin, last_known_state, communicator, area_id=area_id,
                                 routemanager_name=walker_area_name, mitm_mapper=self.__mitm_mapper,
                                 mapping_manager=self.__mapping_manager, db_wrapper=self.__db_wrapper,
-                                pogo_window_manager=self.__pogo_windows, walker=walker_settings, event=self.__event)
+                                pogo_window_manager=self.__pogo_windows, walker=walker_settings, event=self.__event,
+                                latest_proto_store=self.__latest_proto_store)
         elif worker_type in [WorkerType.IDLE, WorkerType.IDLE.value]:
             return WorkerConfigmode(self.__args, dev_id, origin, communicator, walker=walker_settings,
                                     mapping_manager=self.__mapping_manager, mitm_mapper=self.__mitm_mapper,
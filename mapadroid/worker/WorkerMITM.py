@@ -1,9 +1,10 @@
 import math
 import time
 from datetime import datetime
-from typing import Union
+from typing import Optional, Union
 
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.utils import MappingManager
@@ -24,12 +25,14 @@ logger = get_logger(LoggerEnums.worker)
 class WorkerMITM(MITMBase):
     def __init__(self, args, dev_id, origin, last_known_state, communicator: AbstractCommunicator,
                  mapping_manager: MappingManager, area_id: int, routemanager_name: str, mitm_mapper: MitmMapper,
-                 db_wrapper: DbWrapper, pogo_window_manager: PogoWindows, walker, event):
+                 db_wrapper: DbWrapper, pogo_window_manager: PogoWindows, walker, event,
+                 latest_proto_store: Optional[LatestProtoStore] = None):
         MITMBase.__init__(self, args, dev_id, origin, last_known_state, communicator,
                           mapping_manager=mapping_manager, area_id=area_id,
                           routemanager_name=routemanager_name,
                           db_wrapper=db_wrapper,
-                          mitm_mapper=mitm_mapper, pogo_window_manager=pogo_window_manager, walker=walker, event=event)
+                          mitm_mapper=mitm_mapper, pogo_window_manager=pogo_window_manager, walker=walker, event=event,
+                          latest_proto_store=latest_proto_store)
         # TODO: own InjectionSettings class
         self.__update_injection_settings()
 
@@ -202,10 +205,8 @@ class WorkerMITM(MITMBase):
         data_requested: Union[LatestReceivedType, dict] = LatestReceivedType.UNDEFINED
         if latest is None:
             self.logger.debug("Nothing received from since MAD started")
-            time.sleep(0.5)
         elif proto_to_wait_for not in latest:
             self.logger.debug("No data linked to the requested proto since MAD started.")
-            time.sleep(0.5)
         else:
             # proto has previously been received, let's check the timestamp...
             # TODO: int vs str-key?
@@ -220,7 +221,6 @@ class WorkerMITM(MITMBase):
                 # TODO: consider reseting timestamp here since we clearly received SOMETHING
                 latest_data: dict = latest_proto.get("values", None)
                 if latest_data is None:
-                    time.sleep(0.5)
                     return LatestReceivedType.UNDEFINED
                 elif mode in ["mon_mitm", "iv_mitm"]:
                     # check if the GMO contains mons
@@ -238,7 +238,6 @@ class WorkerMITM(MITMBase):
                             break
                     if data_requested is None or data_requested == LatestReceivedType.UNDEFINED:
                         self.logger.debug("No spawnpoints in data requested")
-                        time.sleep(1)
                 elif mode in ["raids_mitm"]:
                     self.logger.debug("Checking raids_mitm data")
                     for data_extract in latest_data['payload']['cells']:
@@ -254,16 +253,13 @@ class WorkerMITM(MITMBase):
                             break
                     if data_requested is None or data_requested == LatestReceivedType.UNDEFINED:
                         self.logger.debug("No forts in data received: {}", latest_data)
-                        time.sleep(0.5)
                     else:
                         self.logger.debug("Got data requested: {}", data_requested)
                 else:
                     self.logger.warning("No mode specified to wait for - this should not even happen...")
-                    time.sleep(0.5)
             else:
                 self.logger.debug("latest timestamp of proto {} ({}) is older than {}", proto_to_wait_for,
                                   latest_timestamp, timestamp)
                 # TODO: timeout error instead of data_error_counter? Differentiate timeout vs missing data (the
                 # TODO: latter indicates too high speeds for example
-                time.sleep(0.5)
         return data_requested
@@ -4,8 +4,9 @@ from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 from enum import Enum
 from threading import Event, Thread
-from typing import List
+from typing import List, Optional
 from mapadroid.db.DbWrapper import DbWrapper
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper
 from mapadroid.ocr.pogoWindows import PogoWindows
 from mapadroid.utils import MappingManager
@@ -56,13 +57,13 @@ class WorkerQuests(MITMBase):
                  mapping_manager: MappingManager,
                  area_id: int, routemanager_name: str, db_wrapper: DbWrapper,
                  pogo_window_manager: PogoWindows, walker,
-                 mitm_mapper: MitmMapper, event):
+                 mitm_mapper: MitmMapper, event, latest_proto_store: Optional[LatestProtoStore] = None):
         MITMBase.__init__(self, args, dev_id, origin, last_known_state, communicator,
                           mapping_manager=mapping_manager, routemanager_name=routemanager_name,
                           area_id=area_id,
                           db_wrapper=db_wrapper,
                           mitm_mapper=mitm_mapper, pogo_window_manager=pogo_window_manager, walker=walker,
-                          event=event)
+                          event=event, latest_proto_store=latest_proto_store)
         self.clear_thread = None
         # 0 => None
         # 1 => clear box
@@ -604,13 +605,12 @@ class WorkerQuests(MITMBase):
         self._mitm_mapper.update_latest(origin=self._origin, key="injected_settings", values_dict=injected_settings)
 
     def _current_position_has_spinnable_stop(self, timestamp: float):
-        latest: dict = self._mitm_mapper.request_latest(self._origin)
-        if latest is None or PROTO_NUMBER_FOR_GMO not in latest.keys():
+        latest_gmo: dict = self._mitm_mapper.request_latest(self._origin, PROTO_NUMBER_FOR_GMO)
+        if latest_gmo is None:
             self.logger.warning("Can't spin stop - no GMO data available!")
             return False, False
 
-        gmo_cells: list = latest.get(PROTO_NUMBER_FOR_GMO).get("values", {}).get("payload", {}).get("cells",
-                                                                                                    None)
+        gmo_cells: list = latest_gmo.get("values", {}).get("payload", {}).get("cells", None)
         if gmo_cells == list():
             self.logger.warning("Can't spin stop - no map info in GMO!")
             return False, False
@@ -826,17 +826,19 @@ class WorkerQuests(MITMBase):
 
         self.set_devicesettings_value('last_action_time', time.time())
 
+    def _get_protos_to_wait_for(self, proto_to_wait_for) -> List[int]:
+        # gyms and encounters opened by accident end the wait as well
+        return [proto_to_wait_for, 156, 102]
+
     def _wait_data_worker(self, latest, proto_to_wait_for, timestamp):
         if latest is None:
             self.logger.debug("Nothing received since MAD started")
-            time.sleep(0.5)
         elif 156 in latest and latest[156].get('timestamp', 0) >= timestamp:
             return LatestReceivedType.GYM
         elif 102 in latest and latest[102].get('timestamp', 0) >= timestamp:
             return LatestReceivedType.MON
         elif proto_to_wait_for not in latest:
             self.logger.debug("No data linked to the requested proto since MAD started.")
-            time.sleep(0.5)
         else:
             # when waiting for stop or spin data, it is enough to make sure
             # our data is newer than the latest of last quest received, last
@@ -864,7 +866,6 @@ class WorkerQuests(MITMBase):
                 latest_data = latest_proto.get("values", None)
                 self.logger.debug4("Latest data received: {}", latest_data)
                 if latest_data is None:
-                    time.sleep(0.5)
                     return None
                 elif proto_to_wait_for == 101:
                     payload: dict = latest_data.get("payload", None)
@@ -907,5 +908,4 @@ class WorkerQuests(MITMBase):
                                   latest_timestamp, timestamp)
                 # TODO: timeoutopen error instead of data_error_counter? Differentiate timeout vs missing data (the
                 # TODO: latter indicates too high speeds for example
-                time.sleep(0.5)
         return LatestReceivedType.UNDEFINED
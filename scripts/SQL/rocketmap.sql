@@ -119,7 +119,8 @@ CREATE TABLE `pokemon` (
     KEY `pokemon_last_modified` (`last_modified`),
     KEY `pokemon_latitude_longitude` (`latitude`,`longitude`),
     KEY `pokemon_disappear_time_pokemon_id` (`disappear_time`,`pokemon_id`),
-    KEY `pokemon_iv` (`individual_attack`, `individual_defense`, `individual_stamina`)
+    KEY `pokemon_iv` (`individual_attack`, `individual_defense`, `individual_stamina`),
+    KEY `pokemon_to_be_encountered` (`individual_attack`, `disappear_time`, `latitude`, `longitude`, `pokemon_id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 CREATE TABLE `pokestop` (
@@ -478,6 +479,7 @@ CREATE TABLE `settings_routecalc` (
     `guid` varchar(32) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
     `instance_id` int(10) unsigned NOT NULL,
     `recalc_status` tinyint(1) DEFAULT '0',
+    `input_hash` varchar(40) COLLATE utf8mb4_unicode_ci DEFAULT NULL,
     `last_updated` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
     `routefile` mediumtext COLLATE utf8mb4_unicode_ci,
     PRIMARY KEY (`routecalc_id`)
@@ -704,6 +706,15 @@ CREATE TABLE `trs_visited` (
     PRIMARY KEY (`pokestop_id`,`origin`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+CREATE TABLE `trs_webhook_change` (
+    `id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+    `type` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+    `identifier` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL,
+    `created` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`id`),
+    KEY `created` (`created`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 CREATE TABLE `versions` (
     `key` varchar(191) COLLATE utf8mb4_unicode_ci NOT NULL,
     `val` smallint(6) NOT NULL,
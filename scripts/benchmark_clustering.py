@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Compares the clustering of SpatialClusteringHelper with the one of ClusteringHelper using random events.
+usage: benchmark_clustering.py [--events 5000] [--radius 70] [--max-count 10] [--timedelta 0]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+sys.path.append("..")
+from mapadroid.route.routecalc.ClusteringHelper import ClusteringHelper  # noqa: E402
+from mapadroid.route.routecalc.SpatialClusteringHelper import SpatialClusteringHelper  # noqa: E402
+from mapadroid.utils.collections import Location  # noqa: E402
+
+
+def measure(name, func):
+    start = time.time()
+    result = func()
+    print("{:<12}{:>10.3f}s {:>10} events".format(name, time.time() - start, len(result)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--radius", type=int, default=70)
+    parser.add_argument("--max-count", type=int, default=10)
+    parser.add_argument("--timedelta", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(0)
+    # roughly 10 events per square kilometer
+    spread = (args.events / 10) ** 0.5 / 111
+    queue = [(int(random.uniform(0, args.timedelta * 2)),
+              Location(50 + random.uniform(0, spread), 8 + random.uniform(0, spread)))
+             for _ in range(args.events)]
+
+    print("{} events, radius {}m, at most {} per circle, timedelta {}s".format(
+        args.events, args.radius, args.max_count, args.timedelta))
+    spatial = measure("spatial", lambda: SpatialClusteringHelper(args.radius, args.max_count,
+                                                                 args.timedelta).get_clustered(list(queue)))
+    pairwise = measure("pairwise", lambda: ClusteringHelper(args.radius, args.max_count,
+                                                            args.timedelta).get_clustered(list(queue)))
+    if spatial != pairwise:
+        print("Results differ!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
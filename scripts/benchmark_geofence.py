@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compares the vectorized and grid indexed geofencing of GeofenceHelper with the former point by point
+implementation using random polygons and coordinates.
+usage: benchmark_geofence.py [--points 100000] [--vertices 500] [--excluded 10]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+sys.path.append("..")
+from mapadroid.geofence.geofenceHelper import GeofenceHelper  # noqa: E402
+
+try:
+    from matplotlib.path import Path
+except ImportError:
+    # Pass as this is an optional requirement. We're going to check later if it
+    # was properly imported and only use it if it's installed.
+    pass
+
+
+def random_polygon(vertices, center_lat, center_lon, radius):
+    fence = []
+    for i in range(vertices):
+        angle = 2 * math.pi * i / vertices
+        distance = radius * random.uniform(0.5, 1.0)
+        fence.append("%f,%f" % (center_lat + distance * math.cos(angle), center_lon + distance * math.sin(angle)))
+    return fence
+
+
+def is_point_in_polygon_matplotlib(point, polygon):
+    polygons = [(coord['lat'], coord['lon']) for coord in polygon]
+    polygons.append(polygons[0])
+    return Path(polygons).contains_point((point['lat'], point['lon']))
+
+
+def geofence_point_by_point(geofence_helper, coordinates, is_point_in_polygon):
+    geofenced_coordinates = []
+    for coord in coordinates:
+        point = {'lat': coord[0], 'lon': coord[1]}
+        if any(is_point_in_polygon(point, area['polygon']) for area in geofence_helper.excluded_areas):
+            continue
+        if any(is_point_in_polygon(point, area['polygon']) for area in geofence_helper.geofenced_areas):
+            geofenced_coordinates.append(coord)
+    return geofenced_coordinates
+
+
+def measure(name, func):
+    start = time.time()
+    result = func()
+    print("{:<24}{:>10.3f}s {:>10} coordinates".format(name, time.time() - start, len(result)))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--vertices", type=int, default=500)
+    parser.add_argument("--excluded", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(0)
+    include = {"fence_data": ["[include]"] + random_polygon(args.vertices, 50.0, 8.0, 0.2)}
+    exclude = {"fence_data": []}
+    for i in range(args.excluded):
+        exclude["fence_data"].append("[exclude%d]" % i)
+        exclude["fence_data"] += random_polygon(args.vertices // 5 or 3, random.uniform(49.9, 50.1),
+                                                random.uniform(7.9, 8.1), 0.02)
+    geofence_helper = GeofenceHelper(include, exclude)
+    coordinates = [(random.uniform(49.75, 50.25), random.uniform(7.75, 8.25)) for _ in range(args.points)]
+
+    print("{} coordinates, {} vertices, {} excluded areas".format(args.points, args.vertices, args.excluded))
+    vectorized = measure("vectorized", lambda: geofence_helper.get_geofenced_coordinates(coordinates))
+    custom = measure("point by point (custom)", lambda: geofence_point_by_point(
+        geofence_helper, coordinates, GeofenceHelper.is_point_in_polygon_custom))
+    if "matplotlib" in sys.modules:
+        measure("point by point (mpl)", lambda: geofence_point_by_point(
+            geofence_helper, coordinates, is_point_in_polygon_matplotlib))
+    single = measure("single points (grid)", lambda: [coord for coord in coordinates
+                                                      if geofence_helper.is_coord_inside_include_geofence(coord)])
+    prepared_areas = geofence_helper._prepared_geofenced_areas + geofence_helper._prepared_excluded_areas
+    print("boundary cells: {:.1%}".format(
+        sum(area.get_boundary_share() for area in prepared_areas) / len(prepared_areas)))
+    if vectorized != custom or single != custom:
+        print("Results differ!")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
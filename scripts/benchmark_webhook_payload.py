@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measures building and encoding webhook payloads of random mons. Encoding every chunk for every url using the json
+module is compared with the PayloadEncoder, which encodes every payload once (using orjson if installed).
+usage: benchmark_webhook_payload.py [--mons 20000] [--urls 3] [--max-payload-size 0]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.append("..")
+from mapadroid.webhook import webhookencoder  # noqa: E402
+from mapadroid.webhook.webhookencoder import payload_chunk, payload_type_count, PayloadEncoder  # noqa: E402
+
+
+class MappingManager:
+    def get_all_routemanager_names(self):
+        return []
+
+
+class Rarity:
+    def rarity_by_id(self, pokemonid):
+        return pokemonid % 5
+
+
+class DbWebhookReader:
+    def __init__(self, mons):
+        self.mons = mons
+
+    def init_change_cursor(self, timestamp=0):
+        pass
+
+    def get_raids(self, gym_ids):
+        return []
+
+    def get_mons(self, encounter_ids):
+        return self.mons
+
+
+def get_mons(count):
+    mons = []
+    for encounter_id in range(count):
+        scanned = random.random() < 0.3
+        mons.append({
+            "encounter_id": random.getrandbits(64),
+            "pokemon_id": random.randint(1, 600),
+            "last_modified": datetime.utcnow(),
+            "spawnpoint_id": random.getrandbits(40),
+            "latitude": 50 + random.random(),
+            "longitude": 8 + random.random(),
+            "disappear_time": int(time.time()) + random.randint(0, 3600),
+            "individual_attack": random.randint(0, 15) if scanned else None,
+            "individual_defense": random.randint(0, 15) if scanned else None,
+            "individual_stamina": random.randint(0, 15) if scanned else None,
+            "move_1": random.randint(1, 300) if scanned else None,
+            "move_2": random.randint(1, 300) if scanned else None,
+            "cp": random.randint(10, 4000) if scanned else None,
+            "cp_multiplier": random.choice([0.094, 0.5974, 0.7317, 0.7903]) if scanned else None,
+            "gender": random.randint(1, 3),
+            "form": random.randint(0, 100),
+            "costume": 0,
+            "height": random.random() if scanned else None,
+            "weight": random.random() * 100 if scanned else None,
+            "weather_boosted_condition": random.randint(0, 7),
+            "base_catch": random.random() if scanned else None,
+            "great_catch": random.random() if scanned else None,
+            "ultra_catch": random.random() if scanned else None,
+            "spawn_verified": random.random() < 0.8
+        })
+    return mons
+
+
+def encode_per_url(payloads, urls, max_payload_size):
+    # every url used to get every chunk encoded once for the request and once for the debug log
+    encoded = 0
+    for _ in range(urls):
+        for chunk in payload_chunk(payloads, max_payload_size):
+            encoded += len(json.dumps(chunk))
+            json.dumps(chunk)
+            json.dumps(payload_type_count(chunk))
+    return encoded
+
+
+def encode_once(payloads, urls, max_payload_size):
+    encoder = PayloadEncoder(payloads, max_payload_size)
+    return sum(len(chunk.data) for _ in range(urls) for chunk in encoder.get_chunks())
+
+
+def measure(name, count, func):
+    start = time.time()
+    result = func()
+    duration = time.time() - start
+    print("{:<24}{:>10.3f}s {:>12.0f} mons/s".format(name, duration, count / duration if duration else 0))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mons", type=int, default=20000)
+    parser.add_argument("--urls", type=int, default=3)
+    parser.add_argument("--max-payload-size", type=int, default=0)
+    args = parser.parse_args()
+    # the worker's dependencies parse the arguments of MAD when imported
+    sys.argv = sys.argv[:1]
+    from mapadroid.webhook.webhookworker import WebhookWorker
+
+    random.seed(0)
+    mons = get_mons(args.mons)
+    worker_args = SimpleNamespace(webhook_url="", webhook_max_payload_size=args.max_payload_size,
+                                  webhook_queue_size=1, webhook_max_retries=0, webhook_timeout=1,
+                                  webhook_excluded_areas="", webhook_start_time=0, webhook_push=False,
+                                  quest_webhook=False, weather_webhook=False, gym_webhook=False,
+                                  pokestop_webhook=False, pokemon_webhook=True, pokemon_webhook_nonivs=True,
+                                  quest_webhook_flavor="default")
+    worker = WebhookWorker(worker_args, SimpleNamespace(dbc=None), MappingManager(), Rarity(),
+                           DbWebhookReader(mons))
+
+    print("{} mons, {} urls, max payload size {}, orjson {}".format(
+        args.mons, args.urls, args.max_payload_size, "used" if webhookencoder.use_orjson else "not installed"))
+    payloads = measure("build", args.mons, lambda: worker._WebhookWorker__create_payload({"pokemon": set()}))
+    measure("encode per url", args.mons, lambda: encode_per_url(payloads, args.urls, args.max_payload_size))
+    measure("encode once", args.mons, lambda: encode_once(payloads, args.urls, args.max_payload_size))
+    if webhookencoder.use_orjson:
+        webhookencoder.use_orjson = False
+        measure("encode once (json)", args.mons, lambda: encode_once(payloads, args.urls, args.max_payload_size))
+
+
+if __name__ == "__main__":
+    main()
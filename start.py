@@ -17,6 +17,7 @@ from threading import Thread, active_count
 import psutil
 from mapadroid.utils.MappingManager import MappingManager, MappingManagerManager
 from mapadroid.db.DbFactory import DbFactory
+from mapadroid.mitm_receiver.LatestProtoStore import LatestProtoStore
 from mapadroid.mitm_receiver.MitmMapper import MitmMapper, MitmMapperManager
 from mapadroid.mitm_receiver.MitmDataProcessorManager import MitmDataProcessorManager
 from mapadroid.mitm_receiver.MITMReceiver import MITMReceiver
@@ -157,6 +158,7 @@ if __name__ == "__main__":
     jobstatus: dict = {}
     mapping_manager_manager: MappingManagerManager = None
     mapping_manager: Optional[MappingManager] = None
+    latest_proto_store: Optional[LatestProtoStore] = None
     mitm_receiver_process: MITMReceiver = None
     mitm_mapper_manager: Optional[MitmMapperManager] = None
     mitm_mapper: Optional[MitmMapper] = None
@@ -223,6 +225,8 @@ if __name__ == "__main__":
         mitm_mapper_manager = MitmMapperManager()
         mitm_mapper_manager.start()
         mitm_mapper = mitm_mapper_manager.MitmMapper(args, mapping_manager, db_wrapper.stats_submit)
+        # metadata of the latest protos shared by the MITMReceiver with the workers
+        latest_proto_store = LatestProtoStore()
 
     logger.info('Starting PogoDroid Receiver server on port {}'.format(str(args.mitmreceiver_port)))
 
@@ -233,7 +237,8 @@ if __name__ == "__main__":
                                          mitm_mapper, args, mapping_manager, db_wrapper,
                                          data_manager, storage_elem,
                                          mitm_data_processor_manager.get_queue(),
-                                         enable_configmode=args.config_mode)
+                                         enable_configmode=args.config_mode,
+                                         latest_proto_store=latest_proto_store)
     mitm_receiver_process.start()
 
     logger.info('Starting websocket server on port {}'.format(str(args.ws_port)))
@@ -244,7 +249,8 @@ if __name__ == "__main__":
                                 pogo_window_manager=pogo_win_manager,
                                 data_manager=data_manager,
                                 event=event,
-                                enable_configmode=args.config_mode)
+                                enable_configmode=args.config_mode,
+                                latest_proto_store=latest_proto_store)
     t_ws = Thread(name='system', target=ws_server.start_server)
     t_ws.daemon = False
     t_ws.start()
@@ -363,6 +369,8 @@ if __name__ == "__main__":
                 ws_server.stop_server()
                 logger.info("Waiting for websocket-thread to exit")
                 t_ws.join()
+            if mapping_manager is not None:
+                mapping_manager.shutdown()
             if mapping_manager_manager is not None:
                 mapping_manager_manager.shutdown()
             if mitm_mapper_manager is not None: